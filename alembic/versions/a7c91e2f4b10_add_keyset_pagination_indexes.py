@@ -0,0 +1,48 @@
+"""add keyset pagination indexes
+
+Revision ID: a7c91e2f4b10
+Revises: 5b42fd906a78
+Create Date: 2026-10-16 09:12:41.518204
+
+Composite (sort_key, id) indexes backing cursor pagination of content entries
+(admin list, GraphQL, Delivery API) and audit logs.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c91e2f4b10"
+down_revision: Union[str, Sequence[str], None] = "5b42fd906a78"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_content_entries_type_created_id",
+        "content_entries",
+        ["content_type_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_content_entries_type_status_published_id",
+        "content_entries",
+        ["content_type_id", "status", "published_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_org_created_id",
+        "audit_logs",
+        ["organization_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_audit_logs_org_created_id", table_name="audit_logs")
+    op.drop_index("ix_content_entries_type_status_published_id", table_name="content_entries")
+    op.drop_index("ix_content_entries_type_created_id", table_name="content_entries")
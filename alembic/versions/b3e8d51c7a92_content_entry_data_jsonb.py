@@ -0,0 +1,49 @@
+"""store content entry data as jsonb
+
+Revision ID: b3e8d51c7a92
+Revises: a7c91e2f4b10
+Create Date: 2026-10-16 11:04:27.903318
+
+Converts content_entries.data and seo_data from TEXT to JSONB on PostgreSQL and adds a
+GIN (jsonb_path_ops) index on data for filter[data.<path>] containment queries.
+Other dialects keep the TEXT columns.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8d51c7a92"
+down_revision: Union[str, Sequence[str], None] = "a7c91e2f4b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE content_entries ALTER COLUMN data TYPE JSONB USING data::jsonb")
+    op.execute(
+        "ALTER TABLE content_entries ALTER COLUMN seo_data TYPE JSONB USING seo_data::jsonb"
+    )
+    op.create_index(
+        "ix_content_entries_data_gin",
+        "content_entries",
+        ["data"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index("ix_content_entries_data_gin", table_name="content_entries")
+    op.execute("ALTER TABLE content_entries ALTER COLUMN seo_data TYPE TEXT USING seo_data::text")
+    op.execute("ALTER TABLE content_entries ALTER COLUMN data TYPE TEXT USING data::text")
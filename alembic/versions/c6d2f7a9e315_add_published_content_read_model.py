@@ -0,0 +1,74 @@
+"""add published content read model
+
+Revision ID: c6d2f7a9e315
+Revises: b3e8d51c7a92
+Create Date: 2026-10-16 14:22:09.617442
+
+Pre-rendered Delivery API documents, one row per published content entry.
+Populate existing content after upgrading with:
+
+    python scripts/rebuild_published_content.py
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c6d2f7a9e315"
+down_revision: Union[str, Sequence[str], None] = "b3e8d51c7a92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "published_content",
+        sa.Column("entry_id", sa.UUID(), nullable=False),
+        sa.Column("organization_id", sa.UUID(), nullable=False),
+        sa.Column("content_type_id", sa.UUID(), nullable=False),
+        sa.Column("content_type_api_id", sa.String(length=100), nullable=False),
+        sa.Column("slug", sa.String(length=255), nullable=False),
+        sa.Column("published_at", sa.String(), nullable=True),
+        sa.Column("document", sa.Text(), nullable=False),
+        sa.Column("list_item", sa.Text(), nullable=False),
+        sa.Column(
+            "rendered_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["entry_id"], ["content_entries.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["content_type_id"], ["content_types.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("entry_id"),
+    )
+    op.create_index(
+        "ix_published_content_organization_id",
+        "published_content",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_published_content_type_slug",
+        "published_content",
+        ["content_type_id", "slug"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_published_content_type_published_entry",
+        "published_content",
+        ["content_type_id", "published_at", "entry_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_published_content_type_published_entry", table_name="published_content")
+    op.drop_index("ix_published_content_type_slug", table_name="published_content")
+    op.drop_index("ix_published_content_organization_id", table_name="published_content")
+    op.drop_table("published_content")
@@ -0,0 +1,34 @@
+"""add api key lookup hash
+
+Revision ID: d9a4e1b7c2f6
+Revises: c6d2f7a9e315
+Create Date: 2026-10-16 15:02:18.447102
+
+Adds api_keys.key_lookup, an HMAC-SHA256 of the key used to find the key row with one
+index seek. Existing keys keep NULL (the plain key is not stored) and are filled in on
+their first successful authentication.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a4e1b7c2f6"
+down_revision: Union[str, Sequence[str], None] = "c6d2f7a9e315"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("api_keys", sa.Column("key_lookup", sa.String(length=64), nullable=True))
+    op.create_index(op.f("ix_api_keys_key_lookup"), "api_keys", ["key_lookup"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_api_keys_key_lookup"), table_name="api_keys")
+    op.drop_column("api_keys", "key_lookup")
@@ -0,0 +1,69 @@
+"""add media blobs
+
+Revision ID: e1f3a7c9d2b4
+Revises: d9a4e1b7c2f6
+Create Date: 2026-10-16 18:41:52.208113
+
+Content-addressed media storage: media_blobs holds one row per stored file, keyed by
+its SHA-256 and reference counted, and media.content_hash points at it. Existing media
+keeps content_hash NULL and owns its file as before.
+
+Also adds media.thumbnail_path, which the thumbnail endpoints already write and read.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f3a7c9d2b4"
+down_revision: Union[str, Sequence[str], None] = "d9a4e1b7c2f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "media_blobs",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(length=1000), nullable=False),
+        sa.Column("file_size", sa.BigInteger(), nullable=False),
+        sa.Column("reference_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+    op.add_column("media", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index(op.f("ix_media_content_hash"), "media", ["content_hash"], unique=False)
+    op.create_foreign_key(
+        "fk_media_content_hash_media_blobs",
+        "media",
+        "media_blobs",
+        ["content_hash"],
+        ["content_hash"],
+    )
+    op.add_column("media", sa.Column("thumbnail_path", sa.String(length=1000), nullable=True))
+    op.create_index(op.f("ix_media_thumbnail_path"), "media", ["thumbnail_path"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_media_thumbnail_path"), table_name="media")
+    op.drop_column("media", "thumbnail_path")
+    op.drop_constraint("fk_media_content_hash_media_blobs", "media", type_="foreignkey")
+    op.drop_index(op.f("ix_media_content_hash"), table_name="media")
+    op.drop_column("media", "content_hash")
+    op.drop_table("media_blobs")
@@ -15,10 +15,11 @@ from backend.api.schemas.api_key import (
     APIKeyUpdateSchema,
     APIKeyWithSecretSchema,
 )
+from backend.core.api_key_auth import invalidate_api_key_cache
 from backend.core.dependencies import get_current_user
 from backend.core.exceptions import NotFoundException
 from backend.core.rate_limit import get_rate_limit, limiter
-from backend.core.security import generate_api_key, hash_api_key
+from backend.core.security import api_key_lookup_hash, generate_api_key, hash_api_key
 from backend.db.session import get_db
 from backend.models.api_key import APIKey
 from backend.models.user import User
@@ -59,6 +60,7 @@ def create_api_key(
         name=data.name,
         key_hash=key_hash,  # Store hashed key
         key_prefix=key_prefix,
+        key_lookup=api_key_lookup_hash(key),
         permissions=(
             ",".join(data.scopes) if data.scopes else None
         ),  # Store as comma-separated string
@@ -280,6 +282,7 @@ def update_api_key(
 
     db.commit()
     db.refresh(api_key)
+    invalidate_api_key_cache(api_key.id)
 
     scopes_list = api_key.permissions.split(",") if api_key.permissions else []
     return APIKeyResponseSchema(
@@ -341,6 +344,7 @@ def add_permissions_to_api_key(
     api_key.permissions = ",".join(current_scopes)
     db.commit()
     db.refresh(api_key)
+    invalidate_api_key_cache(api_key.id)
 
     return APIKeyResponseSchema(
         id=api_key.id,
@@ -388,5 +392,6 @@ def delete_api_key(
 
     db.delete(api_key)
     db.commit()
+    invalidate_api_key_cache(key_id)
 
     return None
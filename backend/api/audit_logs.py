@@ -8,10 +8,10 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
 from backend.core.dependencies import get_current_organization, get_current_user
+from backend.core.pagination import apply_keyset, build_keyset_page
 from backend.core.permissions import PermissionChecker
 from backend.core.rate_limit import get_rate_limit, limiter
 from backend.db.session import get_db
@@ -40,9 +40,10 @@ class AuditLogItem(BaseModel):
 
 class AuditLogListResponse(BaseModel):
     logs: List[AuditLogItem]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class AuditLogStatsResponse(BaseModel):
@@ -64,12 +65,17 @@ async def list_audit_logs(
     severity: Optional[str] = None,
     status: Optional[str] = None,
     days: Optional[int] = Query(7, ge=1, le=90),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     org: Organization = Depends(get_current_organization),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     Get audit logs with filtering and pagination
+
+    Pass a previous response's next_cursor as `cursor` to seek on (created_at, id)
+    instead of using OFFSET; set include_total=false to skip the COUNT query.
     """
     PermissionChecker.require_permission(current_user, "audit.logs", db)
     # Base query
@@ -93,15 +99,13 @@ async def list_audit_logs(
         query = query.filter(AuditLog.status == status)
 
     # Get total count
-    total = query.count()
+    total = query.count() if include_total else None
 
     # Paginate and order by newest first
-    logs = (
-        query.order_by(desc(AuditLog.created_at))
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    query = apply_keyset(db, query, AuditLog.created_at, AuditLog.id, page_size, cursor=cursor)
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    logs, next_cursor = build_keyset_page(query.all(), page_size, AuditLog.created_at, AuditLog.id)
 
     # Build response
     log_items = []
@@ -129,7 +133,9 @@ async def list_audit_logs(
             )
         )
 
-    return AuditLogListResponse(logs=log_items, total=total, page=page, page_size=page_size)
+    return AuditLogListResponse(
+        logs=log_items, total=total, page=page, page_size=page_size, next_cursor=next_cursor
+    )
 
 
 @router.get("/stats", response_model=AuditLogStatsResponse)
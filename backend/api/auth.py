@@ -29,9 +29,17 @@ from backend.api.schemas.auth import (
     UserResponse,
     UserUpdate,
 )
+from backend.core.api_key_auth import (
+    flush_api_key_usage,
+    invalidate_api_key_cache,
+    is_api_key_expired,
+    record_api_key_use,
+    verify_api_key,
+)
 from backend.core.avatar import get_gravatar_url
 from backend.core.dependencies import get_current_user, get_current_user_unverified
 from backend.core.permissions import PermissionChecker
+from backend.core.principals import invalidate_principals
 from backend.core.rate_limit import get_rate_limit, limiter
 from backend.core.security import (
     create_token_pair,
@@ -110,48 +118,35 @@ async def validate_api_key(
             message="No API key provided",
         )
 
-    # Query all active API keys
-    api_keys = db.query(APIKey).filter(APIKey.is_active == True).all()
-
-    # Check each key's hash
-    for api_key in api_keys:
-        if verify_password(x_api_key, api_key.key_hash):
-            # Check expiration
-            expires_at_value = api_key.expires_at
-            if isinstance(expires_at_value, str):
-                from dateutil import parser
-
-                expires_at_value = parser.parse(expires_at_value)
-
-            if expires_at_value and datetime.now(timezone.utc) > expires_at_value:
-                return ValidateApiKeyResponse(
-                    valid=False,
-                    message="API key has expired",
-                )
-
-            # Update last used timestamp
-            api_key.last_used_at = datetime.now(timezone.utc)
-            db.commit()
+    # Indexed lookup + one bcrypt check, or the verified-key cache
+    verified = verify_api_key(db, x_api_key)
+    if verified:
+        if is_api_key_expired(verified.expires_at):
+            return ValidateApiKeyResponse(
+                valid=False,
+                message="API key has expired",
+            )
 
-            # Parse permissions
-            permissions = api_key.permissions.split(",") if api_key.permissions else []
+        # Update last used timestamp (batched)
+        record_api_key_use(verified.api_key_id)
+        flush_api_key_usage(db)
 
-            # Get organization details
-            organization = (
-                db.query(Organization).filter(Organization.id == api_key.organization_id).first()
-            )
+        # Get organization details
+        organization = (
+            db.query(Organization).filter(Organization.id == verified.organization_id).first()
+        )
 
-            return ValidateApiKeyResponse(
-                valid=True,
-                organization_id=api_key.organization_id,
-                organization_name=organization.name if organization else None,
-                organization_slug=organization.slug if organization else None,
-                api_key_id=api_key.id,
-                api_key_name=api_key.name,
-                permissions=permissions,
-                expires_at=expires_at_value,
-                message="API key is valid",
-            )
+        return ValidateApiKeyResponse(
+            valid=True,
+            organization_id=verified.organization_id,
+            organization_name=organization.name if organization else None,
+            organization_slug=organization.slug if organization else None,
+            api_key_id=verified.api_key_id,
+            api_key_name=verified.name,
+            permissions=verified.permissions,
+            expires_at=verified.expires_at,
+            message="API key is valid",
+        )
 
     return ValidateApiKeyResponse(
         valid=False,
@@ -1155,6 +1150,11 @@ async def delete_account(
 
     db.commit()
 
+    if is_org_owner:
+        # The organization's API keys and users are gone; drop any still cached as verified
+        invalidate_api_key_cache()
+        invalidate_principals(user_ids=set(user_ids_to_delete))
+
     return DeleteAccountResponse(
         message="Account deleted successfully"
         + (
@@ -9,7 +9,9 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 logger = logging.getLogger(__name__)
@@ -52,9 +54,22 @@ from backend.api.schemas.content import (
     ContentTypeResponse,
     ContentTypeUpdate,
 )
-from backend.core.cache import invalidate_cache_pattern
-from backend.core.dependencies import get_current_user, get_current_user_flexible
+from backend.core.cache import CacheTags, invalidate_tags
+from backend.core.content_counts import invalidate_content_counts
+from backend.core.content_filters import DataFilter, apply_data_filters, parse_data_filters
+from backend.core.dependencies import (
+    get_current_user,
+    get_current_user_flexible,
+    get_current_user_flexible_async,
+)
+from backend.core.pagination import apply_keyset, build_keyset_page
+from backend.core.published_content import (
+    remove_published_content,
+    remove_published_content_for_type,
+    sync_published_content,
+)
 from backend.core.rate_limit import get_rate_limit, limiter
+from backend.core.responses import ORJSONResponse, RawJSON
 from backend.core.translation_service import get_translation_service
 from backend.core.webhook_service import (
     publish_content_created_sync,
@@ -62,7 +77,7 @@ from backend.core.webhook_service import (
     publish_content_published_sync,
     publish_content_updated_sync,
 )
-from backend.db.session import get_db
+from backend.db.session import get_async_db, get_db
 from backend.models.content import ContentEntry, ContentType
 from backend.models.translation import Locale, Translation
 from backend.models.user import User
@@ -71,15 +86,21 @@ router = APIRouter(prefix="/content", tags=["Content Management"])
 
 
 # Helper function to build ContentEntryResponse
-def build_entry_response(entry: ContentEntry) -> ContentEntryResponse:
-    """Helper to build ContentEntryResponse from ContentEntry model"""
+def build_entry_response(
+    entry: ContentEntry, content_type: Optional[ContentType] = None
+) -> ContentEntryResponse:
+    """
+    Helper to build ContentEntryResponse from ContentEntry model.
+
+    Pass ``content_type`` when it has already been resolved (see
+    ``build_entry_responses``) to avoid a lazy load of ``entry.content_type``.
+    """
     data = json.loads(entry.data) if entry.data else {}
     seo_data = json.loads(entry.seo_data) if entry.seo_data else {}
 
     # Build content_type object if relationship is loaded
     content_type_data = None
-    # Debug: what is in entry.content_type?
-    ct = entry.content_type
+    ct = content_type if content_type is not None else entry.content_type
     if ct:
         content_type_data = {
             "id": ct.id,
@@ -111,6 +132,63 @@ def build_entry_response(entry: ContentEntry) -> ContentEntryResponse:
     )
 
 
+def build_entry_payload(entry: ContentEntry, content_type: Optional[ContentType] = None) -> dict:
+    """
+    Fast-path equivalent of build_entry_response for ORJSONResponse.
+
+    Returns a plain dict shaped like ContentEntryResponse in which the stored ``data``
+    JSON is embedded as RawJSON, so it is never parsed or re-validated.
+    """
+    seo_data = json.loads(entry.seo_data) if entry.seo_data else {}
+
+    ct = content_type if content_type is not None else entry.content_type
+    content_type_data = {"id": ct.id, "name": ct.name, "api_id": ct.api_id} if ct else None
+
+    return {
+        "id": entry.id,
+        "content_type_id": entry.content_type_id,
+        "content_type": content_type_data,
+        "author_id": entry.author_id,
+        "data": RawJSON(entry.data or "{}"),
+        "slug": entry.slug,
+        "status": entry.status,
+        "version": entry.version,
+        "published_at": entry.published_at,
+        "seo_title": seo_data.get("seo_title"),
+        "seo_description": seo_data.get("seo_description"),
+        "seo_keywords": seo_data.get("seo_keywords"),
+        "og_image": seo_data.get("og_image"),
+        "created_at": entry.created_at,
+        "updated_at": entry.updated_at,
+    }
+
+
+def build_entry_responses(db: Session, entries: List[ContentEntry]) -> List[ContentEntryResponse]:
+    """
+    Build ContentEntryResponse objects for a page of entries in a constant number of queries.
+
+    Content types already loaded on the entries (e.g. via selectinload) are reused; any
+    missing ones are fetched with a single IN query instead of one query per entry.
+    The author is exposed only as ``author_id`` (a plain column), so no user rows are loaded.
+    """
+    content_types = {}
+    missing_type_ids = set()
+    for entry in entries:
+        if "content_type" in sa_inspect(entry).unloaded:
+            missing_type_ids.add(entry.content_type_id)
+        elif entry.content_type is not None:
+            content_types[entry.content_type_id] = entry.content_type
+
+    missing_type_ids -= content_types.keys()
+    if missing_type_ids:
+        for ct in db.query(ContentType).filter(ContentType.id.in_(missing_type_ids)).all():
+            content_types[ct.id] = ct
+
+    return [
+        build_entry_response(entry, content_types.get(entry.content_type_id)) for entry in entries
+    ]
+
+
 def auto_translate_entry_background(entry_id: UUID, organization_id: UUID, db: Session):
     """
     Background task to automatically translate content entry to all enabled locales with auto_translate=True.
@@ -519,6 +597,11 @@ async def update_content_type(
     db.commit()
     db.refresh(content_type)
 
+    # Invalidate cached totals of the type
+    await invalidate_tags(
+        CacheTags.content_list(current_user.organization_id, content_type.id),
+    )
+
     fields = parse_fields_schema(content_type.fields_schema)
     entry_count = (
         db.query(func.count(ContentEntry.id))
@@ -583,6 +666,11 @@ async def patch_content_type(
     db.commit()
     db.refresh(content_type)
 
+    # Invalidate cached totals of the type
+    await invalidate_tags(
+        CacheTags.content_list(current_user.organization_id, content_type.id),
+    )
+
     fields = parse_fields_schema(content_type.fields_schema)
     entry_count = (
         db.query(func.count(ContentEntry.id))
@@ -630,9 +718,17 @@ async def delete_content_type(
     if not content_type:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content type not found")
 
+    deleted_type_id = content_type.id
+    remove_published_content_for_type(db, content_type.id)
     db.delete(content_type)
     db.commit()
 
+    # Invalidate caches
+    await invalidate_tags(
+        CacheTags.content_list(current_user.organization_id, deleted_type_id),
+        CacheTags.sitemap(current_user.organization_id),
+    )
+
 
 # ContentEntry Endpoints
 
@@ -729,9 +825,13 @@ async def create_content_entry(
     )
 
     db.add(entry)
+    sync_published_content(db, entry, content_type)
     db.commit()
     db.refresh(entry)
 
+    # Invalidate cached list totals
+    await invalidate_content_counts(current_user.organization_id, entry.content_type_id)
+
     # Trigger automatic translation in background
     background_tasks.add_task(
         auto_translate_entry_background, entry.id, current_user.organization_id, db
@@ -757,131 +857,159 @@ async def create_content_entry(
     return build_entry_response(entry)
 
 
-@router.get("/entries", response_model=ContentEntryListResponse)
-@limiter.limit(get_rate_limit())
-async def list_content_entries(
-    request: Request,
-    current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db),
-    content_type_id: Optional[UUID] = Query(None),
-    content_type_slug: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    category_id: Optional[str] = Query(
-        None, description="Filter by category_id in data JSON field"
-    ),
-    brand_id: Optional[str] = Query(None, description="Filter by brand_id in data JSON field"),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1, le=100),
-):
+async def query_content_entries(
+    db: AsyncSession,
+    organization_id,
+    *,
+    content_type_id: Optional[UUID] = None,
+    content_type_slug: Optional[str] = None,
+    status: Optional[str] = None,
+    data_filters: Optional[List[DataFilter]] = None,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> ORJSONResponse:
     """
-    List content entries with pagination and filters.
-    Supports both JWT and API key authentication.
+    Shared implementation of the content entry listings.
 
-    Additional filters:
-    - category_id: Filter entries where data->category_id matches
-    - brand_id: Filter entries where data->brand_id matches
+    Entries are ordered newest first by (created_at, id) and paginated by offset, or by
+    keyset when a cursor is given. Data filters compile to indexable JSONB operators
+    (see backend.core.content_filters). The page is rendered as a ContentEntryListResponse
+    document by ORJSONResponse, embedding each entry's stored data without parsing it.
     """
-    logger.info(f"========== LIST ENTRIES CALLED - Page {page} ==========")
-
-    # Build subquery to filter by organization
-    from sqlalchemy import select
-
     content_type_subquery = (
         select(ContentType.id)
-        .where(ContentType.organization_id == current_user.organization_id)
+        .where(ContentType.organization_id == organization_id)
         .scalar_subquery()
     )
 
     # If filtering by slug, we need to get the content type first
     filter_content_type_id = content_type_id
     if content_type_slug:
-        content_type = (
-            db.query(ContentType)
-            .filter(
+        result = await db.execute(
+            select(ContentType.id).where(
                 ContentType.api_id == content_type_slug,
-                ContentType.organization_id == current_user.organization_id,
+                ContentType.organization_id == organization_id,
             )
-            .first()
         )
-        if content_type:
-            filter_content_type_id = content_type.id
-        else:
+        filter_content_type_id = result.scalars().first()
+        if not filter_content_type_id:
             # No matching content type found, return empty result
-            return ContentEntryListResponse(
-                items=[], total=0, page=page, page_size=page_size, pages=0
+            return ORJSONResponse(
+                {
+                    "items": [],
+                    "total": 0,
+                    "page": page,
+                    "page_size": page_size,
+                    "pages": 0,
+                    "next_cursor": None,
+                }
             )
 
-    query = (
-        db.query(ContentEntry)
-        .filter(ContentEntry.content_type_id.in_(content_type_subquery))
-        .options(selectinload(ContentEntry.content_type))
-    )
-    logger.info("Query configured with selectinload and scalar_subquery")
+    stmt = select(ContentEntry).where(ContentEntry.content_type_id.in_(content_type_subquery))
 
     if filter_content_type_id:
-        query = query.filter(ContentEntry.content_type_id == filter_content_type_id)
+        stmt = stmt.where(ContentEntry.content_type_id == filter_content_type_id)
 
     if status:
-        query = query.filter(ContentEntry.status == status)
+        stmt = stmt.where(ContentEntry.status == status)
 
-    # Filter by category_id in JSON data field (data is stored as Text, cast to JSON)
-    if category_id:
-        from sqlalchemy import cast
-        from sqlalchemy.dialects.postgresql import JSON
+    stmt = apply_data_filters(db, stmt, ContentEntry.data, data_filters or [])
 
-        query = query.filter(cast(ContentEntry.data, JSON)["category_id"].astext == category_id)
-        logger.info(f"Filtering by category_id: {category_id}")
+    total = None
+    if include_total:
+        result = await db.execute(select(func.count()).select_from(stmt.subquery()))
+        total = result.scalar_one()
 
-    # Filter by brand_id in JSON data field (data is stored as Text, cast to JSON)
-    if brand_id:
-        from sqlalchemy import cast
-        from sqlalchemy.dialects.postgresql import JSON
+    stmt = apply_keyset(
+        db,
+        stmt.options(selectinload(ContentEntry.content_type)),
+        ContentEntry.created_at,
+        ContentEntry.id,
+        page_size,
+        cursor=cursor,
+    )
+    if not cursor:
+        stmt = stmt.offset((page - 1) * page_size)
+    result = await db.execute(stmt)
+    entries, next_cursor = build_keyset_page(
+        result.scalars().all(), page_size, ContentEntry.created_at, ContentEntry.id
+    )
 
-        query = query.filter(cast(ContentEntry.data, JSON)["brand_id"].astext == brand_id)
-        logger.info(f"Filtering by brand_id: {brand_id}")
+    # content_type is eager-loaded above, so this never lazy-loads on the async session
+    items = [build_entry_payload(entry) for entry in entries]
 
-    total = query.count()
-    logger.info(f"Total entries: {total}")
-    entries = query.offset((page - 1) * page_size).limit(page_size).all()
+    pages = (total + page_size - 1) // page_size if total is not None else None
 
-    items = []
-    for entry in entries:
-        data = json.loads(entry.data) if entry.data else {}
-        seo_data = json.loads(entry.seo_data) if entry.seo_data else {}
+    return ORJSONResponse(
+        {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": pages,
+            "next_cursor": next_cursor,
+        }
+    )
 
-        # FORCE fetch content type from database
-        ct_from_db = db.query(ContentType).filter(ContentType.id == entry.content_type_id).first()
-        content_type_data = None
-        if ct_from_db:
-            content_type_data = {
-                "id": ct_from_db.id,
-                "name": ct_from_db.name,
-                "api_id": ct_from_db.api_id,
-            }
-
-        item = ContentEntryResponse(
-            id=entry.id,
-            content_type_id=entry.content_type_id,
-            content_type=content_type_data,  # Add inline
-            author_id=entry.author_id,
-            data=data,
-            slug=entry.slug,
-            status=entry.status,
-            version=entry.version,
-            published_at=entry.published_at,
-            seo_title=seo_data.get("seo_title"),
-            seo_description=seo_data.get("seo_description"),
-            seo_keywords=seo_data.get("seo_keywords"),
-            og_image=seo_data.get("og_image"),
-            created_at=entry.created_at,
-            updated_at=entry.updated_at,
-        )
-        items.append(item)
 
-    pages = (total + page_size - 1) // page_size
+@router.get("/entries", response_model=ContentEntryListResponse)
+@limiter.limit(get_rate_limit())
+async def list_content_entries(
+    request: Request,
+    current_user: User = Depends(get_current_user_flexible_async),
+    db: AsyncSession = Depends(get_async_db),
+    content_type_id: Optional[UUID] = Query(None),
+    content_type_slug: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    category_id: Optional[str] = Query(
+        None, description="Filter by category_id in data JSON field"
+    ),
+    brand_id: Optional[str] = Query(None, description="Filter by brand_id in data JSON field"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous response's next_cursor (keyset mode)"
+    ),
+    include_total: bool = Query(True, description="Compute total/pages (costs a COUNT query)"),
+):
+    """
+    List content entries with pagination and filters.
+    Supports both JWT and API key authentication.
+
+    Entries are ordered newest first by (created_at, id). Every response carries a
+    next_cursor while more entries remain; passing it back as `cursor` switches to keyset
+    pagination, which seeks past the previous page instead of using OFFSET and ignores `page`.
+    Set include_total=false to skip the COUNT query on large tenants.
+
+    Field filters on the entry data (repeatable, combined with AND):
+    - filter[data.<path>]=value or filter[data.<path>][eq]=value
+    - filter[data.<path>][in]=a,b,c
+    - filter[data.<path>][gt]=10 / filter[data.<path>][lt]=10
+    - filter[data.<path>][contains]=value (array at <path> contains value)
 
-    return ContentEntryListResponse(
-        items=items, total=total, page=page, page_size=page_size, pages=pages
+    Shorthand filters:
+    - category_id: Same as filter[data.category_id]=<value>
+    - brand_id: Same as filter[data.brand_id]=<value>
+    """
+    data_filters = parse_data_filters(request.query_params)
+    if category_id:
+        data_filters.append(DataFilter(path=("category_id",), op="eq", value=category_id))
+    if brand_id:
+        data_filters.append(DataFilter(path=("brand_id",), op="eq", value=brand_id))
+
+    return await query_content_entries(
+        db,
+        current_user.organization_id,
+        content_type_id=content_type_id,
+        content_type_slug=content_type_slug,
+        status=status,
+        data_filters=data_filters,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -890,83 +1018,29 @@ async def list_content_entries(
 async def get_products_by_category(
     request: Request,
     category_id: str,
-    current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_flexible_async),
+    db: AsyncSession = Depends(get_async_db),
     status: Optional[str] = Query("published"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
 ):
     """
     Get products filtered by category_id with pagination.
-    Filters products where data->category_id matches the provided category_id.
-    """
-    logger.info(f"Getting products by category_id: {category_id}")
-
-    # Get product content type
-    product_type = (
-        db.query(ContentType)
-        .filter(
-            ContentType.api_id == "product",
-            ContentType.organization_id == current_user.organization_id,
-        )
-        .first()
-    )
-
-    if not product_type:
-        return ContentEntryListResponse(items=[], total=0, page=page, page_size=page_size, pages=0)
-
-    # Query products with category_id filter using PostgreSQL JSON
-    from sqlalchemy import text
-
-    query = db.query(ContentEntry).filter(
-        ContentEntry.content_type_id == product_type.id,
-        text("data::json->>'category_id' = :cat_id").bindparams(cat_id=category_id),
-    )
-
-    if status:
-        query = query.filter(ContentEntry.status == status)
-
-    total = query.count()
-    entries = query.offset((page - 1) * page_size).limit(page_size).all()
-
-    items = []
-    for entry in entries:
-        data = json.loads(entry.data) if entry.data else {}
-        seo_data = json.loads(entry.seo_data) if entry.seo_data else {}
-
-        ct_from_db = db.query(ContentType).filter(ContentType.id == entry.content_type_id).first()
-        content_type_data = None
-        if ct_from_db:
-            content_type_data = {
-                "id": ct_from_db.id,
-                "name": ct_from_db.name,
-                "api_id": ct_from_db.api_id,
-            }
-
-        item = ContentEntryResponse(
-            id=entry.id,
-            content_type_id=entry.content_type_id,
-            content_type=content_type_data,
-            author_id=entry.author_id,
-            data=data,
-            slug=entry.slug,
-            status=entry.status,
-            version=entry.version,
-            published_at=entry.published_at,
-            seo_title=seo_data.get("seo_title"),
-            seo_description=seo_data.get("seo_description"),
-            seo_keywords=seo_data.get("seo_keywords"),
-            og_image=seo_data.get("og_image"),
-            created_at=entry.created_at,
-            updated_at=entry.updated_at,
-        )
-        items.append(item)
-
-    pages = (total + page_size - 1) // page_size
-    logger.info(f"Found {total} products for category {category_id}")
 
-    return ContentEntryListResponse(
-        items=items, total=total, page=page, page_size=page_size, pages=pages
+    Alias for /entries?content_type_slug=product&filter[data.category_id]=<category_id>.
+    """
+    return await query_content_entries(
+        db,
+        current_user.organization_id,
+        content_type_slug="product",
+        status=status,
+        data_filters=[DataFilter(path=("category_id",), op="eq", value=category_id)],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -975,83 +1049,29 @@ async def get_products_by_category(
 async def get_products_by_brand(
     request: Request,
     brand_id: str,
-    current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_flexible_async),
+    db: AsyncSession = Depends(get_async_db),
     status: Optional[str] = Query("published"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
 ):
     """
     Get products filtered by brand_id with pagination.
-    Filters products where data->brand_id matches the provided brand_id.
-    """
-    logger.info(f"Getting products by brand_id: {brand_id}")
-
-    # Get product content type
-    product_type = (
-        db.query(ContentType)
-        .filter(
-            ContentType.api_id == "product",
-            ContentType.organization_id == current_user.organization_id,
-        )
-        .first()
-    )
-
-    if not product_type:
-        return ContentEntryListResponse(items=[], total=0, page=page, page_size=page_size, pages=0)
-
-    # Query products with brand_id filter using PostgreSQL JSON
-    from sqlalchemy import text
-
-    query = db.query(ContentEntry).filter(
-        ContentEntry.content_type_id == product_type.id,
-        text("data::json->>'brand_id' = :brand_id").bindparams(brand_id=brand_id),
-    )
-
-    if status:
-        query = query.filter(ContentEntry.status == status)
-
-    total = query.count()
-    entries = query.offset((page - 1) * page_size).limit(page_size).all()
-
-    items = []
-    for entry in entries:
-        data = json.loads(entry.data) if entry.data else {}
-        seo_data = json.loads(entry.seo_data) if entry.seo_data else {}
 
-        ct_from_db = db.query(ContentType).filter(ContentType.id == entry.content_type_id).first()
-        content_type_data = None
-        if ct_from_db:
-            content_type_data = {
-                "id": ct_from_db.id,
-                "name": ct_from_db.name,
-                "api_id": ct_from_db.api_id,
-            }
-
-        item = ContentEntryResponse(
-            id=entry.id,
-            content_type_id=entry.content_type_id,
-            content_type=content_type_data,
-            author_id=entry.author_id,
-            data=data,
-            slug=entry.slug,
-            status=entry.status,
-            version=entry.version,
-            published_at=entry.published_at,
-            seo_title=seo_data.get("seo_title"),
-            seo_description=seo_data.get("seo_description"),
-            seo_keywords=seo_data.get("seo_keywords"),
-            og_image=seo_data.get("og_image"),
-            created_at=entry.created_at,
-            updated_at=entry.updated_at,
-        )
-        items.append(item)
-
-    pages = (total + page_size - 1) // page_size
-    logger.info(f"Found {total} products for brand {brand_id}")
-
-    return ContentEntryListResponse(
-        items=items, total=total, page=page, page_size=page_size, pages=pages
+    Alias for /entries?content_type_slug=product&filter[data.brand_id]=<brand_id>.
+    """
+    return await query_content_entries(
+        db,
+        current_user.organization_id,
+        content_type_slug="product",
+        status=status,
+        data_filters=[DataFilter(path=("brand_id",), op="eq", value=brand_id)],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -1126,7 +1146,7 @@ async def get_content_entry(
                 # Create a temporary copy of entry with merged data
                 entry.data = json.dumps(merged_data)
 
-    return build_entry_response(entry)
+    return ORJSONResponse(build_entry_payload(entry))
 
 
 @router.put("/entries/{entry_id}", response_model=ContentEntryResponse)
@@ -1195,13 +1215,14 @@ async def update_content_entry(
         if seo_changed:
             entry.seo_data = json.dumps(seo_data)
 
+    sync_published_content(db, entry)
     db.commit()
     db.refresh(entry)
 
-    # Invalidate caches
-    await invalidate_cache_pattern(f"content:entry:{current_user.organization_id}:{entry_id}*")
-    await invalidate_cache_pattern(f"content:list:{current_user.organization_id}*")
-    await invalidate_cache_pattern(f"seo:*:{current_user.organization_id}:{entry_id}*")
+    # Invalidate cached totals of the entry's type
+    await invalidate_tags(
+        CacheTags.content_list(current_user.organization_id, entry.content_type_id),
+    )
 
     # Auto-update translations if content data changed
     if entry_data.data is not None:
@@ -1258,13 +1279,15 @@ async def publish_content_entry(
     entry.status = "published"
     entry.published_at = publish_data.publish_at or datetime.now(timezone.utc)
 
+    sync_published_content(db, entry)
     db.commit()
     db.refresh(entry)
 
     # Invalidate caches
-    await invalidate_cache_pattern(f"content:entry:{current_user.organization_id}:{entry_id}*")
-    await invalidate_cache_pattern(f"content:list:{current_user.organization_id}*")
-    await invalidate_cache_pattern(f"seo:sitemap:{current_user.organization_id}*")
+    await invalidate_tags(
+        CacheTags.content_list(current_user.organization_id, entry.content_type_id),
+        CacheTags.sitemap(current_user.organization_id),
+    )
 
     # Publish webhook event
     background_tasks.add_task(
@@ -1282,7 +1305,7 @@ async def publish_content_entry(
     except Exception as e:
         print(f"Failed to update search index: {e}")
 
-    return build_entry_response(entry)
+    return build_entry_responses(db, [entry])[0]
 
 
 @router.delete("/entries/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1311,16 +1334,18 @@ async def delete_content_entry(
 
     # Store ID and org for webhook before deletion
     content_id = entry.id
+    content_type_id = entry.content_type_id
     org_id = current_user.organization_id
 
+    remove_published_content(db, entry.id)
     db.delete(entry)
     db.commit()
 
     # Invalidate caches
-    await invalidate_cache_pattern(f"content:entry:{current_user.organization_id}:{entry_id}*")
-    await invalidate_cache_pattern(f"content:list:{current_user.organization_id}*")
-    await invalidate_cache_pattern(f"translation:*:{current_user.organization_id}*")
-    await invalidate_cache_pattern(f"seo:*:{current_user.organization_id}*")
+    await invalidate_tags(
+        CacheTags.content_list(org_id, content_type_id),
+        CacheTags.sitemap(org_id),
+    )
 
     # Publish webhook event
     background_tasks.add_task(
@@ -1411,6 +1436,8 @@ async def duplicate_content_entry(
     db.commit()
 
     # Invalidate caches
-    await invalidate_cache_pattern(f"content:list:{current_user.organization_id}*")
+    await invalidate_tags(
+        CacheTags.content_list(current_user.organization_id, new_entry.content_type_id)
+    )
 
-    return build_entry_response(new_entry)
+    return build_entry_responses(db, [new_entry])[0]
@@ -3,33 +3,90 @@ Content Delivery API - optimized endpoints for frontend consumption.
 CDN-friendly with minimal payloads and edge caching support.
 """
 
-import json
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.schemas.delivery import (
     DeliveryContentDetailResponse,
     DeliveryContentListResponse,
-    DeliveryContentResponse,
 )
+from backend.core.cache_warming import access_tracker, cache_warming_service
+from backend.core.content_counts import content_count_key, content_count_tags, count_rows
+from backend.core.content_filters import apply_data_filters, parse_data_filters
+from backend.core.pagination import apply_keyset, build_keyset_page
 from backend.core.rate_limit import get_rate_limit, limiter
-from backend.db.session import get_db
+from backend.core.responses import ORJSONResponse, RawJSON
+from backend.db.session import AsyncSessionLocal, get_async_db
 from backend.models.content import ContentEntry, ContentType
+from backend.models.published_content import PublishedContent
 
 router = APIRouter(prefix="/delivery", tags=["delivery"])
 
 
+def _stored_json_response(content, max_age: int, cdn_max_age: int) -> ORJSONResponse:
+    """Render content (stored documents wrapped in RawJSON) with CDN cache headers"""
+    return ORJSONResponse(
+        content,
+        headers={
+            "Cache-Control": f"public, max-age={max_age}",
+            "CDN-Cache-Control": f"public, max-age={cdn_max_age}",
+        },
+    )
+
+
+async def _get_content_type(db: AsyncSession, api_id: str) -> ContentType:
+    ct_result = await db.execute(select(ContentType).where(ContentType.api_id == api_id))
+    content_type_obj = ct_result.scalar_one_or_none()
+
+    if not content_type_obj:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content type not found")
+
+    return content_type_obj
+
+
+def _published_list_statement(content_type_id):
+    return select(
+        PublishedContent.list_item, PublishedContent.published_at, PublishedContent.entry_id
+    ).where(PublishedContent.content_type_id == content_type_id)
+
+
+async def _count_published(db: AsyncSession, organization_id, content_type_id, stmt, approximate):
+    """Total of a content type's published listing, cached per type"""
+    return await count_rows(
+        db,
+        stmt,
+        cache_key=content_count_key(organization_id, content_type_id, "published"),
+        approximate=approximate,
+        tags=content_count_tags(organization_id, content_type_id),
+    )
+
+
+async def warm_published_count(organization_id: str, content_type_id: str) -> None:
+    """Cache warmer for delivery listing totals (see backend.core.cache_warming)"""
+    async with AsyncSessionLocal() as db:
+        await _count_published(
+            db,
+            organization_id,
+            content_type_id,
+            _published_list_statement(content_type_id),
+            approximate=False,
+        )
+
+
+cache_warming_service.register("published_count", warm_published_count)
+
+
 @router.get("/content/slug/{slug}", response_model=DeliveryContentDetailResponse)
 @limiter.limit(get_rate_limit())
 async def get_content_by_slug(
     request: Request,
     slug: str,
     content_type: str,
-    response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get published content by slug (CDN-friendly).
@@ -38,89 +95,43 @@ async def get_content_by_slug(
     - content_type: API ID of the content type
     """
     # Get content type first
-    ct_result = db.execute(select(ContentType).where(ContentType.api_id == content_type))
-    content_type_obj = ct_result.scalar_one_or_none()
+    content_type_obj = await _get_content_type(db, content_type)
 
-    if not content_type_obj:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content type not found")
-
-    # Get published content entry
-    result = db.execute(
-        select(ContentEntry).where(
-            ContentEntry.slug == slug,
-            ContentEntry.content_type_id == content_type_obj.id,
-            ContentEntry.status == "published",
+    # Get the pre-rendered published document
+    result = await db.execute(
+        select(PublishedContent.document).where(
+            PublishedContent.content_type_id == content_type_obj.id,
+            PublishedContent.slug == slug,
         )
     )
-    entry = result.scalar_one_or_none()
+    document = result.scalars().first()
 
-    if not entry:
+    if document is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
 
-    # Set cache headers for CDN (1 hour cache)
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    response.headers["CDN-Cache-Control"] = "public, max-age=86400"  # 24 hours for CDN
-
-    # Parse fields
-    fields = json.loads(entry.data) if isinstance(entry.data, str) else entry.data
-    seo_data = (
-        json.loads(entry.seo_data) if entry.seo_data and isinstance(entry.seo_data, str) else {}
-    )
-
-    return DeliveryContentDetailResponse(
-        id=str(entry.id),
-        slug=entry.slug,
-        title=entry.title,
-        fields=fields,
-        published_at=entry.published_at,
-        updated_at=entry.updated_at,
-        seo_title=seo_data.get("title"),
-        seo_description=seo_data.get("description"),
-        seo_keywords=seo_data.get("keywords"),
-        canonical_url=seo_data.get("canonical_url"),
-    )
+    # 1 hour browser cache, 24 hours for CDN
+    return _stored_json_response(RawJSON(document), max_age=3600, cdn_max_age=86400)
 
 
 @router.get("/content/{content_id}", response_model=DeliveryContentDetailResponse)
 @limiter.limit(get_rate_limit())
 async def get_content_by_id(
-    request: Request, content_id: UUID, response: Response, db: Session = Depends(get_db)
+    request: Request,
+    content_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get published content by ID (CDN-friendly).
     """
-    result = db.execute(
-        select(ContentEntry).where(
-            ContentEntry.id == content_id, ContentEntry.status == "published"
-        )
+    result = await db.execute(
+        select(PublishedContent.document).where(PublishedContent.entry_id == content_id)
     )
-    entry = result.scalar_one_or_none()
+    document = result.scalar_one_or_none()
 
-    if not entry:
+    if document is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
 
-    # Set cache headers
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    response.headers["CDN-Cache-Control"] = "public, max-age=86400"
-
-    # Parse fields
-    fields = json.loads(entry.data) if isinstance(entry.data, str) else entry.data
-    seo_data = (
-        json.loads(entry.seo_data) if entry.seo_data and isinstance(entry.seo_data, str) else {}
-    )
-
-    return DeliveryContentDetailResponse(
-        id=str(entry.id),
-        slug=entry.slug,
-        title=entry.title,
-        fields=fields,
-        published_at=entry.published_at,
-        updated_at=entry.updated_at,
-        seo_title=seo_data.get("title"),
-        seo_description=seo_data.get("description"),
-        seo_keywords=seo_data.get("keywords"),
-        canonical_url=seo_data.get("canonical_url"),
-    )
+    return _stored_json_response(RawJSON(document), max_age=3600, cdn_max_age=86400)
 
 
 @router.get("/content", response_model=DeliveryContentListResponse)
@@ -130,8 +141,10 @@ async def list_content(
     content_type: str,
     page: int = 1,
     page_size: int = 20,
-    response: Response = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    approximate_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     List published content by type (CDN-friendly).
@@ -140,56 +153,78 @@ async def list_content(
     - content_type: API ID of the content type
     - page: Page number (default 1)
     - page_size: Items per page (default 20, max 100)
+    - cursor: next_cursor from a previous page; seeks on (published_at, id) instead of
+      using OFFSET, and `page` is ignored
+    - include_total: Set to false to skip counting the published entries
+    - approximate_total: Allow a planner estimate for very large content types; the
+      response then carries `X-Total-Count-Approximate: true`
+    - filter[data.<path>][eq|in|gt|lt|contains]: Field filters on the entry data
     """
     # Limit page size
     page_size = min(page_size, 100)
     offset = (page - 1) * page_size
 
     # Get content type
-    ct_result = db.execute(select(ContentType).where(ContentType.api_id == content_type))
-    content_type_obj = ct_result.scalar_one_or_none()
-
-    if not content_type_obj:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content type not found")
-
-    # Get total count
-    count_result = db.execute(
-        select(ContentEntry).where(
-            ContentEntry.content_type_id == content_type_obj.id, ContentEntry.status == "published"
+    content_type_obj = await _get_content_type(db, content_type)
+
+    data_filters = parse_data_filters(request.query_params)
+    base_stmt = _published_list_statement(content_type_obj.id)
+    if data_filters:
+        # Filters run against content_entries.data (GIN-indexed on PostgreSQL)
+        matching_ids = apply_data_filters(
+            db,
+            select(ContentEntry.id).where(ContentEntry.content_type_id == content_type_obj.id),
+            ContentEntry.data,
+            data_filters,
         )
-    )
-    total = len(list(count_result.scalars().all()))
-
-    # Get paginated entries
-    result = db.execute(
-        select(ContentEntry)
-        .where(
-            ContentEntry.content_type_id == content_type_obj.id, ContentEntry.status == "published"
+        base_stmt = base_stmt.where(PublishedContent.entry_id.in_(matching_ids))
+
+    # Get total count (cached per content type unless ad-hoc filters are applied)
+    total = None
+    is_approximate = False
+    if include_total and data_filters:
+        total, is_approximate = await count_rows(db, base_stmt, approximate=approximate_total)
+    elif include_total:
+        access_tracker.record(
+            content_type_obj.organization_id,
+            "published_count",
+            content_type_id=content_type_obj.id,
         )
-        .order_by(ContentEntry.published_at.desc())
-        .offset(offset)
-        .limit(page_size)
-    )
-    entries = result.scalars().all()
-
-    # Set cache headers
-    if response:
-        response.headers["Cache-Control"] = "public, max-age=1800"  # 30 minutes
-        response.headers["CDN-Cache-Control"] = "public, max-age=3600"  # 1 hour for CDN
-
-    # Build response
-    items = []
-    for entry in entries:
-        fields = json.loads(entry.data) if isinstance(entry.data, str) else entry.data
-        items.append(
-            DeliveryContentResponse(
-                id=str(entry.id),
-                slug=entry.slug,
-                title=entry.title,
-                fields=fields,
-                published_at=entry.published_at,
-                updated_at=entry.updated_at,
-            )
+        total, is_approximate = await _count_published(
+            db,
+            content_type_obj.organization_id,
+            content_type_obj.id,
+            base_stmt,
+            approximate_total,
         )
 
-    return DeliveryContentListResponse(items=items, total=total, page=page, page_size=page_size)
+    # Get paginated entries (newest first, keyset seek when a cursor is given)
+    stmt = apply_keyset(
+        db,
+        base_stmt,
+        PublishedContent.published_at,
+        PublishedContent.entry_id,
+        page_size,
+        cursor=cursor,
+    )
+    if not cursor:
+        stmt = stmt.offset(offset)
+    result = await db.execute(stmt)
+    rows, next_cursor = build_keyset_page(
+        result.all(), page_size, PublishedContent.published_at, PublishedContent.entry_id
+    )
+
+    # Embed the stored item documents in the list envelope
+    body = {
+        "items": [RawJSON(row.list_item) for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    }
+
+    # 30 minutes browser cache, 1 hour for CDN
+    response = _stored_json_response(body, max_age=1800, cdn_max_age=3600)
+    if is_approximate:
+        response.headers["X-Total-Count-Approximate"] = "true"
+    return response
@@ -2,12 +2,16 @@
 Media Management API Endpoints
 """
 
+import asyncio
 import json
+from collections import Counter
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
 from uuid import UUID
 
+from botocore.exceptions import ClientError
 from fastapi import (
     APIRouter,
     BackgroundTasks,
@@ -19,13 +23,18 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
-from sqlalchemy import func, or_, select
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.api.schemas.media import (
     BulkDeleteRequest,
     BulkDeleteResponse,
+    GenerateVariantsRequest,
+    GenerateVariantsResponse,
+    ImageVariant,
     MediaListResponse,
     MediaResponse,
     MediaStats,
@@ -36,22 +45,43 @@ from backend.api.schemas.media import (
     ThumbnailResponse,
 )
 from backend.core.cache_middleware import add_cache_headers
+from backend.core.cache import single_flight
 from backend.core.dependencies import get_current_user_flexible
+from backend.core.image_transforms import ImageTransform, render_variants, variant_prefix
+from backend.core.image_worker import ImageWorkerBusy, image_worker
+from backend.core.media_blobs import (
+    acquire_blob,
+    blob_path,
+    register_blob,
+    releasable_blobs,
+    release_blob,
+    release_blobs,
+)
+from backend.core.media_lookup import (
+    MediaFile,
+    forget_media_file,
+    lookup_media_file,
+    lookup_thumbnail_file,
+    remember_media_file,
+)
 from backend.core.media_utils import (
+    FileTooLargeError,
+    UploadStream,
     create_thumbnail,
     ensure_upload_directories,
     generate_unique_filename,
     get_file_extension,
-    get_image_dimensions,
+    get_max_file_size,
     get_media_type,
     get_mime_type,
+    read_chunks,
     validate_file_extension,
     validate_file_size,
 )
 from backend.core.rate_limit import get_rate_limit, limiter
 from backend.core.storage import get_storage_backend
 from backend.core.webhook_service import publish_media_deleted_sync, publish_media_uploaded_sync
-from backend.db.session import get_db
+from backend.db.session import get_async_db, get_db
 from backend.models.media import Media
 from backend.models.user import User
 
@@ -60,6 +90,203 @@ router = APIRouter(prefix="/media", tags=["media"])
 # Ensure upload directories exist on module load
 ensure_upload_directories()
 
+# Bytes per chunk when streaming S3 objects through the proxy
+PROXY_CHUNK_SIZE = 64 * 1024
+
+
+def _image_worker_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Image processing is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _render_variants(
+    storage, file_path: str, source_key: str, transforms: List[ImageTransform]
+) -> List[bytes]:
+    """Render variants of an image in the image worker, decoding it once, and store them"""
+    from backend.core.storage import LocalStorageBackend
+
+    if isinstance(storage, LocalStorageBackend):
+        source_path = storage.get_full_path(file_path)
+        if not source_path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
+            )
+        source = await run_in_threadpool(source_path.read_bytes)
+    else:
+        source, _ = await run_in_threadpool(storage.get_file_content, file_path)
+
+    try:
+        contents = await image_worker.run(render_variants, source, transforms)
+    except ImageWorkerBusy:
+        raise _image_worker_busy()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Image cannot be transformed"
+        )
+
+    for transform, content in zip(transforms, contents):
+        await run_in_threadpool(storage.save_file, content, transform.variant_path(source_key))
+    return contents
+
+
+def _etag_matches(header: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    add_cache_headers(response, max_age=31536000, public=True)
+    return response
+
+
+def _local_file_response(request: Request, storage, media_file: MediaFile) -> Response:
+    """Serve a local media file, answering If-None-Match; FileResponse handles ranges"""
+    file_path = storage.get_full_path(media_file.file_path)
+    etag = media_file.etag
+    if etag is None:
+        stat_result = file_path.stat()
+        etag = f'"{int(stat_result.st_mtime):x}-{stat_result.st_size:x}"'
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag)
+
+    response = FileResponse(
+        path=file_path,
+        media_type=media_file.mime_type,
+        filename=media_file.original_filename,
+        headers={"etag": etag},
+    )
+    # Add CDN cache headers (1 year for immutable media)
+    add_cache_headers(response, max_age=31536000, public=True)
+    return response
+
+
+def _s3_error_code(error: ClientError) -> str:
+    return str(error.response.get("Error", {}).get("Code", ""))
+
+
+def _iter_s3_body(body) -> Iterator[bytes]:
+    try:
+        yield from body.iter_chunks(PROXY_CHUNK_SIZE)
+    finally:
+        body.close()
+
+
+async def _s3_stream_response(request: Request, storage, media_file: MediaFile) -> Response:
+    """Stream an S3 object, or the requested byte range of it, without buffering it"""
+    etag = media_file.etag
+    if_none_match = request.headers.get("if-none-match")
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    byte_range = request.headers.get("range")
+    if byte_range and "," in byte_range:
+        byte_range = None  # S3 serves single ranges only; send the whole file instead
+    if_range = request.headers.get("if-range")
+    if_match = None
+    if byte_range and if_range:
+        if etag is not None:
+            byte_range = byte_range if if_range == etag else None
+        elif if_range.startswith('"'):
+            if_match = if_range  # Compared with the object's ETag by S3
+        else:
+            byte_range = None  # HTTP-date validator: send the whole file
+
+    try:
+        try:
+            s3_object = await run_in_threadpool(
+                storage.open_stream,
+                media_file.file_path,
+                byte_range,
+                if_match,
+                None if etag else if_none_match,
+            )
+        except ClientError as e:
+            if _s3_error_code(e) not in ("PreconditionFailed", "412"):
+                raise
+            # The If-Range validator is stale: send the whole current file
+            s3_object = await run_in_threadpool(storage.open_stream, media_file.file_path)
+    except ClientError as e:
+        code = _s3_error_code(e)
+        if code in ("304", "NotModified"):
+            headers = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+            return _not_modified(headers.get("etag", if_none_match))
+        if code == "InvalidRange":
+            return Response(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{media_file.file_size}"},
+            )
+        if code in ("NoSuchKey", "404"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve file: {str(e)}",
+        )
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(s3_object["ContentLength"]),
+        "Content-Disposition": f'inline; filename="{media_file.original_filename}"',
+        "ETag": etag or s3_object.get("ETag", ""),
+    }
+    if s3_object.get("ContentRange"):
+        headers["Content-Range"] = s3_object["ContentRange"]
+
+    response = StreamingResponse(
+        _iter_s3_body(s3_object["Body"]),
+        status_code=(
+            status.HTTP_206_PARTIAL_CONTENT if s3_object.get("ContentRange") else status.HTTP_200_OK
+        ),
+        media_type=media_file.mime_type or s3_object.get("ContentType"),
+        headers=headers,
+    )
+    add_cache_headers(response, max_age=31536000, public=True)
+    return response
+
+
+def _delete_media_row(db: Session, media: Media) -> Tuple[List[str], List[str]]:
+    """
+    Delete a media row and release its reference to the stored blob
+
+    Returns:
+        Storage paths no media references anymore, and the content keys whose image
+        variants can go with them; to delete before committing
+    """
+    file_paths = [media.thumbnail_path] if media.thumbnail_path else []
+    source_keys = []
+    db.delete(media)
+    db.flush()
+
+    if media.content_hash is None:
+        # Uploaded before deduplication: the file belongs to this media alone
+        file_paths.append(media.file_path)
+        source_keys.append(str(media.id))
+    else:
+        blob_file_path = release_blob(db, media.content_hash)
+        if blob_file_path:
+            file_paths.append(blob_file_path)
+            source_keys.append(media.content_hash)
+    return file_paths, source_keys
+
+
+def _delete_stored_files(storage, file_paths: List[str], source_keys: List[str]):
+    """Delete files released by _delete_media_row, and their image variants"""
+    for file_path in file_paths:
+        storage.delete_file(file_path)
+    for source_key in source_keys:
+        storage.delete_prefix(variant_prefix(source_key))
+
 
 @router.post("/upload", response_model=MediaUploadResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit(get_rate_limit())
@@ -90,18 +317,15 @@ async def upload_media(
     if not is_valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
 
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
-
     # Get MIME type
     mime_type = file.content_type or get_mime_type(file.filename)
     extension = get_file_extension(file.filename)
 
-    # Validate file size
-    is_valid, error_msg = validate_file_size(file_size, mime_type, extension)
-    if not is_valid:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
+    # Reject files whose declared size is already over the limit
+    if file.size is not None:
+        is_valid, error_msg = validate_file_size(file.size, mime_type, extension)
+        if not is_valid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
 
     # Generate unique filename
     unique_filename = generate_unique_filename(file.filename)
@@ -110,30 +334,38 @@ async def upload_media(
     # Get storage backend
     storage = get_storage_backend()
 
-    # Prepare storage path (relative path for storage backend)
-    relative_path = f"{current_user.organization_id}/{media_type_cat}/{unique_filename}"
-
-    # Save file using storage backend
+    # Read the upload once (from the local spool) to enforce the size limit, hash it and
+    # read image dimensions from its header
+    upload = UploadStream(
+        file.file,
+        max_size=get_max_file_size(mime_type, extension),
+        detect_dimensions=media_type_cat == "image",
+    )
     try:
-        file_url = storage.save_file(file_content, relative_path)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save file: {str(e)}",
-        )
-
-    # Get image dimensions if image
-    width, height = None, None
-    if media_type_cat == "image":
-        # For local storage, get dimensions from file
-        # For S3, we'll need to download temporarily or skip
-        from backend.core.storage import LocalStorageBackend
-
-        if isinstance(storage, LocalStorageBackend):
-            storage_path = storage.get_full_path(relative_path)
-            dimensions = get_image_dimensions(storage_path)
-            if dimensions:
-                width, height = dimensions
+        await file.seek(0)
+        await run_in_threadpool(upload.read_through)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    file_size = upload.size
+    width, height = upload.dimensions or (None, None)
+
+    # Content already stored (by any organization) is referenced, not uploaded again
+    blob = acquire_blob(db, upload.sha256)
+    if blob is None:
+        relative_path = blob_path(upload.sha256, extension)
+        try:
+            await file.seek(0)
+            await run_in_threadpool(
+                storage.save_stream, read_chunks(file.file), relative_path, mime_type
+            )
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save file: {str(e)}",
+            )
+        blob = register_blob(db, upload.sha256, relative_path, file_size)
 
     # Create media record
     media = Media(
@@ -141,8 +373,9 @@ async def upload_media(
         uploaded_by_id=current_user.id,
         filename=unique_filename,
         original_filename=file.filename,
-        file_path=relative_path,
-        url=file_url,
+        file_path=blob.file_path,
+        content_hash=blob.content_hash,
+        url=storage.get_media_url(unique_filename),
         mime_type=mime_type,
         file_size=file_size,
         file_extension=extension,
@@ -157,6 +390,7 @@ async def upload_media(
     db.add(media)
     db.commit()
     db.refresh(media)
+    await remember_media_file(media)
 
     # Publish webhook event
     if background_tasks:
@@ -401,14 +635,13 @@ async def delete_media(
     # Store ID and org for webhook before deletion
     media_id_val = media.id
     org_id = current_user.organization_id
+    filename, thumbnail_path = media.filename, media.thumbnail_path
 
-    # Delete physical file using storage backend
+    # Delete from database, and the physical file if no other media shares it
     storage = get_storage_backend()
-    storage.delete_file(media.file_path)
-
-    # Delete from database
-    db.delete(media)
+    _delete_stored_files(storage, *_delete_media_row(db, media))
     db.commit()
+    await forget_media_file(filename, thumbnail_path)
 
     # Publish webhook event
     background_tasks.add_task(
@@ -423,43 +656,39 @@ async def delete_media(
 
 @router.get("/files/{filename}")
 @limiter.limit(get_rate_limit())
-async def serve_media_file(request: Request, filename: str, db: Session = Depends(get_db)):
+async def serve_media_file(
+    request: Request, filename: str, db: AsyncSession = Depends(get_async_db)
+):
     """
     Serve media file
 
     Note: For S3 storage, this returns a redirect to the S3 URL.
     For local storage, it serves the file directly.
+
+    The filename is resolved through the media file lookup cache, so this normally
+    touches neither the database nor (for S3) the bucket.
     """
-    # Find media by filename
-    media = db.execute(select(Media).where(Media.filename == filename)).scalar_one_or_none()
+    media_file = await lookup_media_file(db, filename)
 
-    if not media:
+    if not media_file:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
 
     storage = get_storage_backend()
 
-    # Check if file exists
-    if not storage.file_exists(media.file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
-        )
-
     # For local storage, serve file directly
     from backend.core.storage import LocalStorageBackend
 
     if isinstance(storage, LocalStorageBackend):
-        file_path = storage.get_full_path(media.file_path)
-        response = FileResponse(
-            path=file_path, media_type=media.mime_type, filename=media.original_filename
-        )
-        # Add CDN cache headers (1 year for immutable media)
-        add_cache_headers(response, max_age=31536000, public=True)
-        return response
+        if not storage.get_full_path(media_file.file_path).exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
+            )
+        return _local_file_response(request, storage, media_file)
 
-    # For S3, redirect to S3 URL
+    # For S3, redirect to S3 URL (a missing object is reported by S3)
     from fastapi.responses import RedirectResponse
 
-    file_url = storage.get_file_url(media.file_path)
+    file_url = storage.get_file_url(media_file.file_path)
     response = RedirectResponse(url=file_url)
     # Add cache headers for redirect
     add_cache_headers(response, max_age=3600, public=True)
@@ -468,62 +697,41 @@ async def serve_media_file(request: Request, filename: str, db: Session = Depend
 
 @router.get("/proxy/{filename}")
 @limiter.limit(get_rate_limit())
-async def proxy_media_file(request: Request, filename: str, db: Session = Depends(get_db)):
+async def proxy_media_file(
+    request: Request, filename: str, db: AsyncSession = Depends(get_async_db)
+):
     """
     Proxy media file - streams the file content directly instead of redirecting.
 
     This endpoint is useful when the storage backend (e.g., MinIO) is not
     publicly accessible and you need to serve files through the API.
 
-    Note: For large files, consider using the redirect endpoint instead.
+    S3 objects are streamed in chunks, never held in memory. Range (single ranges),
+    If-Range and If-None-Match are honored for both backends: ranges are forwarded to
+    S3 and answered with 206, matching ETags with 304.
     """
-    from fastapi.responses import Response
-
-    # Find media by filename
-    media = db.execute(select(Media).where(Media.filename == filename)).scalar_one_or_none()
+    media_file = await lookup_media_file(db, filename)
 
-    if not media:
+    if not media_file:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
 
     storage = get_storage_backend()
 
-    # Check if file exists
-    if not storage.file_exists(media.file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
-        )
-
-    # For local storage, serve file directly
+    # For local storage, serve file directly (FileResponse handles Range and If-Range)
     from backend.core.storage import LocalStorageBackend
 
     if isinstance(storage, LocalStorageBackend):
-        file_path = storage.get_full_path(media.file_path)
-        response = FileResponse(
-            path=file_path, media_type=media.mime_type, filename=media.original_filename
-        )
-        add_cache_headers(response, max_age=31536000, public=True)
-        return response
+        if not storage.get_full_path(media_file.file_path).exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found in storage"
+            )
+        return _local_file_response(request, storage, media_file)
 
-    # For S3, download and stream the content
+    # For S3, stream the object (or the requested range of it)
     from backend.core.storage import S3StorageBackend
 
     if isinstance(storage, S3StorageBackend):
-        try:
-            content, content_type = storage.get_file_content(media.file_path)
-            response = Response(
-                content=content,
-                media_type=media.mime_type or content_type,
-                headers={
-                    "Content-Disposition": f'inline; filename="{media.original_filename}"',
-                },
-            )
-            add_cache_headers(response, max_age=31536000, public=True)
-            return response
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to retrieve file: {str(e)}",
-            )
+        return await _s3_stream_response(request, storage, media_file)
 
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unknown storage backend"
@@ -562,78 +770,85 @@ async def generate_thumbnail(
 
     from backend.core.storage import S3StorageBackend
 
-    if isinstance(storage, S3StorageBackend):
-        # Download from S3 to temp file
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=Path(media.filename).suffix
-        ) as tmp_file:
-            tmp_path = Path(tmp_file.name)
-            # Download file content
-
-            s3_client = storage.s3_client
-            s3_client.download_file(storage.bucket_name, media.file_path, str(tmp_path))
-            source_path = tmp_path
-    else:
-        source_path = storage.get_full_path(media.file_path)
-        if not source_path.exists():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Source file not found"
+    tmp_path = None
+    try:
+        if isinstance(storage, S3StorageBackend):
+            # Download from S3 to temp file
+            with tempfile.NamedTemporaryFile(
+                delete=False, suffix=Path(media.filename).suffix
+            ) as tmp_file:
+                tmp_path = Path(tmp_file.name)
+            await run_in_threadpool(
+                storage.s3_client.download_file,
+                storage.bucket_name,
+                media.file_path,
+                str(tmp_path),
             )
+            source_path = tmp_path
+        else:
+            source_path = storage.get_full_path(media.file_path)
+            if not source_path.exists():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Source file not found"
+                )
 
-    # Generate thumbnail filename
-    thumb_filename = (
-        f"thumb_{thumbnail_request.width or 300}x{thumbnail_request.height or 300}_{media.filename}"
-    )
-
-    # Create thumbnail in temp location first
-    with tempfile.TemporaryDirectory() as tmpdir:
-        temp_thumb_path = Path(tmpdir) / thumb_filename
-
-        # Create thumbnail
-        width, height = create_thumbnail(
-            source_path,
-            temp_thumb_path,
-            max_width=thumbnail_request.width or 300,
-            max_height=thumbnail_request.height or 300,
-            quality=thumbnail_request.quality,
+        # Generate thumbnail filename
+        thumb_filename = (
+            f"thumb_{thumbnail_request.width or 300}x{thumbnail_request.height or 300}_"
+            f"{media.filename}"
         )
 
-        # Read thumbnail content
-        with open(temp_thumb_path, "rb") as f:
-            thumb_content = f.read()
-
-        # Upload thumbnail to storage
-        thumb_relative_path = f"thumbnails/{thumb_filename}"
-        thumb_url = storage.save_file(thumb_content, thumb_relative_path)
+        # Create thumbnail in temp location first
+        with tempfile.TemporaryDirectory() as tmpdir:
+            temp_thumb_path = Path(tmpdir) / thumb_filename
 
-    # Clean up temp file if S3
-    if isinstance(storage, S3StorageBackend):
-        source_path.unlink()
+            # Create thumbnail (in the image worker, off the event loop)
+            try:
+                width, height = await image_worker.run(
+                    create_thumbnail,
+                    source_path,
+                    temp_thumb_path,
+                    thumbnail_request.width or 300,
+                    thumbnail_request.height or 300,
+                    thumbnail_request.quality,
+                )
+            except ImageWorkerBusy:
+                raise _image_worker_busy()
+
+            # Read and upload the thumbnail off the event loop
+            thumb_content = await run_in_threadpool(temp_thumb_path.read_bytes)
+            thumb_relative_path = f"thumbnails/{thumb_filename}"
+            thumb_url = await run_in_threadpool(
+                storage.save_file, thumb_content, thumb_relative_path
+            )
+    finally:
+        # Clean up the S3 download, also when rendering or the upload failed
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
 
     # Update media record with thumbnail info
     media.thumbnail_path = thumb_relative_path
     media.thumbnail_url = thumb_url
     db.commit()
+    await remember_media_file(media)
 
     return ThumbnailResponse(media_id=media.id, thumbnail_url=thumb_url, width=width, height=height)
 
 
 @router.get("/thumbnails/{filename}")
 @limiter.limit(get_rate_limit())
-async def serve_thumbnail(request: Request, filename: str, db: Session = Depends(get_db)):
+async def serve_thumbnail(
+    request: Request, filename: str, db: AsyncSession = Depends(get_async_db)
+):
     """
     Serve thumbnail file
 
     Note: For S3 storage, this returns a redirect to the S3 URL.
     For local storage, it serves the file directly.
     """
-    # Find media by thumbnail filename
-    thumb_path_pattern = f"thumbnails/{filename}"
-    media = db.execute(
-        select(Media).where(Media.thumbnail_path == thumb_path_pattern)
-    ).scalar_one_or_none()
+    thumbnail = await lookup_thumbnail_file(db, filename)
 
-    if not media or not media.thumbnail_path:
+    if not thumbnail:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
 
     storage = get_storage_backend()
@@ -642,17 +857,169 @@ async def serve_thumbnail(request: Request, filename: str, db: Session = Depends
     from backend.core.storage import LocalStorageBackend
 
     if isinstance(storage, LocalStorageBackend):
-        thumb_path = storage.get_full_path(media.thumbnail_path)
+        thumb_path = storage.get_full_path(thumbnail.file_path)
         if not thumb_path.exists():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail file not found"
             )
-        return FileResponse(path=thumb_path, media_type="image/jpeg")
+        return FileResponse(path=thumb_path, media_type=thumbnail.mime_type)
 
     # For S3, redirect to S3 URL
     from fastapi.responses import RedirectResponse
 
-    return RedirectResponse(url=media.thumbnail_url)
+    return RedirectResponse(url=storage.get_file_url(thumbnail.file_path))
+
+
+@router.get("/transform/{filename}")
+@limiter.limit(get_rate_limit())
+async def transform_media(
+    request: Request,
+    filename: str,
+    w: Optional[int] = Query(None, description="Width (one of MEDIA_TRANSFORM_SIZES)"),
+    h: Optional[int] = Query(None, description="Height (one of MEDIA_TRANSFORM_SIZES)"),
+    fit: str = Query("contain", description="contain (keep aspect ratio) or cover (crop)"),
+    fmt: str = Query("webp", description="webp, avif or jpeg"),
+    q: Optional[int] = Query(None, description="Quality (one of MEDIA_TRANSFORM_QUALITIES)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Serve a resized and re-encoded variant of an image
+
+    Variants are rendered on first request and stored, keyed by the image's content, so
+    later requests (for any media with the same content) are served from storage.
+    Responses are immutable: a variant URL always returns the same bytes.
+
+    The image is resolved through the media lookup cache and stored variants are streamed
+    from S3 as they are read; a missing variant (NoSuchKey) is rendered then and there.
+    """
+    try:
+        transform = ImageTransform.parse(w, h, fit, fmt, q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    media_file = await lookup_media_file(db, filename)
+    if media_file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    if media_file.variant_source is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Transformations only supported for images",
+        )
+
+    storage = get_storage_backend()
+    variant_path = transform.variant_path(media_file.variant_source)
+
+    async def render():
+        contents = await _render_variants(
+            storage, media_file.file_path, media_file.variant_source, [transform]
+        )
+        return contents[0]
+
+    async def rendered_elsewhere():
+        return True if await run_in_threadpool(storage.file_exists, variant_path) else None
+
+    async def render_once():
+        # Concurrent requests for a new variant render it once
+        return await single_flight(f"media-variant:{variant_path}", render, rendered_elsewhere)
+
+    from backend.core.storage import LocalStorageBackend
+
+    if isinstance(storage, LocalStorageBackend):
+        full_path = storage.get_full_path(variant_path)
+        if not await run_in_threadpool(full_path.exists):
+            await render_once()
+        response = FileResponse(path=full_path, media_type=transform.mime_type)
+    else:
+        content = s3_object = None
+        try:
+            s3_object = await run_in_threadpool(storage.open_stream, variant_path)
+        except ClientError as e:
+            if _s3_error_code(e) not in ("NoSuchKey", "404"):
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to retrieve file: {str(e)}",
+                )
+            content = await render_once()
+            if not isinstance(content, bytes):
+                # Rendered by another worker: stream what it stored
+                s3_object = await run_in_threadpool(storage.open_stream, variant_path)
+
+        if s3_object is None:
+            response = Response(content=content, media_type=transform.mime_type)
+        else:
+            response = StreamingResponse(
+                _iter_s3_body(s3_object["Body"]),
+                media_type=transform.mime_type,
+                headers={"Content-Length": str(s3_object["ContentLength"])},
+            )
+
+    add_cache_headers(response, max_age=31536000, public=True, immutable=True)
+    return response
+
+
+@router.post("/{media_id}/variants", response_model=GenerateVariantsResponse)
+@limiter.limit(get_rate_limit())
+async def generate_variants(
+    request: Request,
+    media_id: UUID,
+    variants_request: GenerateVariantsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_flexible),
+):
+    """
+    Render image variants ahead of requests
+
+    Variants not stored yet are rendered in a single image worker task, decoding the
+    image once (e.g. every srcset size right after upload).
+
+    Returns:
+        The /media/transform URL of each variant
+    """
+    try:
+        transforms = [
+            ImageTransform.parse(variant.w, variant.h, variant.fit, variant.fmt, variant.q)
+            for variant in variants_request.variants
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    media = db.execute(
+        select(Media).where(
+            Media.id == media_id, Media.organization_id == current_user.organization_id
+        )
+    ).scalar_one_or_none()
+
+    if not media:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found")
+    if media.media_type != "image":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Transformations only supported for images",
+        )
+
+    storage = get_storage_backend()
+    source_key = media.content_hash or str(media.id)
+    transforms = list(dict.fromkeys(transforms))
+    missing = [
+        transform
+        for transform in transforms
+        if not await run_in_threadpool(storage.file_exists, transform.variant_path(source_key))
+    ]
+    if missing:
+        await _render_variants(storage, media.file_path, source_key, missing)
+
+    return GenerateVariantsResponse(
+        media_id=media.id,
+        variants=[
+            ImageVariant(
+                url=f"/api/v1/media/transform/{media.filename}?"
+                f"{urlencode(transform.query_params())}",
+                mime_type=transform.mime_type,
+                generated=transform in missing,
+            )
+            for transform in transforms
+        ],
+    )
 
 
 @router.get("/stats/overview", response_model=MediaStats)
@@ -709,41 +1076,77 @@ async def bulk_delete_media(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_flexible),
 ):
-    """Delete multiple media files"""
-    deleted_count = 0
-    failed_ids = []
-    errors = []
-
-    storage = get_storage_backend()
-
-    for media_id in delete_request.media_ids:
-        try:
-            media = db.execute(
-                select(Media).where(
-                    Media.id == media_id, Media.organization_id == current_user.organization_id
-                )
-            ).scalar_one_or_none()
-
-            if not media:
-                failed_ids.append(media_id)
-                errors.append(f"Media {media_id} not found")
-                continue
-
-            # Delete physical file using storage backend
-            storage.delete_file(media.file_path)
+    """
+    Delete multiple media files
 
-            # Delete thumbnail if exists
-            if media.thumbnail_path:
-                storage.delete_file(media.thumbnail_path)
+    The media are loaded with one query and removed with one DELETE. Stored files go in
+    batched multi-object deletes (S3), several at once; media whose file could not be
+    deleted are kept and reported in failed_ids, like ids that are not found.
+    """
+    media_ids = list(dict.fromkeys(delete_request.media_ids))
+    items = (
+        db.execute(
+            select(Media).where(
+                Media.id.in_(media_ids), Media.organization_id == current_user.organization_id
+            )
+        )
+        .scalars()
+        .all()
+    )
+    found = {media.id for media in items}
+    failed_ids = [media_id for media_id in media_ids if media_id not in found]
+    errors = [f"Media {media_id} not found" for media_id in failed_ids]
 
-            # Delete from database
-            db.delete(media)
-            deleted_count += 1
+    # Files no media will reference anymore; shared blobs stay locked until commit
+    released = releasable_blobs(
+        db, Counter(media.content_hash for media in items if media.content_hash)
+    )
+    source_files = {}
+    for media in items:
+        if media.content_hash is None:
+            # Uploaded before deduplication: the file belongs to this media alone
+            source_files.setdefault(media.file_path, []).append(media)
+        elif media.content_hash in released:
+            source_files.setdefault(released[media.content_hash], []).append(media)
 
-        except Exception as e:
-            failed_ids.append(media_id)
-            errors.append(f"Media {media_id}: {str(e)}")
+    storage = get_storage_backend()
+    kept = set()
+    for file_path in await run_in_threadpool(storage.delete_files, list(source_files)):
+        for media in source_files[file_path]:
+            kept.add(media.id)
+            failed_ids.append(media.id)
+            errors.append(f"Media {media.id}: failed to delete {file_path}")
+    deleted = [media for media in items if media.id not in kept]
+
+    # Thumbnails and image variants of the deleted files
+    source_keys = [
+        str(media.id) if media.content_hash is None else media.content_hash
+        for media in deleted
+        if media.content_hash is None or media.content_hash in released
+    ]
+    await asyncio.gather(
+        run_in_threadpool(
+            storage.delete_files,
+            [media.thumbnail_path for media in deleted if media.thumbnail_path],
+        ),
+        run_in_threadpool(
+            storage.delete_prefixes, [variant_prefix(key) for key in dict.fromkeys(source_keys)]
+        ),
+    )
 
+    deleted_files = [(media.filename, media.thumbnail_path) for media in deleted]
+    deleted_count = len(deleted)
+    if deleted:
+        db.execute(
+            delete(Media)
+            .where(Media.id.in_([media.id for media in deleted]))
+            .execution_options(synchronize_session=False)
+        )
+        release_blobs(db, Counter(media.content_hash for media in deleted if media.content_hash))
     db.commit()
 
+    await asyncio.gather(
+        *(forget_media_file(filename, thumbnail_path) for filename, thumbnail_path in deleted_files)
+    )
+
     return BulkDeleteResponse(deleted_count=deleted_count, failed_ids=failed_ids, errors=errors)
@@ -6,6 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from backend.api.auth import get_current_user
+from backend.core.cache import cache
+from backend.core.image_worker import image_worker
 from backend.core.performance import get_performance_report, performance_monitor
 from backend.core.permissions import PermissionChecker
 from backend.core.query_optimization import query_tracker
@@ -100,6 +102,36 @@ async def get_slow_queries(
     return {"slow_queries": query_tracker.get_slow_queries(limit=limit)}
 
 
+@router.get("/cache")
+@limiter.limit(get_rate_limit())
+async def get_cache_metrics(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(SessionLocal),
+):
+    """
+    Get in-process (L1) cache statistics of the worker serving the request
+    Requires admin.metrics permission
+    """
+    PermissionChecker.require_permission(current_user, "admin.metrics", db)
+    return {"l1": cache.l1_stats()}
+
+
+@router.get("/image-worker")
+@limiter.limit(get_rate_limit())
+async def get_image_worker_metrics(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(SessionLocal),
+):
+    """
+    Get image processing pool queue depth and task counts of the worker serving the request
+    Requires admin.metrics permission
+    """
+    PermissionChecker.require_permission(current_user, "admin.metrics", db)
+    return image_worker.stats()
+
+
 @router.get("/system")
 @limiter.limit(get_rate_limit())
 async def get_system_metrics(
@@ -15,6 +15,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.api.schemas.reference_data import (
     ReferenceDataCreate,
@@ -24,10 +25,12 @@ from backend.api.schemas.reference_data import (
     ReferenceDataTypesResponse,
     ReferenceDataUpdate,
 )
-from backend.core.cache import cache_response, invalidate_cache_pattern
+from backend.core.cache import CacheKeys, CacheTags, cache_response, invalidate_tags
+from backend.core.cache_warming import access_tracker, cache_warming_service
 from backend.core.dependencies import get_current_user_flexible, require_permission
+from backend.core.published_content import remove_published_content, sync_published_content
 from backend.core.rate_limit import get_rate_limit, limiter
-from backend.db.session import get_db
+from backend.db.session import SessionLocal, get_db
 from backend.models.content import ContentEntry, ContentType
 from backend.models.translation import Locale, Translation
 from backend.models.user import User
@@ -147,59 +150,58 @@ async def list_reference_data_types(
     return ReferenceDataTypesResponse(types=sorted(types))
 
 
-@router.get("", response_model=ReferenceDataResponse)
-@limiter.limit(get_rate_limit())
-@cache_response(ttl=300, key_prefix="reference_data")
-async def get_reference_data(
-    request: Request,
-    type: str = Query(..., description="Type of reference data (department, role, status, etc.)"),
-    locale: str = Query(
-        "en", description="Locale code for translated labels (e.g., 'en', 'es', 'fr')"
+@cache_response(
+    ttl=300,
+    key_builder=lambda **kwargs: CacheKeys.format(
+        CacheKeys.REFERENCE_DATA,
+        org_id=kwargs["organization_id"],
+        data_type=kwargs["data_type"],
+        locale=kwargs["locale"],
+        include_inactive=kwargs["include_inactive"],
     ),
-    include_inactive: bool = Query(False, description="Include inactive items"),
-    current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db),
-):
+    tag_builder=lambda **kwargs: [CacheTags.reference_data(kwargs["organization_id"])],
+    # Read on almost every storefront page; served from memory between changes
+    l1=True,
+    stale_ttl=60,
+)
+async def load_reference_data(
+    *,
+    db: Optional[Session],
+    organization_id: UUID,
+    data_type: str,
+    locale: str = "en",
+    include_inactive: bool = False,
+) -> ReferenceDataResponse:
     """
-    Get reference data items by type with translated labels.
+    Reference data items of one type with labels in the locale (cached)
 
-    This endpoint returns reference data (departments, roles, statuses, etc.) for the
-    organization with labels translated to the requested locale.
+    The queries run in the threadpool, off the event loop. Without db (the cache warmer),
+    a session is opened and closed in that thread, so a warm cut short by its time budget
+    never closes a session a query is still using.
+    """
+    if db is not None:
+        return await run_in_threadpool(
+            query_reference_data, db, organization_id, data_type, locale, include_inactive
+        )
 
-    **Features:**
-    - Multi-language support via CMS auto-translation
-    - Organization-specific customization
-    - Caching for performance (5 min TTL)
-    - Supports both JWT and API key authentication
+    def query_in_new_session() -> ReferenceDataResponse:
+        with SessionLocal() as session:
+            return query_reference_data(
+                session, organization_id, data_type, locale, include_inactive
+            )
 
-    **Example:**
-    ```
-    GET /api/v1/reference-data?type=department&locale=fr
-    ```
+    return await run_in_threadpool(query_in_new_session)
 
-    **Response:**
-    ```json
-    {
-      "type": "department",
-      "locale": "fr",
-      "items": [
-        {
-          "code": "SALES",
-          "label": "Ventes",
-          "description": "Équipe des ventes et des opérations de détail",
-          "icon": "shopping-cart",
-          "color": "#3B82F6",
-          "sort_order": 1,
-          "is_active": true,
-          "is_system": true,
-          "metadata": {}
-        }
-      ],
-      "total": 8
-    }
-    ```
-    """
-    content_type = get_reference_data_content_type(db, current_user.organization_id)
+
+def query_reference_data(
+    db: Session,
+    organization_id: UUID,
+    data_type: str,
+    locale: str = "en",
+    include_inactive: bool = False,
+) -> ReferenceDataResponse:
+    """Reference data items of one type with labels in the locale"""
+    content_type = get_reference_data_content_type(db, organization_id)
 
     if not content_type:
         raise HTTPException(
@@ -222,7 +224,7 @@ async def get_reference_data(
         data = parse_entry_data(entry)
 
         # Filter by type
-        if data.get("data_type") != type:
+        if data.get("data_type") != data_type:
             continue
 
         # Filter inactive unless requested
@@ -234,7 +236,7 @@ async def get_reference_data(
         description = data.get("description")
 
         if locale != "en":
-            translated_label = get_translated_label(db, entry, locale, current_user.organization_id)
+            translated_label = get_translated_label(db, entry, locale, organization_id)
             if translated_label:
                 label = translated_label
 
@@ -259,13 +261,88 @@ async def get_reference_data(
     items.sort(key=lambda x: x.sort_order)
 
     return ReferenceDataResponse(
-        type=type,
+        type=data_type,
         locale=locale,
         items=items,
         total=len(items),
     )
 
 
+async def warm_reference_data(organization_id: str, **params) -> None:
+    """Cache warmer for reference data lookups (see backend.core.cache_warming)"""
+    await load_reference_data(db=None, organization_id=organization_id, **params)
+
+
+cache_warming_service.register("reference_data", warm_reference_data)
+
+
+@router.get("", response_model=ReferenceDataResponse)
+@limiter.limit(get_rate_limit())
+async def get_reference_data(
+    request: Request,
+    type: str = Query(..., description="Type of reference data (department, role, status, etc.)"),
+    locale: str = Query(
+        "en", description="Locale code for translated labels (e.g., 'en', 'es', 'fr')"
+    ),
+    include_inactive: bool = Query(False, description="Include inactive items"),
+    current_user: User = Depends(get_current_user_flexible),
+    db: Session = Depends(get_db),
+):
+    """
+    Get reference data items by type with translated labels.
+
+    This endpoint returns reference data (departments, roles, statuses, etc.) for the
+    organization with labels translated to the requested locale.
+
+    **Features:**
+    - Multi-language support via CMS auto-translation
+    - Organization-specific customization
+    - Caching for performance (5 min TTL)
+    - Supports both JWT and API key authentication
+
+    **Example:**
+    ```
+    GET /api/v1/reference-data?type=department&locale=fr
+    ```
+
+    **Response:**
+    ```json
+    {
+      "type": "department",
+      "locale": "fr",
+      "items": [
+        {
+          "code": "SALES",
+          "label": "Ventes",
+          "description": "Équipe des ventes et des opérations de détail",
+          "icon": "shopping-cart",
+          "color": "#3B82F6",
+          "sort_order": 1,
+          "is_active": true,
+          "is_system": true,
+          "metadata": {}
+        }
+      ],
+      "total": 8
+    }
+    ```
+    """
+    access_tracker.record(
+        current_user.organization_id,
+        "reference_data",
+        data_type=type,
+        locale=locale,
+        include_inactive=include_inactive,
+    )
+    return await load_reference_data(
+        db=db,
+        organization_id=current_user.organization_id,
+        data_type=type,
+        locale=locale,
+        include_inactive=include_inactive,
+    )
+
+
 @router.get("/{data_type}/{code}", response_model=ReferenceDataFullResponse)
 @limiter.limit(get_rate_limit())
 async def get_reference_data_item(
@@ -385,11 +462,12 @@ async def create_reference_data(
     )
 
     db.add(entry)
+    sync_published_content(db, entry, content_type)
     db.commit()
     db.refresh(entry)
 
     # Invalidate cache
-    await invalidate_cache_pattern(f"reference_data:*:{current_user.organization_id}:*")
+    await invalidate_tags(CacheTags.reference_data(current_user.organization_id))
 
     logger.info(f"Created reference data: {data.data_type}/{data.code} by user {current_user.id}")
 
@@ -479,11 +557,12 @@ async def update_reference_data(
     target_entry.data = json.dumps(existing_data)
     target_entry.version += 1
 
+    sync_published_content(db, target_entry)
     db.commit()
     db.refresh(target_entry)
 
     # Invalidate cache
-    await invalidate_cache_pattern(f"reference_data:*:{current_user.organization_id}:*")
+    await invalidate_tags(CacheTags.reference_data(current_user.organization_id))
 
     logger.info(f"Updated reference data: {data_type}/{code} by user {current_user.id}")
 
@@ -558,11 +637,12 @@ async def delete_reference_data(
             detail="System reference data items cannot be deleted",
         )
 
+    remove_published_content(db, target_entry.id)
     db.delete(target_entry)
     db.commit()
 
     # Invalidate cache
-    await invalidate_cache_pattern(f"reference_data:*:{current_user.organization_id}:*")
+    await invalidate_tags(CacheTags.reference_data(current_user.organization_id))
 
     logger.info(f"Deleted reference data: {data_type}/{code} by user {current_user.id}")
 
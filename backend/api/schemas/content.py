@@ -123,7 +123,8 @@ class ContentEntryListResponse(BaseModel):
     """Schema for paginated content entry list"""
 
     items: List[ContentEntryResponse]
-    total: int
+    total: Optional[int]  # None when include_total=false
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
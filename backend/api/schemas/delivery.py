@@ -25,9 +25,10 @@ class DeliveryContentListResponse(BaseModel):
     """List response for content delivery."""
 
     items: List[DeliveryContentResponse]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class DeliveryContentDetailResponse(BaseModel):
@@ -5,6 +5,7 @@ Media/Asset Management Schemas
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional
+from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -110,7 +111,7 @@ class MediaStats(BaseModel):
 class ThumbnailRequest(BaseModel):
     """Request to generate thumbnail"""
 
-    media_id: str
+    media_id: UUID
     width: Optional[int] = Field(None, ge=50, le=2000)
     height: Optional[int] = Field(None, ge=50, le=2000)
     quality: int = Field(85, ge=1, le=100)
@@ -119,21 +120,52 @@ class ThumbnailRequest(BaseModel):
 class ThumbnailResponse(BaseModel):
     """Thumbnail generation response"""
 
-    media_id: str
+    media_id: UUID
     thumbnail_url: str
     width: int
     height: int
 
 
+class ImageVariantRequest(BaseModel):
+    """An image variant, with the query parameters of GET /media/transform"""
+
+    w: Optional[int] = None
+    h: Optional[int] = None
+    fit: str = "contain"
+    fmt: str = "webp"
+    q: Optional[int] = None
+
+
+class GenerateVariantsRequest(BaseModel):
+    """Image variants to render ahead of requests"""
+
+    variants: List[ImageVariantRequest] = Field(..., min_length=1, max_length=20)
+
+
+class ImageVariant(BaseModel):
+    """A rendered image variant"""
+
+    url: str
+    mime_type: str
+    generated: bool  # False if it was already stored
+
+
+class GenerateVariantsResponse(BaseModel):
+    """Image variants of a media item"""
+
+    media_id: UUID
+    variants: List[ImageVariant]
+
+
 class BulkDeleteRequest(BaseModel):
     """Request to delete multiple media files"""
 
-    media_ids: List[int] = Field(..., min_length=1)
+    media_ids: List[UUID] = Field(..., min_length=1)
 
 
 class BulkDeleteResponse(BaseModel):
     """Response from bulk delete"""
 
     deleted_count: int
-    failed_ids: List[int] = Field(default_factory=list)
+    failed_ids: List[UUID] = Field(default_factory=list)
     errors: List[str] = Field(default_factory=list)
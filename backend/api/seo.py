@@ -4,10 +4,11 @@ SEO Management API endpoints
 
 import json
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -21,18 +22,29 @@ from backend.api.schemas.seo import (
     SlugValidation,
     StructuredData,
 )
-from backend.core.dependencies import get_current_user
+from backend.core.cache import cache
+from backend.core.dependencies import get_current_user, get_optional_user
+from backend.core.published_content import sync_published_content
 from backend.core.rate_limit import get_rate_limit, limiter
 from backend.core.seo_utils import (
     analyze_seo,
     generate_robots_txt,
-    generate_sitemap_xml,
+    generate_sitemap_index_xml,
     generate_slug,
     generate_structured_data_article,
     validate_slug,
 )
+from backend.core.sitemaps import (
+    SITEMAP_DEFAULT_BASE_URL,
+    SitemapPage,
+    is_cacheable_base_url,
+    list_sitemap_pages,
+    sitemap_cache_key,
+    stream_sitemap_page,
+)
 from backend.db.session import get_db
 from backend.models.content import ContentEntry, ContentType
+from backend.models.organization import Organization
 from backend.models.user import User
 
 router = APIRouter(prefix="/seo", tags=["seo"])
@@ -189,6 +201,7 @@ async def update_content_seo(
     entry.seo_data = json.dumps(seo_data.model_dump(exclude_none=True))
     entry.updated_at = datetime.now(timezone.utc)
 
+    sync_published_content(db, entry)
     db.commit()
 
     return {"message": "SEO metadata updated successfully"}
@@ -255,52 +268,162 @@ async def generate_article_structured_data(
     return structured_data
 
 
+def _get_sitemap_organization(
+    db: Session, organization: Optional[str], current_user: Optional[User]
+) -> Organization:
+    """Resolve the organization of a sitemap request (slug param, else the caller's org)"""
+    query = db.query(Organization).filter(Organization.is_active.is_(True))
+    if organization:
+        org = query.filter(Organization.slug == organization).first()
+    elif current_user:
+        org = query.filter(Organization.id == current_user.organization_id).first()
+    else:
+        org = None
+
+    if not org:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
+
+    return org
+
+
+def _sitemap_index_response(
+    request: Request, org: Organization, pages, base_url: str
+) -> Response:
+    sitemaps = [
+        {
+            "loc": str(
+                request.url_for("get_sitemap_page", page=str(page.page)).include_query_params(
+                    organization=org.slug, base_url=base_url
+                )
+            ),
+            "lastmod": page.lastmod,
+        }
+        for page in pages
+    ]
+
+    return Response(
+        content=generate_sitemap_index_xml(sitemaps),
+        media_type="application/xml",
+        headers={"Content-Disposition": "inline; filename=sitemap_index.xml"},
+    )
+
+
+async def _sitemap_page_response(
+    db: Session, org: Organization, page: int, base_url: str, pages: List[SitemapPage]
+) -> Response:
+    headers = {"Content-Disposition": f"inline; filename=sitemap-{page}.xml"}
+
+    version = next((sitemap.version for sitemap in pages if sitemap.page == page), None)
+    if version is None:
+        if page > 1:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap not found")
+        # No published content yet: empty urlset, not worth caching
+        return StreamingResponse(
+            stream_sitemap_page(db, org.id, page, base_url),
+            media_type="application/xml",
+            headers=headers,
+        )
+
+    if not is_cacheable_base_url(base_url, org.website):
+        return StreamingResponse(
+            stream_sitemap_page(db, org.id, page, base_url),
+            media_type="application/xml",
+            headers=headers,
+        )
+
+    cache_key = sitemap_cache_key(org.id, page, version, base_url)
+    cached_xml = await cache.get(cache_key)
+    if cached_xml is not None:
+        return Response(content=cached_xml, media_type="application/xml", headers=headers)
+
+    return StreamingResponse(
+        stream_sitemap_page(db, org.id, page, base_url, cache_key=cache_key),
+        media_type="application/xml",
+        headers=headers,
+    )
+
+
 @router.get("/sitemap.xml")
 @limiter.limit(get_rate_limit())
 async def get_sitemap(
-    request: Request, db: Session = Depends(get_db), base_url: str = "https://example.com"
+    request: Request,
+    organization: Optional[str] = None,
+    base_url: str = SITEMAP_DEFAULT_BASE_URL,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
 ):
     """
-    Generate XML sitemap for published content
+    Generate XML sitemap for an organization's published content
+
+    Returns the urlset directly while the organization fits in one sitemap
+    (50,000 URLs), and the sitemap index otherwise.
 
     Args:
+        organization: Organization slug (defaults to the authenticated user's organization)
         base_url: Base URL for the site
 
     Returns:
-        XML sitemap
+        XML sitemap or sitemap index
     """
-    # Get all published content entries
-    entries = (
-        db.execute(
-            select(ContentEntry)
-            .join(ContentEntry.content_type)
-            .where(ContentEntry.status == "published")
-            .order_by(ContentEntry.updated_at.desc())
-        )
-        .scalars()
-        .all()
-    )
+    org = _get_sitemap_organization(db, organization, current_user)
 
-    # Build sitemap entries
-    sitemap_entries = []
-    for entry in entries:
-        sitemap_entries.append(
-            {
-                "loc": f"{base_url}/content/{entry.slug}",
-                "lastmod": entry.updated_at,
-                "changefreq": "weekly",
-                "priority": 0.8,  # All published content has same priority
-            }
-        )
+    pages = list_sitemap_pages(db, org.id)
+    if len(pages) > 1:
+        return _sitemap_index_response(request, org, pages, base_url)
 
-    # Generate XML
-    xml_content = generate_sitemap_xml(sitemap_entries)
+    return await _sitemap_page_response(db, org, 1, base_url, pages)
 
-    return Response(
-        content=xml_content,
-        media_type="application/xml",
-        headers={"Content-Disposition": "inline; filename=sitemap.xml"},
-    )
+
+@router.get("/sitemap_index.xml")
+@limiter.limit(get_rate_limit())
+async def get_sitemap_index(
+    request: Request,
+    organization: Optional[str] = None,
+    base_url: str = SITEMAP_DEFAULT_BASE_URL,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    """
+    Generate the XML sitemap index of an organization
+
+    Args:
+        organization: Organization slug (defaults to the authenticated user's organization)
+        base_url: Base URL for the site
+
+    Returns:
+        XML sitemap index listing one child sitemap per 50,000 URLs
+    """
+    org = _get_sitemap_organization(db, organization, current_user)
+
+    pages = list_sitemap_pages(db, org.id) or [SitemapPage(1, None, "")]
+
+    return _sitemap_index_response(request, org, pages, base_url)
+
+
+@router.get("/sitemaps/{page}.xml")
+@limiter.limit(get_rate_limit())
+async def get_sitemap_page(
+    request: Request,
+    page: int = Path(..., ge=1),
+    organization: Optional[str] = None,
+    base_url: str = SITEMAP_DEFAULT_BASE_URL,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    """
+    Stream one child sitemap of an organization
+
+    Args:
+        page: Child sitemap number (from the sitemap index)
+        organization: Organization slug (defaults to the authenticated user's organization)
+        base_url: Base URL for the site
+
+    Returns:
+        XML sitemap of up to 50,000 URLs
+    """
+    org = _get_sitemap_organization(db, organization, current_user)
+
+    return await _sitemap_page_response(db, org, page, base_url, list_sitemap_pages(db, org.id))
 
 
 @router.get("/sitemap", response_model=SitemapResponse)
@@ -309,7 +432,7 @@ async def get_sitemap_json(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    base_url: str = "https://example.com",
+    base_url: str = SITEMAP_DEFAULT_BASE_URL,
 ):
     """
     Get sitemap data as JSON (for preview/management)
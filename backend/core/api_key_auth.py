@@ -0,0 +1,344 @@
+"""
+API key verification
+
+Keys are found by their HMAC-SHA256 lookup hash (``api_keys.key_lookup``, unique index),
+so authenticating costs one index seek and at most one bcrypt check, instead of a bcrypt
+check per active key. Keys created before the lookup hash existed are narrowed down by
+their plain-text prefix and get their lookup hash on first use.
+
+Verified keys are kept in a short-TTL in-process cache, so repeated requests with the same
+key skip the database and bcrypt entirely. Revoking or changing a key drops it from this
+process's cache immediately; other workers pick the change up within API_KEY_CACHE_TTL.
+
+``last_used_at`` / ``usage_count`` updates are buffered in memory and written in one batch
+at most every API_KEY_USAGE_FLUSH_INTERVAL seconds, on the next authenticated request or
+by the background flusher the app runs (which also writes what is left on shutdown).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.security import api_key_lookup_hash, verify_password
+from backend.db.session import SessionLocal
+from backend.models.api_key import APIKey
+
+logger = logging.getLogger(__name__)
+
+# How long a verified key is trusted without re-reading it
+API_KEY_CACHE_TTL = 60
+API_KEY_CACHE_MAX_SIZE = 10_000
+
+# Minimum interval between batched last_used_at writes
+API_KEY_USAGE_FLUSH_INTERVAL = 30
+
+# Length of the plain-text key_prefix stored for every key
+API_KEY_PREFIX_LENGTH = 8
+
+
+@dataclass
+class VerifiedAPIKey:
+    """Cached result of a successful API key verification"""
+
+    api_key_id: Any
+    name: str
+    organization_id: Any
+    permissions: list
+    expires_at: Optional[datetime]
+    cached_until: float
+
+    def auth_context(self) -> dict:
+        """API key auth dict returned by get_api_key_auth"""
+        return {
+            "organization_id": self.organization_id,
+            "permissions": list(self.permissions),
+            "api_key_id": self.api_key_id,
+        }
+
+
+_verified_keys: Dict[str, VerifiedAPIKey] = {}
+_pending_usage: Dict[Any, list] = {}
+_usage_lock = threading.Lock()
+_last_usage_flush = time.monotonic()
+
+
+def parse_api_key_expiry(expires_at) -> Optional[datetime]:
+    """expires_at column value (ISO string or datetime) as an aware datetime"""
+    if isinstance(expires_at, str):
+        from dateutil import parser
+
+        expires_at = parser.parse(expires_at)
+    if expires_at is not None and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at
+
+
+def is_api_key_expired(expires_at: Optional[datetime]) -> bool:
+    return expires_at is not None and datetime.now(timezone.utc) > expires_at
+
+
+def _verify_candidates(candidates, x_api_key: str) -> Optional[APIKey]:
+    for api_key in candidates:
+        if verify_password(x_api_key, api_key.key_hash):
+            return api_key
+    return None
+
+
+def _legacy_candidates(x_api_key: str):
+    return select(APIKey).where(
+        APIKey.key_lookup.is_(None),
+        APIKey.key_prefix == x_api_key[:API_KEY_PREFIX_LENGTH],
+        APIKey.is_active == True,
+    )
+
+
+def find_api_key(db: Session, x_api_key: str) -> Optional[APIKey]:
+    """
+    Find the active API key matching x_api_key (expiration is not checked)
+
+    Args:
+        db: Database session (committed when a legacy key gets its lookup hash)
+        x_api_key: Plain text key from the request
+
+    Returns:
+        The matching APIKey, or None
+    """
+    lookup = api_key_lookup_hash(x_api_key)
+    api_key = db.execute(
+        select(APIKey).where(APIKey.key_lookup == lookup, APIKey.is_active == True)
+    ).scalar_one_or_none()
+    if api_key is not None:
+        return _verify_candidates([api_key], x_api_key)
+
+    # Keys created before key_lookup existed
+    api_key = _verify_candidates(db.execute(_legacy_candidates(x_api_key)).scalars(), x_api_key)
+    if api_key is not None:
+        api_key.key_lookup = lookup
+        db.commit()
+    return api_key
+
+
+async def find_api_key_async(db: AsyncSession, x_api_key: str) -> Optional[APIKey]:
+    """Async variant of find_api_key."""
+    lookup = api_key_lookup_hash(x_api_key)
+    result = await db.execute(
+        select(APIKey).where(APIKey.key_lookup == lookup, APIKey.is_active == True)
+    )
+    api_key = result.scalar_one_or_none()
+    if api_key is not None:
+        return _verify_candidates([api_key], x_api_key)
+
+    # Keys created before key_lookup existed
+    result = await db.execute(_legacy_candidates(x_api_key))
+    api_key = _verify_candidates(result.scalars(), x_api_key)
+    if api_key is not None:
+        api_key.key_lookup = lookup
+        await db.commit()
+    return api_key
+
+
+def _cache_verified_key(lookup: str, api_key: APIKey) -> VerifiedAPIKey:
+    if len(_verified_keys) >= API_KEY_CACHE_MAX_SIZE:
+        now = time.monotonic()
+        for key, entry in list(_verified_keys.items()):
+            if entry.cached_until <= now:
+                del _verified_keys[key]
+        while len(_verified_keys) >= API_KEY_CACHE_MAX_SIZE:
+            # Oldest insertion first
+            del _verified_keys[next(iter(_verified_keys))]
+
+    verified = VerifiedAPIKey(
+        api_key_id=api_key.id,
+        name=api_key.name,
+        organization_id=api_key.organization_id,
+        permissions=api_key.permissions.split(",") if api_key.permissions else [],
+        expires_at=parse_api_key_expiry(api_key.expires_at),
+        cached_until=time.monotonic() + API_KEY_CACHE_TTL,
+    )
+    _verified_keys[lookup] = verified
+    return verified
+
+
+def _get_cached_key(lookup: str) -> Optional[VerifiedAPIKey]:
+    verified = _verified_keys.get(lookup)
+    if verified is not None and verified.cached_until <= time.monotonic():
+        _verified_keys.pop(lookup, None)
+        return None
+    return verified
+
+
+def invalidate_api_key_cache(api_key_id=None) -> None:
+    """Drop one key (or every key) from this process's verified-key cache"""
+    if api_key_id is None:
+        _verified_keys.clear()
+        return
+    for lookup, verified in list(_verified_keys.items()):
+        if verified.api_key_id == api_key_id:
+            _verified_keys.pop(lookup, None)
+
+
+def record_api_key_use(api_key_id) -> None:
+    """Buffer a use of the key for the next batched last_used_at/usage_count write"""
+    now = datetime.now(timezone.utc).isoformat()
+    with _usage_lock:
+        pending = _pending_usage.get(api_key_id)
+        if pending is None:
+            _pending_usage[api_key_id] = [now, 1]
+        else:
+            pending[0] = now
+            pending[1] += 1
+
+
+def _take_pending_usage(force: bool) -> list:
+    global _last_usage_flush
+
+    with _usage_lock:
+        if not _pending_usage:
+            return []
+        if not force and time.monotonic() - _last_usage_flush < API_KEY_USAGE_FLUSH_INTERVAL:
+            return []
+        _last_usage_flush = time.monotonic()
+        rows = [
+            {"b_id": api_key_id, "b_last_used_at": last_used_at, "b_uses": uses}
+            for api_key_id, (last_used_at, uses) in _pending_usage.items()
+        ]
+        _pending_usage.clear()
+    return rows
+
+
+_usage_update = (
+    update(APIKey.__table__)
+    .where(APIKey.__table__.c.id == bindparam("b_id"))
+    .values(
+        last_used_at=bindparam("b_last_used_at"),
+        usage_count=APIKey.__table__.c.usage_count + bindparam("b_uses"),
+    )
+)
+
+
+def flush_api_key_usage(db: Session, force: bool = False) -> int:
+    """
+    Write buffered key usage in one executemany UPDATE (commits)
+
+    Args:
+        db: Database session with no pending changes of its own
+        force: Flush even if API_KEY_USAGE_FLUSH_INTERVAL has not elapsed
+
+    Returns:
+        Number of keys updated
+    """
+    rows = _take_pending_usage(force)
+    if rows:
+        try:
+            db.execute(_usage_update, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not record API key usage: {e}")
+            return 0
+    return len(rows)
+
+
+async def flush_api_key_usage_async(db: AsyncSession, force: bool = False) -> int:
+    """Async variant of flush_api_key_usage."""
+    rows = _take_pending_usage(force)
+    if rows:
+        try:
+            await db.execute(_usage_update, rows)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Could not record API key usage: {e}")
+            return 0
+    return len(rows)
+
+
+def flush_pending_api_key_usage(session_factory: Callable[[], Session] = SessionLocal) -> int:
+    """Write all buffered key usage now, in a session of its own (e.g. on shutdown)"""
+    db = session_factory()
+    try:
+        return flush_api_key_usage(db, force=True)
+    finally:
+        db.close()
+
+
+async def run_api_key_usage_flusher() -> None:
+    """
+    Flush buffered key usage every API_KEY_USAGE_FLUSH_INTERVAL seconds (until cancelled)
+
+    Workers that stop receiving API key requests still write what they buffered; on
+    cancellation the remaining usage is flushed before returning.
+    """
+    try:
+        while True:
+            await asyncio.sleep(API_KEY_USAGE_FLUSH_INTERVAL)
+            await asyncio.to_thread(flush_pending_api_key_usage)
+    except asyncio.CancelledError:
+        await asyncio.to_thread(flush_pending_api_key_usage)
+        raise
+
+
+def verify_api_key(db: Session, x_api_key: str) -> Optional[VerifiedAPIKey]:
+    """
+    Verify x_api_key, from the verified-key cache when possible (expiration not checked)
+
+    Returns:
+        The verified key, or None if the key is unknown or inactive
+    """
+    lookup = api_key_lookup_hash(x_api_key)
+    verified = _get_cached_key(lookup)
+    if verified is None:
+        api_key = find_api_key(db, x_api_key)
+        if api_key is None:
+            return None
+        verified = _cache_verified_key(lookup, api_key)
+    return verified
+
+
+async def verify_api_key_async(db: AsyncSession, x_api_key: str) -> Optional[VerifiedAPIKey]:
+    """Async variant of verify_api_key."""
+    lookup = api_key_lookup_hash(x_api_key)
+    verified = _get_cached_key(lookup)
+    if verified is None:
+        api_key = await find_api_key_async(db, x_api_key)
+        if api_key is None:
+            return None
+        verified = _cache_verified_key(lookup, api_key)
+    return verified
+
+
+def authenticate_api_key(db: Session, x_api_key: str) -> Optional[VerifiedAPIKey]:
+    """
+    Verify x_api_key and record its use
+
+    Returns:
+        The verified key, or None if the key is unknown, inactive or expired
+    """
+    verified = verify_api_key(db, x_api_key)
+    if verified is None or is_api_key_expired(verified.expires_at):
+        return None
+
+    record_api_key_use(verified.api_key_id)
+    flush_api_key_usage(db)
+    return verified
+
+
+async def authenticate_api_key_async(
+    db: AsyncSession, x_api_key: str
+) -> Optional[VerifiedAPIKey]:
+    """Async variant of authenticate_api_key."""
+    verified = await verify_api_key_async(db, x_api_key)
+    if verified is None or is_api_key_expired(verified.expires_at):
+        return None
+
+    record_api_key_use(verified.api_key_id)
+    await flush_api_key_usage_async(db)
+    return verified
@@ -2,27 +2,242 @@
 Redis caching utilities for Bakalr CMS
 """
 
+import asyncio
 import hashlib
 import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from fnmatch import fnmatchcase
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
+import orjson
 import redis as sync_redis
 import redis.asyncio as redis
+from sqlalchemy.orm import Session
 
+from backend.core.cache_codec import CacheCodec, as_text, codec
 from backend.core.config import settings
 
 
+# ==================== Tags ====================
+#
+# A tag is a Redis set (CacheKeys.TAG) holding the keys cached under it. Sets live at
+# least as long as their longest-lived member, so invalidation never misses a key.
+
+# KEYS[1] = key, KEYS[2..] = tag sets; ARGV[1] = value, ARGV[2] = TTL in seconds (0 = none)
+SET_TAGGED_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+for i = 2, #KEYS do
+    local is_new = redis.call('EXISTS', KEYS[i]) == 0
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if ttl == 0 then
+        redis.call('PERSIST', KEYS[i])
+    else
+        local current = redis.call('TTL', KEYS[i])
+        if is_new or (current >= 0 and current < ttl) then
+            redis.call('EXPIRE', KEYS[i], ttl)
+        end
+    end
+end
+return 1
+"""
+
+# KEYS = tag sets; ARGV[1] = L1 invalidation channel ('' = don't publish), ARGV[2] = origin.
+# Deletes the sets and their members; returns {keys deleted, member keys...}
+INVALIDATE_TAGS_SCRIPT = """
+local result = {0}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        result[1] = result[1] + redis.call(
+            'DEL', unpack(members, i, math.min(i + 499, #members))
+        )
+    end
+    for _, member in ipairs(members) do
+        result[#result + 1] = member
+    end
+    redis.call('DEL', tag)
+end
+if ARGV[1] ~= '' and #result > 1 then
+    local keys = {}
+    for i = 2, #result do
+        keys[i - 1] = result[i]
+    end
+    redis.call('PUBLISH', ARGV[1], cjson.encode({origin = ARGV[2], keys = keys}))
+end
+return result
+"""
+
+
+def _tag_key(tag: str) -> str:
+    return CacheKeys.format(CacheKeys.TAG, tag=tag)
+
+
+def _tagged_set_args(key: str, value: str, ttl: Optional[int], tags: Sequence[str]) -> tuple:
+    tag_keys = [_tag_key(tag) for tag in dict.fromkeys(tags)]
+    return (1 + len(tag_keys), key, *tag_keys, value, ttl or 0)
+
+
+def _invalidate_tags_args(tags: Sequence[str], channel: str = "", origin: str = "") -> tuple:
+    tag_keys = [_tag_key(tag) for tag in dict.fromkeys(tags)]
+    return (len(tag_keys), *tag_keys, channel, origin)
+
+
+# KEYS[1] = lock; ARGV[1] = token. Releases the lock only if we still hold it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# ==================== L1 (in-process) cache ====================
+#
+# Keys read with l1=True are also kept, deserialized, in a per-worker LRU for up to
+# CACHE_L1_TTL seconds. Every write path that can change or drop such a key publishes the
+# affected keys (or patterns) on L1_INVALIDATION_CHANNEL; each worker's listener evicts
+# them. The L1 is only used while that listener is subscribed and is emptied whenever it
+# (re)subscribes, so a missed message can never leave a stale entry behind.
+#
+# Other per-worker caches (e.g. authenticated principals) use the same channel: they
+# publish extra message fields and register a handler with on_invalidation().
+
+L1_INVALIDATION_CHANNEL = "cache:l1:invalidate"
+
+# Seconds between resubscription attempts after the listener loses Redis
+L1_RECONNECT_DELAY = 5
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Thread-safe LRU of deserialized values bounded by entry count, total size and TTL
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int, ttl: int):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; fills that started before one are dropped
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any:
+        """The cached value, or _MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+            self.misses += 1
+            return _MISSING
+
+    def set(self, key: str, value: Any, size: int, generation: Optional[int] = None) -> bool:
+        """
+        Store a value of the given serialized size
+
+        Skipped if an invalidation happened since ``generation`` was read (the value may
+        predate it) or the value alone exceeds the byte bound.
+        """
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_items or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, keys=(), patterns=()) -> None:
+        """Drop keys, and keys matching glob patterns (as used by delete_pattern)"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+            for pattern in patterns:
+                for key in [key for key in self._entries if fnmatchcase(key, pattern)]:
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
 class RedisCache:
     """Redis cache manager with async support"""
 
     _instance: Optional["RedisCache"] = None
     _redis_client: Optional[redis.Redis] = None
     _sync_redis_client: Optional[sync_redis.Redis] = None
+    _l1_listener: Optional[asyncio.Task] = None
+    _l1_subscribed: bool = False
+    _invalidation_handlers: List[Callable[[Optional[Dict[str, Any]]], None]] = []
+    # Encoding of stored values; replaceable, e.g. to change compression
+    codec: CacheCodec = codec
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance.l1 = LocalCache(
+                max_items=settings.CACHE_L1_MAX_ITEMS,
+                max_bytes=settings.CACHE_L1_MAX_BYTES,
+                ttl=settings.CACHE_L1_TTL,
+            )
+            # Identifies this worker's own invalidation messages
+            cls._instance._l1_origin = uuid.uuid4().hex
         return cls._instance
 
     async def connect(self):
@@ -30,10 +245,12 @@ class RedisCache:
         if self._redis_client is None:
             self._redis_client = await redis.from_url(
                 settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True,
+                # Values are bytes from the codec (see backend.core.cache_codec)
+                decode_responses=False,
                 max_connections=settings.REDIS_MAX_CONNECTIONS,
             )
+        if settings.CACHE_L1_ENABLED and self._l1_listener is None:
+            self._l1_listener = asyncio.create_task(self._listen_for_invalidations())
 
     def _get_sync_client(self) -> Optional[sync_redis.Redis]:
         """Get or create synchronous Redis client"""
@@ -41,8 +258,7 @@ class RedisCache:
             try:
                 self._sync_redis_client = sync_redis.from_url(
                     settings.REDIS_URL,
-                    encoding="utf-8",
-                    decode_responses=True,
+                    decode_responses=False,
                 )
             except Exception as e:
                 print(f"Sync Redis connection error: {e}")
@@ -51,6 +267,13 @@ class RedisCache:
 
     async def disconnect(self):
         """Close Redis connection"""
+        if self._l1_listener is not None:
+            self._l1_listener.cancel()
+            try:
+                await self._l1_listener
+            except asyncio.CancelledError:
+                pass
+            self._l1_listener = None
         if self._redis_client:
             await self._redis_client.aclose()
             self._redis_client = None
@@ -65,35 +288,156 @@ class RedisCache:
             raise RuntimeError("Redis not connected. Call connect() first.")
         return self._redis_client
 
+    # ==================== L1 Coherence ====================
+
+    @property
+    def l1_active(self) -> bool:
+        """Whether L1 entries may be served (only while invalidations are being received)"""
+        return self._l1_subscribed
+
+    async def _listen_for_invalidations(self):
+        """Evict keys other workers invalidate; resubscribes until cancelled"""
+        reported_error = False
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(L1_INVALIDATION_CHANNEL)
+                # Anything published while we were not subscribed was missed
+                self._clear_local_caches()
+                self._l1_subscribed = True
+                reported_error = False
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not reported_error:
+                    print(f"Cache invalidation listener error: {e}")
+                    reported_error = True
+            finally:
+                self._l1_subscribed = False
+                self._clear_local_caches()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(L1_RECONNECT_DELAY)
+
+    def on_invalidation(self, handler: Callable[[Optional[Dict[str, Any]]], None]) -> None:
+        """
+        Run handler for every invalidation message of other workers, and with None
+        whenever messages may have been missed (the listener subscribed or lost Redis)
+        """
+        self._invalidation_handlers.append(handler)
+
+    def _clear_local_caches(self) -> None:
+        self.l1.clear()
+        for handler in self._invalidation_handlers:
+            handler(None)
+
+    def _apply_invalidation(self, data: str) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, json.JSONDecodeError):
+            return
+        if message.get("origin") != self._l1_origin:
+            keys, patterns = message.get("keys") or (), message.get("patterns") or ()
+            if keys or patterns:
+                self.l1.invalidate(keys, patterns)
+            for handler in self._invalidation_handlers:
+                handler(message)
+
+    def _invalidation_message(
+        self, keys: Sequence[str], patterns: Sequence[str], extra: Dict[str, Any]
+    ) -> str:
+        # Evict here right away; other workers evict when the message arrives
+        if keys or patterns:
+            self.l1.invalidate(keys, patterns)
+        return json.dumps(
+            {"origin": self._l1_origin, "keys": list(keys), "patterns": list(patterns), **extra}
+        )
+
+    def _l1_channel(self) -> str:
+        return L1_INVALIDATION_CHANNEL if settings.CACHE_L1_ENABLED else ""
+
+    async def publish_invalidation(
+        self, keys: Sequence[str] = (), patterns: Sequence[str] = (), **extra: Any
+    ):
+        """
+        Evict keys (or glob patterns) from the L1 cache of every worker
+
+        Extra keyword arguments are added to the message for on_invalidation handlers.
+        """
+        if not settings.CACHE_L1_ENABLED:
+            return
+        try:
+            message = self._invalidation_message(keys, patterns, extra)
+            await self.client.publish(L1_INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            print(f"Cache invalidation publish error: {e}")
+
+    def publish_invalidation_sync(
+        self, keys: Sequence[str] = (), patterns: Sequence[str] = (), **extra: Any
+    ):
+        """Evict keys (or glob patterns) from the L1 cache of every worker (synchronous)"""
+        if not settings.CACHE_L1_ENABLED:
+            return
+        try:
+            message = self._invalidation_message(keys, patterns, extra)
+            client = self._get_sync_client()
+            if client:
+                client.publish(L1_INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            print(f"Sync cache invalidation publish error: {e}")
+
+    def l1_stats(self) -> Dict[str, Any]:
+        """L1 size and hit/miss counters of this worker"""
+        return {"enabled": settings.CACHE_L1_ENABLED, "active": self.l1_active, **self.l1.stats()}
+
     # ==================== Synchronous Methods ====================
 
-    def get_sync(self, key: str) -> Optional[str]:
-        """Get value from cache (synchronous version)"""
+    def _get_decoded_sync(self, key: str) -> Any:
         try:
             client = self._get_sync_client()
             if client:
-                return client.get(key)
+                raw = client.get(key)
+                if raw is not None:
+                    return self.codec.decode(raw)
             return None
         except Exception as e:
             print(f"Sync cache get error: {e}")
             return None
 
-    def set_sync(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache (synchronous version)"""
+    def get_sync(self, key: str) -> Optional[str]:
+        """Get value from cache as text (synchronous version)"""
+        value = self._get_decoded_sync(key)
+        return None if value is None else as_text(value)
+
+    def set_sync(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = (),
+        l1: bool = False,
+    ) -> bool:
+        """Set value in cache, registered under tags (synchronous version)"""
         try:
             client = self._get_sync_client()
             if not client:
                 return False
 
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            elif not isinstance(value, str):
-                value = str(value)
+            value = self.codec.encode(value)
 
-            if ttl:
+            if tags:
+                client.eval(SET_TAGGED_SCRIPT, *_tagged_set_args(key, value, ttl, tags))
+            elif ttl:
                 client.setex(key, ttl, value)
             else:
                 client.set(key, value)
+            if l1:
+                self.publish_invalidation_sync(keys=[key])
             return True
         except Exception as e:
             print(f"Sync cache set error: {e}")
@@ -101,46 +445,129 @@ class RedisCache:
 
     def get_json_sync(self, key: str) -> Optional[Any]:
         """Get and deserialize JSON value from cache (synchronous version)"""
-        value = self.get_sync(key)
-        if value:
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
-        return None
+        return _parse_json(self._get_decoded_sync(key))
+
+    def delete_pattern_sync(self, pattern: str) -> int:
+        """Delete all keys matching pattern (synchronous version)"""
+        try:
+            client = self._get_sync_client()
+            if not client:
+                return 0
+
+            keys = list(client.scan_iter(match=pattern))
+            deleted = client.delete(*keys) if keys else 0
+            self.publish_invalidation_sync(patterns=[pattern])
+            return deleted
+        except Exception as e:
+            print(f"Sync cache delete pattern error: {e}")
+            return 0
+
+    def invalidate_tags_sync(self, *tags: str) -> int:
+        """Delete every key registered under any of the tags (synchronous version)"""
+        try:
+            client = self._get_sync_client()
+            if not client or not tags:
+                return 0
+            result = client.eval(
+                INVALIDATE_TAGS_SCRIPT,
+                *_invalidate_tags_args(tags, self._l1_channel(), self._l1_origin),
+            )
+            self.l1.invalidate(keys=[key.decode("utf-8") for key in result[1:]])
+            return result[0]
+        except Exception as e:
+            print(f"Sync cache invalidate tags error: {e}")
+            return 0
+
+    def get_many_sync(self, keys: List[str]) -> Optional[List[Optional[str]]]:
+        """Get several values in one round trip (synchronous version)
+
+        Returns None if Redis is unavailable, otherwise one value (or None) per key.
+        """
+        try:
+            client = self._get_sync_client()
+            if not client:
+                return None
+            return [
+                None if raw is None else as_text(self.codec.decode(raw))
+                for raw in client.mget(keys)
+            ]
+        except Exception as e:
+            print(f"Sync cache get many error: {e}")
+            return None
+
+    def increment_sync(self, key: str, amount: int = 1) -> int:
+        """Increment counter (synchronous version)"""
+        try:
+            client = self._get_sync_client()
+            if not client:
+                return 0
+            return client.incrby(key, amount)
+        except Exception as e:
+            print(f"Sync cache increment error: {e}")
+            return 0
 
     # ==================== Async Methods ====================
 
-    async def get(self, key: str) -> Optional[str]:
-        """Get value from cache"""
+    async def _get_raw(self, key: str) -> Optional[bytes]:
         try:
             return await self.client.get(key)
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
 
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    def _decode(self, raw: Optional[bytes]) -> Any:
+        if raw is None:
+            return None
+        try:
+            return self.codec.decode(raw)
+        except Exception as e:
+            print(f"Cache decode error: {e}")
+            return None
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get value from cache as text"""
+        value = self._decode(await self._get_raw(key))
+        return None if value is None else as_text(value)
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a value stored as bytes (e.g. a cached HTTP body) without copying it to text"""
+        value = self._decode(await self._get_raw(key))
+        if value is None or isinstance(value, bytes):
+            return value
+        return as_text(value).encode("utf-8")
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = (),
+        l1: bool = False,
+    ) -> bool:
         """
         Set value in cache
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
+            value: Value to cache (encoded by the codec, see backend.core.cache_codec)
             ttl: Time to live in seconds (None = no expiration)
+            tags: Tags (see CacheTags) the key is registered under for invalidate_tags
+            l1: The key is read with l1=True; evict old copies from every worker's L1
 
         Returns:
             True if successful
         """
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            elif not isinstance(value, str):
-                value = str(value)
+            value = self.codec.encode(value)
 
-            if ttl:
+            if tags:
+                await self.client.eval(SET_TAGGED_SCRIPT, *_tagged_set_args(key, value, ttl, tags))
+            elif ttl:
                 await self.client.setex(key, ttl, value)
             else:
                 await self.client.set(key, value)
+            if l1:
+                await self.publish_invalidation(keys=[key])
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
@@ -150,6 +577,7 @@ class RedisCache:
         """Delete key from cache"""
         try:
             await self.client.delete(key)
+            await self.publish_invalidation(keys=[key])
             return True
         except Exception as e:
             print(f"Cache delete error: {e}")
@@ -170,13 +598,39 @@ class RedisCache:
             async for key in self.client.scan_iter(match=pattern):
                 keys.append(key)
 
-            if keys:
-                return await self.client.delete(*keys)
-            return 0
+            deleted = await self.client.delete(*keys) if keys else 0
+            await self.publish_invalidation(patterns=[pattern])
+            return deleted
         except Exception as e:
             print(f"Cache delete pattern error: {e}")
             return 0
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every key registered under any of the tags
+
+        Costs one round trip and O(keys in the tags), unlike delete_pattern which scans
+        the whole keyspace.
+
+        Args:
+            tags: Tags to invalidate (see CacheTags)
+
+        Returns:
+            Number of keys deleted
+        """
+        if not tags:
+            return 0
+        try:
+            result = await self.client.eval(
+                INVALIDATE_TAGS_SCRIPT,
+                *_invalidate_tags_args(tags, self._l1_channel(), self._l1_origin),
+            )
+            self.l1.invalidate(keys=[key.decode("utf-8") for key in result[1:]])
+            return result[0]
+        except Exception as e:
+            print(f"Cache invalidate tags error: {e}")
+            return 0
+
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
         try:
@@ -185,15 +639,27 @@ class RedisCache:
             print(f"Cache exists error: {e}")
             return False
 
-    async def get_json(self, key: str) -> Optional[Any]:
-        """Get and deserialize JSON value from cache"""
-        value = await self.get(key)
-        if value:
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
-        return None
+    async def get_json(self, key: str, l1: bool = False) -> Optional[Any]:
+        """
+        Get and deserialize JSON value from cache
+
+        Args:
+            key: Cache key
+            l1: Serve from (and fill) this worker's in-process L1 cache; the returned
+                value is shared and must not be mutated
+        """
+        use_l1 = l1 and self.l1_active
+        if use_l1:
+            local = self.l1.get(key)
+            if local is not _MISSING:
+                return local
+            generation = self.l1.generation
+
+        raw = await self._get_raw(key)
+        parsed = _parse_json(self._decode(raw))
+        if parsed is not None and use_l1:
+            self.l1.set(key, parsed, len(raw), generation=generation)
+        return parsed
 
     async def increment(self, key: str, amount: int = 1) -> int:
         """Increment counter"""
@@ -211,6 +677,52 @@ class RedisCache:
             print(f"Cache expire error: {e}")
             return False
 
+    async def acquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        """
+        Take a short-lived lock shared by all workers
+
+        Fails open: if Redis is unavailable every caller gets the lock.
+
+        Args:
+            name: Lock name
+            timeout: Seconds after which the lock frees itself
+
+        Returns:
+            Token to release the lock with, or None if another holder has it
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.set(
+                CacheKeys.format(CacheKeys.LOCK, name=name), token, nx=True, px=int(timeout * 1000)
+            )
+            return token if acquired else None
+        except Exception as e:
+            print(f"Cache lock error: {e}")
+            return token
+
+    async def release_lock(self, name: str, token: str) -> bool:
+        """Release a lock taken with acquire_lock, unless it expired and was taken over"""
+        try:
+            released = await self.client.eval(
+                RELEASE_LOCK_SCRIPT, 1, CacheKeys.format(CacheKeys.LOCK, name=name), token
+            )
+            return released == 1
+        except Exception as e:
+            print(f"Cache unlock error: {e}")
+            return False
+
+
+def _parse_json(value: Any) -> Optional[Any]:
+    """A decoded value as get_json returns it: text holding JSON is parsed"""
+    if isinstance(value, str):
+        if not value:
+            return None
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            return value
+    return value
+
 
 # Global cache instance
 cache = RedisCache()
@@ -244,14 +756,188 @@ def generate_content_hash(*args, **kwargs) -> str:
     return hashlib.sha256(content.encode()).hexdigest()[:16]
 
 
-def cached(ttl: int = 300, key_prefix: str = "cache", key_builder: Optional[Callable] = None):
+# ==================== Stampede protection ====================
+#
+# Recomputing a popular key is single-flight: concurrent misses in a worker share one
+# future, and across workers only the holder of a short Redis lock recomputes while the
+# others wait for its value. Values cached by cached() carry their soft expiry and how
+# long they took to compute, so they can be refreshed in the background before anyone
+# misses (probabilistic early expiration) and served stale while that happens.
+
+# Seconds a recompute lock is held at most; waiters give up and compute themselves after
+CACHE_LOCK_TIMEOUT = 10
+
+_ENVELOPE_MARKER = "__cached__"
+
+_inflight: Dict[str, asyncio.Future] = {}
+_ABANDONED = object()
+_refreshing: Dict[str, asyncio.Task] = {}
+
+
+async def single_flight(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    wait_for: Optional[Callable[[], Awaitable[Any]]] = None,
+    lock_timeout: float = CACHE_LOCK_TIMEOUT,
+) -> Any:
+    """
+    Run compute once for concurrent callers of the same key
+
+    Callers in this worker await the first caller's result. Across workers the Redis lock
+    holder computes; while it is held elsewhere, wait_for is polled until it returns a
+    value (normally the cached result the holder stores) or the lock times out.
+
+    Args:
+        key: Cache key being recomputed
+        compute: Computes (and caches) the value
+        wait_for: Returns the value another worker cached, or None if not there yet
+        lock_timeout: Seconds the cross-process lock is held at most
+    """
+    future = _inflight.get(key)
+    while future is not None:
+        result = await asyncio.shield(future)
+        if result is not _ABANDONED:
+            return result
+        # The computing caller was cancelled; the first waiter to resume computes instead
+        future = _inflight.get(key)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _compute_under_lock(key, compute, wait_for, lock_timeout)
+    except asyncio.CancelledError:
+        # Cancelled with its own request (e.g. the client went away), not the waiters'
+        future.set_result(_ABANDONED)
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        # Waiters re-raise it; don't warn when there are none
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _compute_under_lock(key, compute, wait_for, lock_timeout):
+    token = await cache.acquire_lock(key, lock_timeout)
+    if token is None and wait_for is not None:
+        deadline = time.monotonic() + lock_timeout
+        delay = 0.02
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            value = await wait_for()
+            if value is not None:
+                return value
+        # The holder died or is too slow; compute ourselves
+
+    try:
+        return await compute()
+    finally:
+        if token is not None:
+            await cache.release_lock(key, token)
+
+
+def _envelope(value: Any, ttl: int, compute_time: float) -> Dict[str, Any]:
+    return {
+        _ENVELOPE_MARKER: 1,
+        "value": value,
+        "fresh_until": time.time() + ttl,
+        "compute_time": compute_time,
+    }
+
+
+def _unwrap(cached_value: Any) -> Tuple[Any, Optional[float], float]:
+    """(value, fresh_until, compute_time); values cached without an envelope are fresh"""
+    if isinstance(cached_value, dict) and _ENVELOPE_MARKER in cached_value:
+        return cached_value["value"], cached_value["fresh_until"], cached_value["compute_time"]
+    return cached_value, None, 0.0
+
+
+def _expires_early(fresh_until: float, compute_time: float, beta: float) -> bool:
+    """
+    Probabilistic early expiration ("XFetch")
+
+    Each read treats the value as expired with a probability that rises as expiry
+    approaches, faster for values that are slow to compute, so one reader refreshes it
+    ahead of time instead of every reader missing at once. Values past their soft
+    expiry are always expired, even with early expiration disabled (beta 0).
+    """
+    now = time.time()
+    if now >= fresh_until:
+        return True
+    if beta <= 0:
+        return False
+    # 1 - random() is in (0, 1], so the log is finite and <= 0
+    return now - compute_time * beta * math.log(1.0 - random.random()) >= fresh_until
+
+
+def _refresh_arguments(kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Session]]:
+    """The call's kwargs with request-scoped database sessions replaced by new ones"""
+    from backend.db.session import SessionLocal
+
+    sessions = []
+    refreshed = dict(kwargs)
+    for name, value in kwargs.items():
+        if isinstance(value, Session):
+            refreshed[name] = SessionLocal()
+            sessions.append(refreshed[name])
+    return refreshed, sessions
+
+
+def _schedule_refresh(key: str, refresh: Callable[[], Awaitable[Any]]) -> None:
+    """Refresh a key in a background task, once per worker (and per lock holder)"""
+    if key in _refreshing:
+        return
+
+    async def run():
+        token = await cache.acquire_lock(key, CACHE_LOCK_TIMEOUT)
+        if token is None:
+            # Another worker is already refreshing it
+            return
+        try:
+            await refresh()
+        except Exception as e:
+            print(f"Cache refresh error for {key}: {e}")
+        finally:
+            await cache.release_lock(key, token)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _refreshing[key] = task
+    task.add_done_callback(lambda _: _refreshing.pop(key, None))
+
+
+def cached(
+    ttl: int = 300,
+    key_prefix: str = "cache",
+    key_builder: Optional[Callable] = None,
+    tag_builder: Optional[Callable] = None,
+    l1: bool = False,
+    stale_ttl: int = 0,
+    early_expiration: float = 1.0,
+):
     """
     Decorator for caching function results
 
+    Misses are single-flight (see single_flight). Results are fresh for ttl seconds and
+    may then be served for stale_ttl more seconds while one background task recomputes
+    them; reads close to expiry trigger that refresh early, at random. Background
+    refreshes call the function again with the same arguments, with a new session in
+    place of any SQLAlchemy Session argument.
+
     Args:
         ttl: Time to live in seconds
         key_prefix: Prefix for cache key
         key_builder: Custom function to build cache key
+        tag_builder: Function returning the tags (see CacheTags) to cache the result under,
+            called with the function's arguments
+        l1: Also serve hits from the per-worker in-process cache (for small, hot, rarely
+            changing results that callers don't mutate)
+        stale_ttl: Seconds a value is served stale while being refreshed (0 = never)
+        early_expiration: Eagerness of early refreshes (the XFetch beta; 0 disables)
 
     Example:
         @cached(ttl=600, key_prefix="user")
@@ -260,6 +946,32 @@ def cached(ttl: int = 300, key_prefix: str = "cache", key_builder: Optional[Call
     """
 
     def decorator(func: Callable):
+        async def compute_and_store(cache_key: str, args, kwargs):
+            start = time.perf_counter()
+            result = await func(*args, **kwargs)
+            if result is not None:
+                tags = tag_builder(*args, **kwargs) if tag_builder else ()
+                if hasattr(result, "model_dump"):
+                    # Response models are cached as the JSON they render to
+                    value = result.model_dump(mode="json")
+                else:
+                    value = result
+                envelope = _envelope(value, ttl, time.perf_counter() - start)
+                await cache.set(cache_key, envelope, ttl + stale_ttl, tags=tags, l1=l1)
+            return result
+
+        async def refresh(cache_key: str, args, kwargs):
+            refresh_kwargs, sessions = _refresh_arguments(kwargs)
+            try:
+                await compute_and_store(cache_key, args, refresh_kwargs)
+            finally:
+                for session in sessions:
+                    session.close()
+
+        async def wait_for(cache_key: str):
+            cached_value = await cache.get_json(cache_key)
+            return None if cached_value is None else _unwrap(cached_value)[0]
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Build cache key
@@ -270,16 +982,24 @@ def cached(ttl: int = 300, key_prefix: str = "cache", key_builder: Optional[Call
                 cache_key = generate_cache_key(key_prefix, func.__name__, content_hash)
 
             # Try to get from cache
-            cached_value = await cache.get_json(cache_key)
+            cached_value = await cache.get_json(cache_key, l1=l1)
             if cached_value is not None:
-                return cached_value
-
-            # Call function and cache result
-            result = await func(*args, **kwargs)
-            if result is not None:
-                await cache.set(cache_key, result, ttl)
-
-            return result
+                value, fresh_until, compute_time = _unwrap(cached_value)
+                if fresh_until is None:
+                    return value
+                if not _expires_early(fresh_until, compute_time, early_expiration):
+                    return value
+                if time.time() < fresh_until + stale_ttl:
+                    # Fresh but due for an early refresh, or stale but still servable
+                    _schedule_refresh(cache_key, lambda: refresh(cache_key, args, kwargs))
+                    return value
+
+            # Call function and cache result, once for concurrent misses
+            return await single_flight(
+                cache_key,
+                lambda: compute_and_store(cache_key, args, kwargs),
+                wait_for=lambda: wait_for(cache_key),
+            )
 
         return wrapper
 
@@ -290,12 +1010,44 @@ async def invalidate_cache_pattern(pattern: str):
     """
     Invalidate all cache keys matching pattern
 
+    Scans the whole keyspace; prefer invalidate_tags for anything cached with tags.
+
     Args:
         pattern: Pattern to match (e.g., "content:*")
     """
     await cache.delete_pattern(pattern)
 
 
+def invalidate_cache_pattern_sync(pattern: str):
+    """
+    Invalidate all cache keys matching pattern (synchronous version)
+
+    Args:
+        pattern: Pattern to match (e.g., "content:*")
+    """
+    cache.delete_pattern_sync(pattern)
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """
+    Invalidate all cache keys registered under any of the tags
+
+    Args:
+        tags: Tags to invalidate (see CacheTags)
+    """
+    return await cache.invalidate_tags(*tags)
+
+
+def invalidate_tags_sync(*tags: str) -> int:
+    """
+    Invalidate all cache keys registered under any of the tags (synchronous version)
+
+    Args:
+        tags: Tags to invalidate (see CacheTags)
+    """
+    return cache.invalidate_tags_sync(*tags)
+
+
 # Cache key helpers
 class CacheKeys:
     """Cache key patterns for different resources"""
@@ -303,6 +1055,7 @@ class CacheKeys:
     # Content
     CONTENT_ENTRY = "content:entry:{org_id}:{entry_id}"
     CONTENT_LIST = "content:list:{org_id}:{type_id}:{page}:{size}"
+    CONTENT_COUNT = "content:list:{org_id}:{type_id}:count:{status}"
     CONTENT_TYPE = "content:type:{org_id}:{type_id}"
 
     # Translation
@@ -313,20 +1066,75 @@ class CacheKeys:
     MEDIA_ENTRY = "media:entry:{org_id}:{media_id}"
     MEDIA_LIST = "media:list:{org_id}:{page}:{size}"
     MEDIA_STATS = "media:stats:{org_id}"
+    MEDIA_FILE = "media:file:{filename}"
+    MEDIA_THUMBNAIL = "media:thumbnail:{filename}"
 
     # SEO
     SEO_META = "seo:meta:{org_id}:{entry_id}"
     SEO_SITEMAP = "seo:sitemap:{org_id}"
+    SEO_SITEMAP_PAGE = "seo:sitemap:{org_id}:{page}:{version}"
+    SEO_SITEMAP_PAGES = "seo:sitemap:{org_id}:pages:{version}"
 
     # User
     USER_PROFILE = "user:profile:{user_id}"
     USER_PERMISSIONS = "user:permissions:{user_id}"
 
+    # Reference data
+    REFERENCE_DATA = "reference_data:{org_id}:{data_type}:{locale}:{include_inactive}"
+
+    # RBAC
+    RBAC_VERSION = "rbac:version:{org_id}"  # org_id "global" for permission definitions
+    EFFECTIVE_PERMISSIONS = "rbac:perms:{org_id}:{user_id}:{version}"
+
+    # Tag sets (see CacheTags)
+    TAG = "cache:tag:{tag}"
+
+    # Recompute locks (see single_flight)
+    LOCK = "cache:lock:{name}"
+
+    # Access counts for cache warming (see backend.core.cache_warming)
+    CACHE_ACCESS = "cache:access:{org_id}"
+    CACHE_ACCESS_ORGS = "cache:access:orgs"
+
     @staticmethod
     def format(pattern: str, **kwargs) -> str:
         """Format cache key pattern with values"""
         return pattern.format(**kwargs)
 
 
+class CacheTags:
+    """
+    Tags cached keys are registered under, for invalidation with invalidate_tags
+
+    Cache writes tag an entry with everything whose change must drop it, e.g. a content
+    list total is tagged with its organization and its (organization, content type) list.
+    """
+
+    @staticmethod
+    def organization(org_id) -> str:
+        """Everything cached for an organization"""
+        return f"org:{org_id}"
+
+    @staticmethod
+    def content_list(org_id, type_id) -> str:
+        """Listings and totals of one content type"""
+        return f"list:{org_id}:{type_id}"
+
+    @staticmethod
+    def content_lists(org_id) -> str:
+        """Listings and totals of every content type of an organization"""
+        return f"list:{org_id}"
+
+    @staticmethod
+    def sitemap(org_id) -> str:
+        """An organization's sitemaps"""
+        return f"sitemap:{org_id}"
+
+    @staticmethod
+    def reference_data(org_id) -> str:
+        """An organization's reference data lookups"""
+        return f"reference_data:{org_id}"
+
+
 # Alias for backwards compatibility
 cache_response = cached
@@ -0,0 +1,122 @@
+"""
+Binary encoding of cached values
+
+Values are stored as a two byte header (a NUL marker, then the format and compression)
+followed by the payload:
+
+- str values as UTF-8 text, bytes values as-is (e.g. cached HTTP bodies);
+- dicts and lists as orjson, which is smaller and several times faster than json;
+- anything else as its str(), as before.
+
+Payloads above CACHE_COMPRESSION_THRESHOLD bytes are compressed with zstd when the
+zstandard package is installed, zlib otherwise, and only if that makes them smaller.
+Values written before the header existed are plain text and decode as str.
+"""
+
+import zlib
+from typing import Any
+
+import orjson
+
+from backend.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional; zlib is used instead
+    zstandard = None
+
+_MARKER = 0
+
+FORMAT_TEXT = 1
+FORMAT_BYTES = 2
+FORMAT_JSON = 3
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class CacheCodec:
+    """
+    Encodes values to the bytes stored in Redis and back
+
+    Args:
+        compression_threshold: Compress payloads larger than this many bytes (0 = never)
+        compression: "zstd", "zlib" or "none"; zstd falls back to zlib if unavailable
+    """
+
+    def __init__(self, compression_threshold: int = 1024, compression: str = "zstd"):
+        self.compression_threshold = compression_threshold
+        if compression == "zstd" and zstandard is None:
+            compression = "zlib"
+        self.compression = {
+            "none": COMPRESSION_NONE,
+            "zlib": COMPRESSION_ZLIB,
+            "zstd": COMPRESSION_ZSTD,
+        }[compression]
+        self._zstd_compressor = zstandard.ZstdCompressor() if zstandard else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    def encode(self, value: Any) -> bytes:
+        if isinstance(value, str):
+            kind, payload = FORMAT_TEXT, value.encode("utf-8")
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            kind, payload = FORMAT_BYTES, bytes(value)
+        elif isinstance(value, (dict, list)):
+            kind, payload = FORMAT_JSON, orjson.dumps(value, option=JSON_OPTIONS)
+        else:
+            kind, payload = FORMAT_TEXT, str(value).encode("utf-8")
+
+        compression = COMPRESSION_NONE
+        if (
+            self.compression != COMPRESSION_NONE
+            and self.compression_threshold
+            and len(payload) > self.compression_threshold
+        ):
+            compressed = self._compress(payload)
+            if len(compressed) < len(payload):
+                compression, payload = self.compression, compressed
+
+        return bytes((_MARKER, kind | compression << 4)) + payload
+
+    def decode(self, data: bytes) -> Any:
+        if not data or data[0] != _MARKER:
+            # Written before values were encoded: plain text
+            return data.decode("utf-8")
+
+        kind, compression = data[1] & 0x0F, data[1] >> 4
+        payload = data[2:]
+        if compression == COMPRESSION_ZLIB:
+            payload = zlib.decompress(payload)
+        elif compression == COMPRESSION_ZSTD:
+            if self._zstd_decompressor is None:
+                raise ValueError("Cached value is zstd compressed but zstandard is missing")
+            payload = self._zstd_decompressor.decompress(payload)
+
+        if kind == FORMAT_JSON:
+            return orjson.loads(payload)
+        if kind == FORMAT_BYTES:
+            return payload
+        return payload.decode("utf-8")
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.compression == COMPRESSION_ZSTD:
+            return self._zstd_compressor.compress(payload)
+        return zlib.compress(payload)
+
+
+def as_text(value: Any) -> str:
+    """A decoded value as text, the way it would have been stored before encoding"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return orjson.dumps(value, option=JSON_OPTIONS).decode("utf-8")
+
+
+codec = CacheCodec(
+    compression_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+    compression=settings.CACHE_COMPRESSION,
+)
@@ -2,16 +2,30 @@
 Response caching middleware for FastAPI
 """
 import hashlib
-import json
-from typing import Callable
+import struct
+from typing import Any, Dict, Tuple
+
+import orjson
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.datastructures import Headers
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from backend.core.cache import cache
 from backend.core.config import settings
 
 
-class ResponseCacheMiddleware(BaseHTTPMiddleware):
+def pack_response(meta: Dict[str, Any], body: bytes) -> bytes:
+    """Cache entry of a response: length-prefixed JSON metadata, then the raw body"""
+    encoded = orjson.dumps(meta)
+    return struct.pack(">I", len(encoded)) + encoded + body
+
+
+def unpack_response(data: bytes) -> Tuple[Dict[str, Any], bytes]:
+    """Inverse of pack_response"""
+    (length,) = struct.unpack_from(">I", data)
+    return orjson.loads(data[4 : 4 + length]), data[4 + length :]
+
+
+class ResponseCacheMiddleware:
     """
     Middleware for caching HTTP responses
     
@@ -21,12 +35,12 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
     
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         default_ttl: int = 300,  # 5 minutes
         cache_methods: tuple = ("GET",),
         exclude_paths: tuple = ("/health", "/api/docs", "/api/redoc", "/api/openapi.json"),
     ):
-        super().__init__(app)
+        self.app = app
         self.default_ttl = default_ttl
         self.cache_methods = cache_methods
         self.exclude_paths = exclude_paths
@@ -72,11 +86,18 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         """Generate ETag for response content"""
         return f'"{hashlib.md5(content).hexdigest()}"'
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request with caching"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        
         # Check if should cache
         if not self.should_cache(request):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Generate cache key
         cache_key = self.generate_cache_key(request)
@@ -86,86 +107,99 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         
         # Try to get from cache
         try:
-            cached_data = await cache.get_json(cache_key)
+            cached_entry = await cache.get_bytes(cache_key)
             
-            if cached_data:
+            if cached_entry:
+                cached_data, cached_body = unpack_response(cached_entry)
                 cached_etag = cached_data.get("etag")
                 
                 # Check ETag match
                 if if_none_match and cached_etag == if_none_match:
                     # Return 304 Not Modified
-                    return Response(
+                    response = Response(
                         status_code=304,
                         headers={
                             "etag": cached_etag,
                             "x-cache": "HIT-304"
                         }
                     )
+                    await response(scope, receive, send)
+                    return
                 
                 # Return cached response
                 response = Response(
-                    content=cached_data["content"],
+                    content=cached_body,
                     status_code=cached_data["status_code"],
                     headers=dict(cached_data["headers"]),
                     media_type=cached_data.get("media_type")
                 )
                 response.headers["x-cache"] = "HIT"
                 response.headers["etag"] = cached_etag
-                return response
+                await response(scope, receive, send)
+                return
                 
         except Exception as e:
             print(f"Cache retrieval error: {e}")
         
-        # Call endpoint
-        response = await call_next(request)
+        # Only successful responses are buffered and cached; anything else streams through
+        start_message = None
+        body_parts = []
         
-        # Only cache successful responses
-        if response.status_code == 200:
+        async def send_caching(message: Message):
+            nonlocal start_message
+            if start_message is None and message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    start_message = False
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            
+            if not start_message or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            body = b"".join(body_parts)
+            headers = MutableHeaders(scope=start_message)
             try:
-                # Read response body
-                body = b""
-                async for chunk in response.body_iterator:
-                    body += chunk
-                
                 # Generate ETag
                 etag = self.generate_etag(body)
                 
-                # Prepare cache data
+                # Prepare cache data; the body is stored as-is, not re-encoded as text
                 cache_data = {
-                    "content": body.decode("utf-8") if body else "",
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "media_type": response.media_type,
+                    "status_code": start_message["status"],
+                    "headers": dict(headers),
+                    "media_type": headers.get("content-type"),
                     "etag": etag
                 }
                 
                 # Cache the response
-                await cache.set(cache_key, cache_data, self.default_ttl)
-                
-                # Create new response with ETag
-                new_response = Response(
-                    content=body,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type=response.media_type
-                )
-                new_response.headers["x-cache"] = "MISS"
-                new_response.headers["etag"] = etag
-                new_response.headers["cache-control"] = f"max-age={self.default_ttl}"
+                await cache.set(cache_key, pack_response(cache_data, body), self.default_ttl)
                 
-                return new_response
+                headers["x-cache"] = "MISS"
+                headers["etag"] = etag
+                headers["cache-control"] = f"max-age={self.default_ttl}"
                 
             except Exception as e:
                 print(f"Cache storage error: {e}")
+            
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
         
-        return response
+        # Call endpoint
+        await self.app(scope, receive, send_caching)
 
 
 def add_cache_headers(
     response: Response,
     max_age: int = 300,
     public: bool = True,
-    must_revalidate: bool = False
+    must_revalidate: bool = False,
+    immutable: bool = False
 ):
     """
     Add cache control headers to response
@@ -175,6 +209,7 @@ def add_cache_headers(
         max_age: Cache duration in seconds
         public: If True, allows shared caches (CDN)
         must_revalidate: If True, requires revalidation after expiry
+        immutable: If True, the content at this URL never changes (no revalidation)
     """
     directives = []
     
@@ -188,6 +223,9 @@ def add_cache_headers(
     if must_revalidate:
         directives.append("must-revalidate")
     
+    if immutable:
+        directives.append("immutable")
+    
     response.headers["cache-control"] = ", ".join(directives)
     
     return response
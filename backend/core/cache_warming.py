@@ -1,185 +1,260 @@
 """
-Cache warming service for preloading frequently accessed content.
+Access-driven cache warming
+
+Cached lookups that are worth warming (reference data, delivery listing totals, ...) are
+recorded on every request with access_tracker.record(). Counts are kept in-process and
+flushed periodically into one Redis sorted set per organization, whose scores decay by
+CACHE_ACCESS_DECAY after every warming run so recent popularity wins.
+
+On startup (so after every deploy) and then every CACHE_WARM_INTERVAL seconds one worker,
+the holder of a Redis lock, takes each organization's CACHE_WARM_TOP_N most accessed lookups
+and runs the warmer registered for their kind, CACHE_WARM_CONCURRENCY at a time and for at
+most CACHE_WARM_TIME_BUDGET seconds, so a cold start fills the cache without stampeding
+the database. Warmers go through the same cached code paths as requests, so values that
+are already cached cost one Redis read.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+import threading
+import time
+from collections import Counter
+from itertools import chain, zip_longest
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import desc
+import orjson
 
-from backend.db.session import SessionLocal
-from backend.models.content import ContentEntry
+from backend.core.cache import CacheKeys, cache
+from backend.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Seconds between flushes of in-process access counts to Redis
+ACCESS_FLUSH_INTERVAL = 60
 
-class CacheWarmingService:
-    """Service for warming up cache with popular content."""
+# Distinct lookups counted per worker between flushes; further ones are dropped
+ACCESS_BUFFER_MAX_SIZE = 10_000
 
-    def __init__(self):
-        self.is_warming = False
+# Lookups kept per organization, and the score below which they are forgotten
+ACCESS_MAX_TRACKED = 1000
+ACCESS_MIN_SCORE = 0.5
 
-    async def warm_popular_content(self, limit: int = 50, days_lookback: int = 7) -> int:
-        """
-        Warm cache with most recently published/updated content.
+# Held while a worker warms, and for an interval by the worker running the scheduled run
+WARMING_LOCK = "cache-warming"
+SCHEDULE_LOCK = "cache-warming-schedule"
 
-        Args:
-            limit: Number of content entries to warm
-            days_lookback: Only consider content from last N days
+Warmer = Callable[..., Awaitable[Any]]
 
-        Returns:
-            Number of entries cached
-        """
-        if self.is_warming:
-            logger.info("Cache warming already in progress, skipping")
-            return 0
-
-        self.is_warming = True
-        cached_count = 0
 
-        try:
-            db = SessionLocal()
-            try:
-                # Get recently published content
-                cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_lookback)
-
-                entries = (
-                    db.query(ContentEntry)
-                    .filter(ContentEntry.updated_at >= cutoff_date)
-                    .order_by(desc(ContentEntry.updated_at))
-                    .limit(limit)
-                    .all()
-                )
+def _member(kind: str, params: Dict[str, Any]) -> str:
+    return orjson.dumps([kind, params], option=orjson.OPT_SORT_KEYS).decode()
 
-                logger.info(f"Warming cache with {len(entries)} content entries")
 
-                for entry in entries:
-                    try:
-                        # Cache by ID
-                        cache_key = f"content_entry:{entry.id}"
-                        await cache_manager.set(cache_key, entry, ttl=3600)  # 1 hour
+def _parse_member(member) -> Tuple[str, Dict[str, Any]]:
+    kind, params = orjson.loads(member)
+    return kind, params
 
-                        # Cache by slug
-                        slug_key = f"content_slug:{entry.slug}"
-                        await cache_manager.set(slug_key, entry, ttl=3600)
 
-                        cached_count += 1
+def _jsonable(value):
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
 
-                    except Exception as e:
-                        logger.error(f"Failed to cache entry {entry.id}: {e}")
 
-                logger.info(f"Successfully warmed cache with {cached_count} entries")
+class AccessTracker:
+    """Counts accesses to warmable lookups per organization"""
 
-            finally:
-                db.close()
-
-        except Exception as e:
-            logger.error(f"Cache warming failed: {e}")
-        finally:
-            self.is_warming = False
-
-        return cached_count
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
 
-    async def warm_content_types(self) -> int:
+    def record(self, organization_id, kind: str, **params) -> None:
         """
-        Warm cache with content type definitions.
+        Count one access to a lookup
 
-        Returns:
-            Number of content types cached
+        Args:
+            organization_id: Organization the lookup belongs to
+            kind: Name the lookup's warmer is registered under
+            params: Keyword arguments the warmer is called with (JSON serializable)
         """
-        from backend.models.content import ContentType
-
-        cached_count = 0
-        db = SessionLocal()
+        key = (str(organization_id), _member(kind, {k: _jsonable(v) for k, v in params.items()}))
+        with self._lock:
+            if key in self._counts or len(self._counts) < ACCESS_BUFFER_MAX_SIZE:
+                self._counts[key] += 1
+
+    async def flush(self) -> int:
+        """Add the counts recorded since the last flush to Redis, in one round trip"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return 0
 
         try:
-            content_types = db.query(ContentType).all()
-
-            for ct in content_types:
-                try:
-                    cache_key = f"content_type:{ct.id}"
-                    await cache_manager.set(
-                        cache_key, ct, ttl=7200  # 2 hours (types change rarely)
-                    )
+            pipe = cache.client.pipeline(transaction=False)
+            for (organization_id, member), count in counts.items():
+                pipe.zincrby(
+                    CacheKeys.format(CacheKeys.CACHE_ACCESS, org_id=organization_id), count, member
+                )
+            pipe.sadd(CacheKeys.CACHE_ACCESS_ORGS, *{org_id for org_id, _ in counts})
+            await pipe.execute()
+        except Exception as e:
+            print(f"Cache access flush error: {e}")
+            return 0
+        return len(counts)
 
-                    # Also cache by name
-                    name_key = f"content_type_name:{ct.name}"
-                    await cache_manager.set(name_key, ct, ttl=7200)
+    async def decay(self, factor: float) -> None:
+        """Scale every organization's counts down and forget the coldest lookups"""
+        try:
+            for organization_id in await self.organizations():
+                key = CacheKeys.format(CacheKeys.CACHE_ACCESS, org_id=organization_id)
+                pipe = cache.client.pipeline(transaction=False)
+                pipe.zunionstore(key, {key: factor})
+                pipe.zremrangebyscore(key, "-inf", f"({ACCESS_MIN_SCORE}")
+                pipe.zremrangebyrank(key, 0, -ACCESS_MAX_TRACKED - 1)
+                pipe.exists(key)
+                *_, exists = await pipe.execute()
+                if not exists:
+                    await cache.client.srem(CacheKeys.CACHE_ACCESS_ORGS, organization_id)
+        except Exception as e:
+            print(f"Cache access decay error: {e}")
 
-                    cached_count += 1
+    async def organizations(self) -> List[str]:
+        members = await cache.client.smembers(CacheKeys.CACHE_ACCESS_ORGS)
+        return sorted(member.decode() for member in members)
 
-                except Exception as e:
-                    logger.error(f"Failed to cache content type {ct.id}: {e}")
+    async def top(self, organization_id, limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """An organization's most accessed lookups, as (kind, params), most accessed first"""
+        key = CacheKeys.format(CacheKeys.CACHE_ACCESS, org_id=organization_id)
+        members = await cache.client.zrevrange(key, 0, limit - 1)
+        return [_parse_member(member) for member in members]
 
-            logger.info(f"Warmed cache with {cached_count} content types")
 
-        finally:
-            db.close()
+class CacheWarmingService:
+    """Prefetches the most accessed lookups of every organization"""
 
-        return cached_count
+    def __init__(self, tracker: AccessTracker):
+        self.tracker = tracker
+        self.is_warming = False
+        self._warmers: Dict[str, Warmer] = {}
+        self._task: Optional[asyncio.Task] = None
 
-    async def warm_translations(self, locales: Optional[List[str]] = None) -> int:
+    def register(self, kind: str, warmer: Warmer) -> None:
         """
-        Warm cache with translation entries.
+        Register the warmer of a kind of lookup
 
         Args:
-            locales: Specific locales to warm (default: all)
-
-        Returns:
-            Number of translations cached
+            kind: Name used with access_tracker.record()
+            warmer: Coroutine function called as warmer(organization_id, **params); it
+                should fill the cache through the same code path requests use
         """
-        from backend.models.translation import Locale, Translation
-
-        cached_count = 0
-        db = SessionLocal()
+        self._warmers[kind] = warmer
+
+    async def warm(
+        self,
+        top_n: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> Dict[str, int]:
+        """
+        Warm each organization's most accessed lookups
 
-        try:
-            query = db.query(Translation)
+        Only one worker warms at a time; others return immediately.
 
-            if locales:
-                locale_objs = db.query(Locale).filter(Locale.code.in_(locales)).all()
-                locale_ids = [loc.id for loc in locale_objs]
-                query = query.filter(Translation.locale_id.in_(locale_ids))
+        Args:
+            top_n: Lookups per organization (default CACHE_WARM_TOP_N)
+            concurrency: Lookups warmed in parallel (default CACHE_WARM_CONCURRENCY)
+            time_budget: Seconds after which remaining lookups are skipped
+                (default CACHE_WARM_TIME_BUDGET)
 
-            translations = query.limit(1000).all()  # Limit to avoid memory issues
+        Returns:
+            Counts of warmed, failed and skipped lookups
+        """
+        top_n = top_n or settings.CACHE_WARM_TOP_N
+        concurrency = concurrency or settings.CACHE_WARM_CONCURRENCY
+        time_budget = time_budget or settings.CACHE_WARM_TIME_BUDGET
+        results = {"warmed": 0, "failed": 0, "skipped": 0}
 
-            for trans in translations:
-                try:
-                    cache_key = f"translation:{trans.entry_id}:{trans.locale_id}"
-                    await cache_manager.set(cache_key, trans, ttl=3600)
-                    cached_count += 1
+        if self.is_warming:
+            logger.info("Cache warming already in progress, skipping")
+            return results
 
-                except Exception as e:
-                    logger.error(f"Failed to cache translation {trans.id}: {e}")
+        self.is_warming = True
+        token = await cache.acquire_lock(WARMING_LOCK, time_budget + 10)
+        if token is None:
+            self.is_warming = False
+            return results
 
-            logger.info(f"Warmed cache with {cached_count} translations")
+        try:
+            await self.tracker.flush()
+            jobs = await self._jobs(top_n)
+            deadline = time.monotonic() + time_budget
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run(kind: str, organization_id: str, params: Dict[str, Any]):
+                async with semaphore:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        results["skipped"] += 1
+                        return
+                    try:
+                        await asyncio.wait_for(
+                            self._warmers[kind](organization_id, **params), remaining
+                        )
+                        results["warmed"] += 1
+                    except Exception as e:
+                        results["failed"] += 1
+                        logger.warning(f"Failed to warm {kind} {params} of {organization_id}: {e}")
 
+            await asyncio.gather(*(run(*job) for job in jobs))
+            logger.info(f"Cache warming complete: {results}")
+        except Exception as e:
+            logger.error(f"Cache warming failed: {e}")
         finally:
-            db.close()
-
-        return cached_count
-
-    async def warm_all(self) -> dict:
-        """
-        Warm all cache categories.
-
-        Returns:
-            Dictionary with counts for each category
-        """
-        logger.info("Starting comprehensive cache warming")
-
-        results = {
-            "content_entries": await self.warm_popular_content(),
-            "content_types": await self.warm_content_types(),
-            "translations": await self.warm_translations(),
-        }
-
-        total = sum(results.values())
-        logger.info(f"Cache warming complete: {total} total items cached")
+            self.is_warming = False
+            await cache.release_lock(WARMING_LOCK, token)
 
         return results
 
+    async def _jobs(self, top_n: int) -> List[Tuple[str, str, Dict[str, Any]]]:
+        per_organization = []
+        for organization_id in await self.tracker.organizations():
+            per_organization.append(
+                [
+                    (kind, organization_id, params)
+                    for kind, params in await self.tracker.top(organization_id, top_n)
+                    if kind in self._warmers
+                ]
+            )
+        # Round-robin across organizations so one tenant can't use up the time budget
+        return [job for job in chain.from_iterable(zip_longest(*per_organization)) if job]
+
+    async def run(self) -> None:
+        """Warm now, then flush access counts and warm again on schedule (until cancelled)"""
+        await self.warm()
+        while True:
+            await asyncio.sleep(ACCESS_FLUSH_INTERVAL)
+            await self.tracker.flush()
+            # Never released: whichever worker takes it runs this interval's warming
+            period = settings.CACHE_WARM_INTERVAL - ACCESS_FLUSH_INTERVAL
+            if await cache.acquire_lock(SCHEDULE_LOCK, max(period, 1)) is not None:
+                await self.tracker.decay(settings.CACHE_ACCESS_DECAY)
+                await self.warm()
+
+    def start(self) -> None:
+        """Start the warming loop in the background"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the warming loop, keeping the counts recorded since the last flush"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.tracker.flush()
+
 
-# Global instance
-cache_warming_service = CacheWarmingService()
+# Global instances
+access_tracker = AccessTracker()
+cache_warming_service = CacheWarmingService(access_tracker)
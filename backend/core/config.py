@@ -52,6 +52,38 @@ class Settings(BaseSettings):
     REDIS_URL: str = Field(default="redis://localhost:6379/0", description="Redis connection URL")
     REDIS_MAX_CONNECTIONS: int = Field(default=10, description="Redis connection pool size")
 
+    # In-process (L1) cache in front of Redis, kept coherent over Redis pub/sub
+    CACHE_L1_ENABLED: bool = Field(
+        default=True, description="Serve opted-in cache keys from a per-worker LRU"
+    )
+    CACHE_L1_MAX_ITEMS: int = Field(default=1000, description="Max entries in the L1 cache")
+    CACHE_L1_MAX_BYTES: int = Field(
+        default=16 * 1024 * 1024, description="Max serialized size of all L1 entries"
+    )
+    CACHE_L1_TTL: int = Field(
+        default=60, description="Seconds an L1 entry is served without re-reading Redis"
+    )
+    CACHE_COMPRESSION: str = Field(
+        default="zstd", description="Compression of large cached values: zstd, zlib or none"
+    )
+    CACHE_COMPRESSION_THRESHOLD: int = Field(
+        default=1024, description="Compress cached values larger than this many bytes"
+    )
+
+    # Cache warming (most accessed lookups per tenant, on startup and on a schedule)
+    CACHE_WARMING_ENABLED: bool = Field(default=True, description="Run the cache warmer")
+    CACHE_WARM_INTERVAL: int = Field(default=900, description="Seconds between warming runs")
+    CACHE_WARM_TOP_N: int = Field(
+        default=50, description="Most accessed lookups warmed per organization"
+    )
+    CACHE_WARM_CONCURRENCY: int = Field(default=4, description="Lookups warmed in parallel")
+    CACHE_WARM_TIME_BUDGET: float = Field(
+        default=30.0, description="Seconds a warming run may take before it stops"
+    )
+    CACHE_ACCESS_DECAY: float = Field(
+        default=0.5, description="Factor access counts are multiplied by after each run"
+    )
+
     # Meilisearch
     MEILISEARCH_URL: str = Field(
         default="http://localhost:7700", description="Meilisearch server URL"
@@ -131,6 +163,22 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = Field(
         default=10 * 1024 * 1024, description="Maximum file upload size in bytes (default: 10MB)"
     )
+    MEDIA_TRANSFORM_SIZES: str = Field(
+        default="64,128,256,320,480,640,768,1024,1280,1600,1920,2560",
+        description="Comma-separated widths and heights /media/transform may produce",
+    )
+    MEDIA_TRANSFORM_QUALITIES: str = Field(
+        default="50,65,75,85,95",
+        description="Comma-separated encoder qualities /media/transform may use",
+    )
+    IMAGE_WORKER_PROCESSES: int = Field(
+        default=2,
+        description="Image processing processes per API worker (0 = use the threadpool)",
+    )
+    IMAGE_WORKER_MAX_PENDING: int = Field(
+        default=16,
+        description="Image tasks queued or running per API worker before rejecting with 503",
+    )
 
     # Translation
     TRANSLATION_PROVIDER: str = Field(
@@ -0,0 +1,161 @@
+"""
+Content entry totals for paginated listings
+
+Totals are computed with ``SELECT count(*)`` (never by loading rows) and, for unfiltered
+listings, cached in Redis per (organization, content type, status). Cached totals are
+tagged with their organization's and content type's list tags (see CacheTags), so every
+write path that invalidates a content list also drops its cached totals.
+
+For very large content types an approximate mode returns PostgreSQL's planner row
+estimate instead of counting; callers surface it via the ``X-Total-Count-Approximate``
+response header.
+"""
+
+import json
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.expression import ClauseElement
+
+from backend.core.cache import (
+    CacheKeys,
+    CacheTags,
+    cache,
+    invalidate_tags,
+    invalidate_tags_sync,
+    single_flight,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cached totals are invalidated on write; the TTL only bounds drift from missed writes
+CONTENT_COUNT_TTL = 600
+
+# Below this planner estimate an exact count is cheap enough to run anyway
+APPROXIMATE_COUNT_THRESHOLD = 100_000
+
+
+def content_count_key(organization_id, content_type_id, status: str) -> str:
+    """Cache key of the total for one (organization, content type, status)"""
+    return CacheKeys.format(
+        CacheKeys.CONTENT_COUNT, org_id=organization_id, type_id=content_type_id, status=status
+    )
+
+
+def content_count_tags(organization_id, content_type_id) -> List[str]:
+    """Tags a cached total is registered under"""
+    return [
+        CacheTags.organization(organization_id),
+        CacheTags.content_lists(organization_id),
+        CacheTags.content_list(organization_id, content_type_id),
+    ]
+
+
+def _content_list_tag(organization_id, content_type_id) -> str:
+    if content_type_id is None:
+        return CacheTags.content_lists(organization_id)
+    return CacheTags.content_list(organization_id, content_type_id)
+
+
+async def invalidate_content_counts(organization_id, content_type_id=None) -> None:
+    """Drop cached content totals of one content type, or of the whole organization"""
+    await invalidate_tags(_content_list_tag(organization_id, content_type_id))
+
+
+def invalidate_content_counts_sync(organization_id, content_type_id=None) -> None:
+    """Drop cached content totals (synchronous version)"""
+    invalidate_tags_sync(_content_list_tag(organization_id, content_type_id))
+
+
+class _ExplainJSON(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, compiled with the statement's own bind parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_ExplainJSON, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_row_count(db: AsyncSession, stmt) -> Optional[int]:
+    """
+    PostgreSQL planner estimate of the rows stmt returns
+
+    Returns None on other dialects or if the statement cannot be explained.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+
+    # SELECT 1 over the same FROM/WHERE: same estimate, and no typed result columns for the
+    # plan document to be run through
+    probe = stmt.with_only_columns(literal_column("1"), maintain_column_froms=True).order_by(
+        None
+    )
+    try:
+        result = await db.execute(_ExplainJSON(probe))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Could not estimate row count, falling back to COUNT: {e}")
+        return None
+
+
+async def count_rows(
+    db: AsyncSession,
+    stmt,
+    cache_key: Optional[str] = None,
+    approximate: bool = False,
+    tags: Sequence[str] = (),
+) -> Tuple[int, bool]:
+    """
+    Total number of rows stmt returns
+
+    Args:
+        db: Async database session
+        stmt: Select to count (ordering, limit and offset must not be applied yet)
+        cache_key: Cache the exact total under this key (None = do not cache, e.g. when
+            the listing has ad-hoc filters)
+        approximate: Allow a planner estimate when it exceeds APPROXIMATE_COUNT_THRESHOLD
+        tags: Tags to cache the total under (see content_count_tags)
+
+    Returns:
+        Tuple of (total, is_approximate)
+    """
+    if cache_key:
+        cached_total = await cache.get(cache_key)
+        if cached_total is not None:
+            return int(cached_total), False
+
+    if approximate:
+        estimate = await estimate_row_count(db, stmt)
+        if estimate is not None and estimate >= APPROXIMATE_COUNT_THRESHOLD:
+            return estimate, True
+
+    async def count() -> int:
+        result = await db.execute(
+            select(func.count()).select_from(stmt.order_by(None).subquery())
+        )
+        total = result.scalar_one()
+        if cache_key:
+            await cache.set(cache_key, total, CONTENT_COUNT_TTL, tags=tags)
+        return total
+
+    if not cache_key:
+        return await count(), False
+
+    async def counted_elsewhere() -> Optional[int]:
+        value = await cache.get(cache_key)
+        return None if value is None else int(value)
+
+    # Totals of big listings expire together; count each one once
+    return await single_flight(cache_key, count, wait_for=counted_elsewhere), False
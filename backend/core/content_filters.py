@@ -0,0 +1,198 @@
+"""
+Generic field filters over ContentEntry.data
+
+Query string syntax (repeatable, combined with AND):
+
+    filter[data.<path>]=value              # same as [eq]
+    filter[data.<path>][eq]=value
+    filter[data.<path>][in]=a,b,c
+    filter[data.<path>][gt]=10
+    filter[data.<path>][lt]=2025-01-01
+    filter[data.<path>][contains]=value    # array at <path> contains value
+
+<path> is a dot-separated path into the entry's JSON data (e.g. ``data.specs.color``).
+
+On PostgreSQL ``eq``, ``in`` and ``contains`` compile to JSONB containment (``@>``), which
+the ``ix_content_entries_data_gin`` index serves; ``gt``/``lt`` use path extraction
+(``#>>``). On SQLite the same filters compile to ``json_extract``/``json_each``.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, List, Tuple
+
+from sqlalchemy import Numeric, and_, case, cast, exists, func, literal, or_, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from starlette.datastructures import QueryParams
+
+from backend.core.exceptions import BadRequestException
+
+FILTER_PARAM_PATTERN = re.compile(
+    r"^filter\[data\.(?P<path>[A-Za-z0-9_\-]+(?:\.[A-Za-z0-9_\-]+)*)\](?:\[(?P<op>[a-z]+)\])?$"
+)
+FILTER_OPERATORS = ("eq", "in", "gt", "lt", "contains")
+MAX_DATA_FILTERS = 10
+MAX_IN_VALUES = 50
+
+
+@dataclass
+class DataFilter:
+    """A single parsed filter[data.<path>][<op>]=<value> condition"""
+
+    path: Tuple[str, ...]
+    op: str
+    value: str
+
+    @property
+    def values(self) -> List[str]:
+        """Values of an ``in`` filter (comma separated)"""
+        return [v for v in self.value.split(",") if v != ""]
+
+
+def parse_data_filters(query_params: QueryParams) -> List[DataFilter]:
+    """
+    Extract filter[data.<path>][<op>] parameters from a request's query string
+
+    Raises:
+        BadRequestException: On unknown operators or too many filters/values
+    """
+    filters = []
+    for key, value in query_params.multi_items():
+        match = FILTER_PARAM_PATTERN.match(key)
+        if not match:
+            if key.startswith("filter["):
+                raise BadRequestException(f"Unsupported filter parameter '{key}'")
+            continue
+
+        op = match.group("op") or "eq"
+        if op not in FILTER_OPERATORS:
+            raise BadRequestException(
+                f"Unsupported filter operator '{op}'. Use one of: {', '.join(FILTER_OPERATORS)}"
+            )
+
+        data_filter = DataFilter(path=tuple(match.group("path").split(".")), op=op, value=value)
+        if op == "in" and not 0 < len(data_filter.values) <= MAX_IN_VALUES:
+            raise BadRequestException(f"filter [in] takes between 1 and {MAX_IN_VALUES} values")
+        filters.append(data_filter)
+
+    if len(filters) > MAX_DATA_FILTERS:
+        raise BadRequestException(f"At most {MAX_DATA_FILTERS} data filters are allowed")
+
+    return filters
+
+
+def _candidate_values(raw: str) -> List[Any]:
+    """
+    JSON values a query-string value may stand for
+
+    Query strings are untyped, so "10" matches both the string "10" and the number 10,
+    and "true" matches both "true" and the boolean true.
+    """
+    candidates: List[Any] = [raw]
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        return candidates
+    if isinstance(parsed, (int, float, bool)) and parsed not in candidates:
+        candidates.append(parsed)
+    return candidates
+
+
+def _as_number(raw: str):
+    try:
+        return float(raw) if any(c in raw for c in ".eE") else int(raw)
+    except ValueError:
+        return None
+
+
+def _nest(path: Tuple[str, ...], value: Any) -> Any:
+    """Build the containment document {"a": {"b": value}} for path ("a", "b")"""
+    for key in reversed(path):
+        value = {key: value}
+    return value
+
+
+def _postgres_condition(column, data_filter: DataFilter):
+    document = type_coerce(column, JSONB)
+    path = data_filter.path
+
+    if data_filter.op in ("eq", "in"):
+        raw_values = data_filter.values if data_filter.op == "in" else [data_filter.value]
+        return or_(
+            *[
+                document.contains(_nest(path, candidate))
+                for raw in raw_values
+                for candidate in _candidate_values(raw)
+            ]
+        )
+
+    if data_filter.op == "contains":
+        return or_(
+            *[
+                document.contains(_nest(path, [candidate]))
+                for candidate in _candidate_values(data_filter.value)
+            ]
+        )
+
+    # gt / lt: numeric comparison for numbers, text comparison otherwise (e.g. ISO dates)
+    number = _as_number(data_filter.value)
+    if number is not None:
+        target = case(
+            (
+                func.jsonb_typeof(document[path]) == "number",
+                cast(document[path].astext, Numeric),
+            )
+        )
+        value = number
+    else:
+        target = document[path].astext
+        value = data_filter.value
+    return target > value if data_filter.op == "gt" else target < value
+
+
+def _sqlite_condition(column, data_filter: DataFilter):
+    json_path = "$." + ".".join(f'"{key}"' for key in data_filter.path)
+    extracted = func.json_extract(column, json_path)
+
+    if data_filter.op in ("eq", "in"):
+        raw_values = data_filter.values if data_filter.op == "in" else [data_filter.value]
+        candidates = [c for raw in raw_values for c in _candidate_values(raw)]
+        return extracted.in_(candidates)
+
+    if data_filter.op == "contains":
+        element = func.json_each(column, json_path).table_valued("value")
+        return exists(
+            select(literal(1))
+            .select_from(element)
+            .where(element.c.value.in_(_candidate_values(data_filter.value)))
+        )
+
+    number = _as_number(data_filter.value)
+    if number is not None:
+        comparison = extracted > number if data_filter.op == "gt" else extracted < number
+        return and_(func.json_type(column, json_path).in_(("integer", "real")), comparison)
+    value = data_filter.value
+    return extracted > value if data_filter.op == "gt" else extracted < value
+
+
+def apply_data_filters(db: Session, stmt, column, filters: List[DataFilter]):
+    """
+    Apply parsed data filters to a Query/Select over the model owning ``column``
+
+    Args:
+        db: Session the statement will run against (used to pick the SQL dialect)
+        stmt: SQLAlchemy ORM Query or Select
+        column: JSON document column to filter (e.g. ContentEntry.data)
+        filters: Filters returned by parse_data_filters
+    """
+    if not filters:
+        return stmt
+
+    if db.get_bind().dialect.name == "postgresql":
+        conditions = [_postgres_condition(column, f) for f in filters]
+    else:
+        conditions = [_sqlite_condition(column, f) for f in filters]
+
+    return stmt.filter(and_(*conditions))
@@ -10,17 +10,17 @@ Set AUTH_PROVIDER environment variable to switch providers.
 
 import logging
 import os
-from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend.core.api_key_auth import authenticate_api_key, authenticate_api_key_async
 from backend.core.config import settings
-from backend.core.security import verify_password, verify_token
-from backend.db.session import get_db
-from backend.models.api_key import APIKey
+from backend.core.principals import get_user_for_token, get_user_for_token_async
+from backend.db.session import get_async_db, get_db
 from backend.models.organization import Organization
 from backend.models.user import User
 
@@ -38,12 +38,7 @@ async def _get_user_from_cms_token(token: str, db: Session) -> Optional[User]:
     """
     Validate CMS JWT token and return user.
     """
-    token_data = verify_token(token, token_type="access")
-    if not token_data:
-        return None
-
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    return user
+    return get_user_for_token(token, db)
 
 
 async def _get_or_create_user_from_keycloak(token: str, db: Session) -> Optional[User]:
@@ -214,23 +209,12 @@ async def get_current_user_unverified(
     Raises:
         HTTPException: 401 if token is invalid or user not found
     """
-    token = credentials.credentials
-
-    # Verify token
-    token_data = verify_token(token, token_type="access")
-    if not token_data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    # Get user from database
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    # Verify token and get user (principal cache, then database)
+    user = get_user_for_token(credentials.credentials, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
@@ -276,13 +260,7 @@ def get_optional_user(
         return None
 
     try:
-        token = credentials.credentials
-        token_data = verify_token(token, token_type="access")
-
-        if not token_data:
-            return None
-
-        user = db.query(User).filter(User.id == token_data.sub).first()
+        user = get_user_for_token(credentials.credentials, db)
 
         if user and user.is_active:
             return user
@@ -329,6 +307,9 @@ async def get_api_key_auth(
     """
     Authenticate using API key from X-API-Key header.
 
+    The key is found by its indexed lookup hash and verified once, then cached briefly;
+    last_used_at is written in periodic batches (see backend.core.api_key_auth).
+
     Args:
         x_api_key: API key from X-API-Key header
         db: Database session
@@ -339,36 +320,11 @@ async def get_api_key_auth(
     if not x_api_key:
         return None
 
-    # Query all active API keys
-    api_keys = db.query(APIKey).filter(APIKey.is_active == True).all()
-
-    # Check each key's hash
-    for api_key in api_keys:
-        if verify_password(x_api_key, api_key.key_hash):
-            # Check expiration
-            expires_at_value = api_key.expires_at
-            if isinstance(expires_at_value, str):
-                from dateutil import parser
-
-                expires_at_value = parser.parse(expires_at_value)
-
-            if expires_at_value and datetime.now(timezone.utc) > expires_at_value:
-                continue
-
-            # Update last used timestamp
-            api_key.last_used_at = datetime.now(timezone.utc)
-            db.commit()
-
-            # Parse permissions
-            permissions = api_key.permissions.split(",") if api_key.permissions else []
-
-            return {
-                "organization_id": api_key.organization_id,
-                "permissions": permissions,
-                "api_key_id": api_key.id,
-            }
+    verified = authenticate_api_key(db, x_api_key)
+    if not verified:
+        return None
 
-    return None
+    return verified.auth_context()
 
 
 async def get_current_user_or_api_key(
@@ -397,17 +353,13 @@ async def get_current_user_or_api_key(
     # Try JWT token
     if credentials:
         try:
-            token = credentials.credentials
-            token_data = verify_token(token, token_type="access")
-
-            if token_data:
-                user = db.query(User).filter(User.id == token_data.sub).first()
-                # Skip email verification check in test mode
-                skip_email_verification = (
-                    os.environ.get("SKIP_EMAIL_VERIFICATION", "").lower() == "true"
-                )
-                if user and user.is_active and (user.is_email_verified or skip_email_verification):
-                    return (user, None)
+            user = get_user_for_token(credentials.credentials, db)
+            # Skip email verification check in test mode
+            skip_email_verification = (
+                os.environ.get("SKIP_EMAIL_VERIFICATION", "").lower() == "true"
+            )
+            if user and user.is_active and (user.is_email_verified or skip_email_verification):
+                return (user, None)
         except Exception:
             pass
 
@@ -426,7 +378,11 @@ async def require_auth(
     Raises HTTPException 401 if neither auth method is valid.
     """
     user, api_key_auth = await get_current_user_or_api_key(credentials, x_api_key, db)
+    return _build_auth_context(user, api_key_auth)
+
 
+def _build_auth_context(user: Optional[User], api_key_auth: Optional[dict]) -> dict:
+    """Auth context for require_auth; raises 401 if neither auth method succeeded"""
     if user:
         # JWT authentication
         return {
@@ -461,6 +417,11 @@ async def get_current_user_flexible(
 
     For API key auth, returns a virtual user with organization_id set.
     """
+    return _user_from_auth_context(auth_context)
+
+
+def _user_from_auth_context(auth_context: dict) -> User:
+    """The authenticated user, or a virtual user carrying organization_id for API keys"""
     if auth_context["auth_type"] == "jwt":
         return auth_context["user"]
 
@@ -477,6 +438,66 @@ async def get_current_user_flexible(
     return virtual_user
 
 
+# ---------------------------------------------------------------------------
+# AsyncSession variants for hot read endpoints (see get_async_db). Users returned here
+# belong to the AsyncSession: read loaded columns only, never lazy-load relationships.
+# ---------------------------------------------------------------------------
+
+
+async def _get_user_from_cms_token_async(token: str, db: AsyncSession) -> Optional[User]:
+    """Async variant of _get_user_from_cms_token."""
+    return await get_user_for_token_async(token, db)
+
+
+async def get_api_key_auth_async(
+    x_api_key: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+) -> Optional[dict]:
+    """Async variant of get_api_key_auth."""
+    if not x_api_key:
+        return None
+
+    verified = await authenticate_api_key_async(db, x_api_key)
+    if not verified:
+        return None
+
+    return verified.auth_context()
+
+
+async def require_auth_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """Async variant of require_auth (JWT token OR API key)."""
+    # Try API key first
+    if x_api_key:
+        api_key_auth = await get_api_key_auth_async(x_api_key, db)
+        if api_key_auth:
+            return _build_auth_context(None, api_key_auth)
+
+    # Try JWT token
+    if credentials:
+        try:
+            user = await _get_user_from_cms_token_async(credentials.credentials, db)
+            # Skip email verification check in test mode
+            skip_email_verification = (
+                os.environ.get("SKIP_EMAIL_VERIFICATION", "").lower() == "true"
+            )
+            if user and user.is_active and (user.is_email_verified or skip_email_verification):
+                return _build_auth_context(user, None)
+        except Exception:
+            pass
+
+    return _build_auth_context(None, None)
+
+
+async def get_current_user_flexible_async(
+    auth_context: dict = Depends(require_auth_async),
+) -> User:
+    """Async variant of get_current_user_flexible (JWT user or API key virtual user)."""
+    return _user_from_auth_context(auth_context)
+
+
 def require_permission(permission: str):
     """
     Dependency factory that requires a specific permission.
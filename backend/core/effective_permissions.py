@@ -0,0 +1,286 @@
+"""
+Effective permission sets
+
+A user's effective permissions (organization ownership, super admin, the hierarchy-expanded
+permission names of their roles and of every lower-level role in the organization, and the
+content-type/field scoped grants of their own roles) are computed once and then reused:
+
+- per request, memoized on the User instance, so an endpoint checking several permissions
+  (or filtering fields one by one) pays for one computation;
+- across requests, in Redis under a key that includes the organization's RBAC version.
+
+The RBAC version is a Redis counter per organization (plus a global one for permission
+definitions). A session listener bumps it after any commit that changes roles, role
+permissions, role assignments or organization ownership, so cached sets are never served
+after an RBAC change; stale versions simply expire.
+"""
+
+import json
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, FrozenSet, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, selectinload
+
+from backend.core.cache import CacheKeys, cache
+from backend.core.permission_hierarchy import PERMISSION_CLOSURE, PermissionHierarchyService
+from backend.models.organization import Organization
+from backend.models.rbac import Permission, Role
+from backend.models.user import User
+
+# Cached sets are versioned; the TTL only reclaims entries of old versions
+EFFECTIVE_PERMISSIONS_TTL = 3600
+
+GLOBAL_RBAC_VERSION = "global"
+
+# Per-request memo on the User instance
+_MEMO_ATTRIBUTE = "_effective_permissions"
+_DIRTY_ORGS_KEY = "rbac_dirty_orgs"
+
+
+def _scope_matches(granted: Optional[str], requested: Any) -> bool:
+    """A grant scope of None applies to everything; otherwise it must equal the request"""
+    return requested is None or granted is None or granted == str(requested)
+
+
+@dataclass(frozen=True)
+class EffectivePermissions:
+    """Everything PermissionChecker needs to answer permission checks for one user"""
+
+    is_owner: bool
+    is_super_admin: bool
+    # Hierarchy-expanded names from the user's roles and all lower-level roles
+    permissions: FrozenSet[str]
+    # (permission name, content_type_id, field_name) of the user's own roles
+    grants: Tuple[Tuple[str, Optional[str], Optional[str]], ...]
+
+    def has(
+        self,
+        permission_name: str,
+        content_type_id: Any = None,
+        field_name: Optional[str] = None,
+        use_hierarchy: bool = True,
+    ) -> bool:
+        """Same semantics as PermissionChecker.has_permission"""
+        # Organization owners have all permissions
+        if self.is_owner or self.is_super_admin:
+            return True
+
+        if use_hierarchy:
+            if permission_name not in self.permissions:
+                return False
+            if content_type_id is None and field_name is None:
+                return True
+
+        for granted_name, granted_type_id, granted_field in self.grants:
+            if use_hierarchy:
+                if permission_name not in PERMISSION_CLOSURE.get(granted_name, (granted_name,)):
+                    continue
+            elif granted_name != permission_name:
+                continue
+
+            if not _scope_matches(granted_type_id, content_type_id):
+                continue
+            if not _scope_matches(granted_field, field_name):
+                continue
+
+            return True
+
+        return False
+
+    def direct_permission_names(self) -> Set[str]:
+        """Names granted by the user's own roles, without hierarchy expansion"""
+        return {name for name, _, _ in self.grants}
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "is_owner": self.is_owner,
+                "is_super_admin": self.is_super_admin,
+                "permissions": sorted(self.permissions),
+                "grants": list(self.grants),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, value: str) -> "EffectivePermissions":
+        data = json.loads(value)
+        return cls(
+            is_owner=data["is_owner"],
+            is_super_admin=data["is_super_admin"],
+            permissions=frozenset(data["permissions"]),
+            grants=tuple(tuple(grant) for grant in data["grants"]),
+        )
+
+
+def compute_effective_permissions(user: User, db: Session) -> EffectivePermissions:
+    """
+    Compute a user's effective permissions from the database (uncached)
+
+    Costs one query for organization ownership, the user's roles and their permissions,
+    plus one query for the organization's roles when the user has roles in it.
+    """
+    organization = (
+        db.query(Organization.owner_id).filter(Organization.id == user.organization_id).first()
+    )
+    is_owner = organization is not None and organization.owner_id == user.id
+
+    roles = list(user.roles)
+    is_super_admin = any(role.name == "super_admin" for role in roles)
+    org_roles = [role for role in roles if role.organization_id == user.organization_id]
+
+    grants = tuple(
+        (
+            permission.name,
+            str(permission.content_type_id) if permission.content_type_id is not None else None,
+            permission.field_name,
+        )
+        for role in org_roles
+        for permission in role.permissions
+    )
+
+    permissions: FrozenSet[str] = frozenset()
+    if not is_super_admin and org_roles:
+        # Each role inherits the permissions of every lower-level role in the organization
+        max_level = max(PermissionHierarchyService.get_role_level(role) for role in org_roles)
+        lower_roles = [
+            role
+            for role in db.query(Role)
+            .options(selectinload(Role.permissions))
+            .filter(Role.organization_id == user.organization_id)
+            .all()
+            if PermissionHierarchyService.get_role_level(role) < max_level
+        ]
+        names = {
+            permission.name for role in org_roles + lower_roles for permission in role.permissions
+        }
+        permissions = frozenset(
+            chain.from_iterable(PERMISSION_CLOSURE.get(name, (name,)) for name in names)
+        )
+
+    return EffectivePermissions(
+        is_owner=is_owner,
+        is_super_admin=is_super_admin,
+        permissions=permissions,
+        grants=grants,
+    )
+
+
+def _effective_permissions_key(user: User) -> Optional[str]:
+    """Redis key of the user's set at the current RBAC versions, None if unavailable"""
+    if user.id is None or user.organization_id is None:
+        # Virtual API key users have nothing worth caching
+        return None
+
+    versions = cache.get_many_sync(
+        [
+            CacheKeys.format(CacheKeys.RBAC_VERSION, org_id=GLOBAL_RBAC_VERSION),
+            CacheKeys.format(CacheKeys.RBAC_VERSION, org_id=user.organization_id),
+        ]
+    )
+    if versions is None:
+        return None
+
+    return CacheKeys.format(
+        CacheKeys.EFFECTIVE_PERMISSIONS,
+        org_id=user.organization_id,
+        user_id=user.id,
+        version=".".join(version or "0" for version in versions),
+    )
+
+
+def get_effective_permissions(user: User, db: Session) -> EffectivePermissions:
+    """The user's effective permissions: request memo, then Redis, then the database"""
+    memo = user.__dict__.get(_MEMO_ATTRIBUTE)
+    if memo is not None:
+        return memo
+
+    effective = None
+    cache_key = _effective_permissions_key(user)
+    if cache_key:
+        cached = cache.get_sync(cache_key)
+        if cached:
+            effective = EffectivePermissions.from_json(cached)
+
+    if effective is None:
+        effective = compute_effective_permissions(user, db)
+        if cache_key:
+            cache.set_sync(cache_key, effective.to_json(), EFFECTIVE_PERMISSIONS_TTL)
+
+    user.__dict__[_MEMO_ATTRIBUTE] = effective
+    return effective
+
+
+def bump_rbac_version(organization_id) -> None:
+    """Invalidate every cached effective permission set of an organization ("global" = all)"""
+    cache.increment_sync(CacheKeys.format(CacheKeys.RBAC_VERSION, org_id=organization_id))
+
+
+# ---------------------------------------------------------------------------
+# Version bumps: detect RBAC changes on flush, bump once the transaction commits
+# ---------------------------------------------------------------------------
+
+_RBAC_ATTRIBUTES = {
+    Role: ("name", "level", "organization_id", "permissions", "users"),
+    User: ("organization_id", "roles"),
+    Organization: ("owner_id",),
+    Permission: ("name", "content_type_id", "field_name"),
+}
+
+
+def _changed_attributes(obj, attributes) -> bool:
+    state = sa_inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+def _affected_organizations(obj, is_new_or_deleted: bool) -> Set[Any]:
+    attributes = _RBAC_ATTRIBUTES[type(obj)]
+    if not is_new_or_deleted and not _changed_attributes(obj, attributes):
+        return set()
+
+    if isinstance(obj, Permission):
+        # Permissions are shared by roles of any organization
+        return {GLOBAL_RBAC_VERSION}
+    if isinstance(obj, Organization):
+        return {obj.id}
+
+    organizations = {obj.organization_id}
+    # Moving a role or user between organizations affects the old one too
+    organizations.update(sa_inspect(obj).attrs.organization_id.history.deleted or ())
+    return organizations
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_rbac_changes(session, flush_context):
+    affected: Set[Any] = set()
+    for objects, is_new_or_deleted in (
+        (session.new, True),
+        (session.deleted, True),
+        (session.dirty, False),
+    ):
+        for obj in objects:
+            if type(obj) in _RBAC_ATTRIBUTES:
+                affected |= _affected_organizations(obj, is_new_or_deleted)
+
+    affected.discard(None)
+    if not affected:
+        return
+
+    session.info.setdefault(_DIRTY_ORGS_KEY, set()).update(affected)
+    # Later checks in this request must not reuse sets memoized before the change
+    for obj in session.identity_map.values():
+        if isinstance(obj, User):
+            obj.__dict__.pop(_MEMO_ATTRIBUTE, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_rbac_versions(session):
+    for organization_id in session.info.pop(_DIRTY_ORGS_KEY, ()):
+        bump_rbac_version(organization_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rbac_changes(session):
+    session.info.pop(_DIRTY_ORGS_KEY, None)
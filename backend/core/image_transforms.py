@@ -0,0 +1,156 @@
+"""
+On-the-fly image variants for GET /media/transform/{filename}
+
+A variant is a source image resized to fit a width and/or height, encoded as JPEG, WebP
+or AVIF. Only sizes and qualities in MEDIA_TRANSFORM_SIZES and MEDIA_TRANSFORM_QUALITIES
+are accepted, so clients can't make the server render (and store) arbitrarily many
+variants of an image.
+
+Variants are generated once and stored next to the originals under
+variants/<source key>/, keyed by the source's content hash, so every media item with the
+same content shares them and they never need invalidating.
+"""
+
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from PIL import Image, ImageOps
+
+from backend.core.config import settings
+
+# fmt query value: (Pillow format, MIME type, file extension)
+TRANSFORM_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "avif": ("AVIF", "image/avif", ".avif"),
+}
+
+# contain: fit inside the box, keeping the aspect ratio; cover: fill the box, cropping
+TRANSFORM_FITS = ("contain", "cover")
+
+DEFAULT_TRANSFORM_QUALITY = 75
+
+
+def _parse_allowlist(value: str) -> FrozenSet[int]:
+    return frozenset(int(item) for item in value.split(",") if item.strip())
+
+
+def allowed_sizes() -> FrozenSet[int]:
+    return _parse_allowlist(settings.MEDIA_TRANSFORM_SIZES)
+
+
+def allowed_qualities() -> FrozenSet[int]:
+    return _parse_allowlist(settings.MEDIA_TRANSFORM_QUALITIES)
+
+
+@dataclass(frozen=True)
+class ImageTransform:
+    """A validated variant request"""
+
+    width: Optional[int]
+    height: Optional[int]
+    fit: str
+    format: str
+    quality: int
+
+    @classmethod
+    def parse(
+        cls,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fit: str = "contain",
+        format: str = "webp",
+        quality: Optional[int] = None,
+    ) -> "ImageTransform":
+        """
+        Validate transform query parameters against the allowlists
+
+        Raises:
+            ValueError: With a message for the client if a parameter isn't allowed
+        """
+        if width is None and height is None:
+            raise ValueError("At least one of w and h is required")
+        sizes = allowed_sizes()
+        for name, value in (("w", width), ("h", height)):
+            if value is not None and value not in sizes:
+                raise ValueError(f"{name} must be one of {sorted(sizes)}")
+        if fit not in TRANSFORM_FITS:
+            raise ValueError(f"fit must be one of {list(TRANSFORM_FITS)}")
+        if fit == "cover" and (width is None or height is None):
+            raise ValueError("fit=cover requires both w and h")
+        if format not in TRANSFORM_FORMATS:
+            raise ValueError(f"fmt must be one of {list(TRANSFORM_FORMATS)}")
+        quality = DEFAULT_TRANSFORM_QUALITY if quality is None else quality
+        if quality not in allowed_qualities():
+            raise ValueError(f"q must be one of {sorted(allowed_qualities())}")
+        return cls(width, height, fit, format, quality)
+
+    @property
+    def mime_type(self) -> str:
+        return TRANSFORM_FORMATS[self.format][1]
+
+    def query_params(self) -> Dict[str, Any]:
+        """Query parameters of this variant's /media/transform URL"""
+        params = {
+            "w": self.width,
+            "h": self.height,
+            "fit": self.fit,
+            "fmt": self.format,
+            "q": self.quality,
+        }
+        return {name: value for name, value in params.items() if value is not None}
+
+    def variant_path(self, source_key: str) -> str:
+        """Storage path of this variant of the source with the given content key"""
+        extension = TRANSFORM_FORMATS[self.format][2]
+        size = f"{self.width or 0}x{self.height or 0}"
+        return f"{variant_prefix(source_key)}{size}_{self.fit}_q{self.quality}{extension}"
+
+
+def variant_prefix(source_key: str) -> str:
+    """Storage path prefix of all variants of a source image"""
+    return f"variants/{source_key}/"
+
+
+def render_variants(source: bytes, transforms: List[ImageTransform]) -> List[bytes]:
+    """
+    Render variants of an image, decoding it once
+
+    Images are never upscaled. EXIF orientation is applied, since most variant formats
+    drop the EXIF data that carried it. CPU-bound: run it with image_worker.
+
+    Args:
+        source: Encoded source image
+        transforms: Variants to render
+
+    Returns:
+        Encoded variants, in the order of transforms
+    """
+    with Image.open(BytesIO(source)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.load()
+        return [_render(img, transform) for transform in transforms]
+
+
+def _render(img: Image.Image, transform: ImageTransform) -> bytes:
+    box = (transform.width or img.width, transform.height or img.height)
+
+    if transform.fit == "cover":
+        # Crop to the box's aspect ratio; shrink the box if the image is smaller
+        scale = min(1.0, img.width / box[0], img.height / box[1])
+        box = (max(round(box[0] * scale), 1), max(round(box[1] * scale), 1))
+        img = ImageOps.fit(img, box, Image.Resampling.LANCZOS)
+    else:
+        img = img.copy()
+        img.thumbnail(box, Image.Resampling.LANCZOS)
+
+    pillow_format = TRANSFORM_FORMATS[transform.format][0]
+    if pillow_format == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+    output = BytesIO()
+    img.save(output, pillow_format, quality=transform.quality)
+    return output.getvalue()
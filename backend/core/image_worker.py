@@ -0,0 +1,128 @@
+"""
+Process pool for CPU-bound image work
+
+Decoding, resizing and encoding images holds the GIL for the whole operation, so running
+it on the event loop (or in its threadpool) stalls every other request of the worker.
+image_worker runs such functions in IMAGE_WORKER_PROCESSES separate processes instead.
+
+At most IMAGE_WORKER_MAX_PENDING tasks are queued or running at once; further
+submissions raise ImageWorkerBusy, which endpoints turn into 503 + Retry-After, so a
+burst of uploads can't build an unbounded backlog in memory.
+
+Submitted functions and their arguments must be picklable: module-level functions
+taking bytes, paths and plain values.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ImageWorkerBusy(Exception):
+    """Raised when the image worker already has its maximum of pending tasks"""
+
+
+class ImageWorker:
+    """
+    Runs image processing functions in a bounded process pool
+
+    Args:
+        processes: Worker processes (0 runs tasks in the event loop's default threadpool,
+            e.g. for development and tests)
+        max_pending: Tasks queued or running at once before submissions are rejected
+    """
+
+    def __init__(self, processes: int = 2, max_pending: int = 16):
+        self.processes = processes
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.processes <= 0:
+            return None
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run func(*args) in a worker process and return its result
+
+        Raises:
+            ImageWorkerBusy: If max_pending tasks are already queued or running
+        """
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise ImageWorkerBusy("Image processing queue is full")
+
+        self._pending += 1
+        self._submitted += 1
+        start = time.monotonic()
+        try:
+            executor = self._get_executor()
+            result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # A worker process died (e.g. killed for memory); start a new pool next time
+            self._failed += 1
+            self._reset()
+            raise
+        except BaseException:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            self._busy_seconds += time.monotonic() - start
+
+        self._completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and task counters of this API worker's pool (latency includes queueing)"""
+        # Without processes every pending task runs on a thread
+        running = min(self._pending, self.processes or self._pending)
+        return {
+            "processes": self.processes,
+            "max_pending": self.max_pending,
+            "running": running,
+            "queued": self._pending - running,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_latency_seconds": (
+                round(self._busy_seconds / self._submitted, 4) if self._submitted else 0.0
+            ),
+        }
+
+    def _reset(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling queued tasks"""
+        self._reset()
+
+
+# Global instance
+image_worker = ImageWorker(
+    processes=settings.IMAGE_WORKER_PROCESSES,
+    max_pending=settings.IMAGE_WORKER_MAX_PENDING,
+)
@@ -0,0 +1,138 @@
+"""
+Content-addressed media storage
+
+Uploaded files are stored once per distinct content, under their SHA-256, and shared by
+every Media row with that content_hash across organizations. MediaBlob.reference_count
+tracks those rows: uploads of known content only increment it, and deleting media only
+removes the stored file once it drops to zero.
+
+The count is always changed with a single UPDATE, so on PostgreSQL the blob row stays
+locked until the transaction commits. Callers deleting media remove the file before
+committing, so a concurrent upload of the same content either sees the blob still
+referenced or finds it gone and stores the file again.
+"""
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.models.media import MediaBlob
+
+
+def blob_path(content_hash: str, extension: str = "") -> str:
+    """Storage path of the blob with this SHA-256, e.g. blobs/ab/abcd...ef.jpg"""
+    return f"blobs/{content_hash[:2]}/{content_hash}{extension}"
+
+
+def acquire_blob(db: Session, content_hash: str) -> Optional[MediaBlob]:
+    """
+    Add a reference to the stored blob with this hash
+
+    Returns:
+        The blob, or None if no file with this content is stored yet
+    """
+    result = db.execute(
+        update(MediaBlob)
+        .where(MediaBlob.content_hash == content_hash)
+        .values(reference_count=MediaBlob.reference_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return None
+    return db.execute(
+        select(MediaBlob).where(MediaBlob.content_hash == content_hash)
+    ).scalar_one()
+
+
+def register_blob(db: Session, content_hash: str, file_path: str, file_size: int) -> MediaBlob:
+    """
+    Record a newly stored blob, with one reference
+
+    If the same content was stored concurrently and registered first, a reference to
+    that blob is added instead (both uploads wrote the same bytes to the same path).
+    """
+    try:
+        with db.begin_nested():
+            blob = MediaBlob(
+                content_hash=content_hash,
+                file_path=file_path,
+                file_size=file_size,
+                reference_count=1,
+            )
+            db.add(blob)
+        return blob
+    except IntegrityError:
+        blob = acquire_blob(db, content_hash)
+        if blob is None:
+            raise
+        return blob
+
+
+def releasable_blobs(db: Session, references: Dict[str, int]) -> Dict[str, str]:
+    """
+    Lock the blobs that removing these references would leave unreferenced
+
+    The rows stay locked until the transaction commits, as with release_blob, so their
+    files can be deleted before the references are released with release_blobs.
+
+    Args:
+        references: Number of references about to be removed, by content hash
+
+    Returns:
+        Storage paths of those blobs' files, by content hash
+    """
+    if not references:
+        return {}
+    blobs = db.execute(
+        select(MediaBlob).where(MediaBlob.content_hash.in_(list(references))).with_for_update()
+    ).scalars()
+    return {
+        blob.content_hash: blob.file_path
+        for blob in blobs
+        if blob.reference_count <= references[blob.content_hash]
+    }
+
+
+def release_blob(db: Session, content_hash: str) -> Optional[str]:
+    """
+    Remove a reference to a blob, deleting its row when it was the last one
+
+    Returns:
+        Storage path of the file to delete if no media references it anymore, else None
+    """
+    released = release_blobs(db, {content_hash: 1})
+    return released[0] if released else None
+
+
+def release_blobs(db: Session, references: Dict[str, int]) -> List[str]:
+    """
+    Remove references to many blobs at once, deleting the rows of those left unreferenced
+
+    Args:
+        references: Number of references to remove, by content hash
+
+    Returns:
+        Storage paths of the files no media references anymore
+    """
+    if not references:
+        return []
+
+    hashes = list(references)
+    db.execute(
+        update(MediaBlob)
+        .where(MediaBlob.content_hash.in_(hashes))
+        .values(
+            reference_count=MediaBlob.reference_count
+            - case(references, value=MediaBlob.content_hash, else_=0)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    unreferenced = (MediaBlob.content_hash.in_(hashes), MediaBlob.reference_count <= 0)
+    file_paths = db.execute(select(MediaBlob.file_path).where(*unreferenced)).scalars().all()
+    if file_paths:
+        db.execute(
+            delete(MediaBlob).where(*unreferenced).execution_options(synchronize_session=False)
+        )
+    return list(file_paths)
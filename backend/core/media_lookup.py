@@ -0,0 +1,129 @@
+"""
+Filename lookups for the media file routes
+
+/media/files, /media/proxy, /media/thumbnails and /media/transform serve CDN misses by
+filename. The few fields they need (storage path, MIME type, size, ETag, original
+filename and the key of image variants) are cached per filename in Redis and, for hot
+files, in each worker's L1, so those routes usually run without a database query and
+without asking storage whether the file exists.
+
+Uploads and thumbnail generation write the entries and deletes evict them (evictions
+reach every worker's L1). Unknown filenames are cached for a short time as well, so
+requests for missing files don't each reach the database.
+"""
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.cache import CacheKeys, cache
+from backend.models.media import Media
+
+MEDIA_FILE_TTL = 86400
+MEDIA_FILE_MISSING_TTL = 60
+
+
+class MediaFile(NamedTuple):
+    """What the file routes need to serve a media file or thumbnail"""
+
+    file_path: str
+    mime_type: str
+    file_size: int
+    etag: Optional[str]  # Strong ETag when the content hash is known
+    original_filename: str
+    variant_source: Optional[str] = None  # Key of transform variants; set for images only
+
+    @classmethod
+    def of(cls, media: Media) -> "MediaFile":
+        etag = f'"{media.content_hash}"' if media.content_hash else None
+        variant_source = None
+        if media.media_type == "image":
+            variant_source = media.content_hash or str(media.id)
+        return cls(
+            media.file_path,
+            media.mime_type,
+            media.file_size,
+            etag,
+            media.original_filename,
+            variant_source,
+        )
+
+    @classmethod
+    def thumbnail_of(cls, media: Media) -> "MediaFile":
+        return cls(media.thumbnail_path, "image/jpeg", 0, None, Path(media.thumbnail_path).name)
+
+
+def _media_file_key(filename: str) -> str:
+    return CacheKeys.format(CacheKeys.MEDIA_FILE, filename=filename)
+
+
+def _thumbnail_key(filename: str) -> str:
+    return CacheKeys.format(CacheKeys.MEDIA_THUMBNAIL, filename=filename)
+
+
+async def _lookup(key: str, query) -> Optional[MediaFile]:
+    cached = await cache.get_json(key, l1=True)
+    # Entries cached before variant_source was added are looked up again
+    if cached is not None and len(cached) in (0, len(MediaFile._fields)):
+        return MediaFile(*cached) if cached else None
+
+    media = await query()
+    if media is None:
+        await cache.set(key, [], ttl=MEDIA_FILE_MISSING_TTL)
+        return None
+    return media
+
+
+async def lookup_media_file(db: AsyncSession, filename: str) -> Optional[MediaFile]:
+    """The media file with this filename, from the cache or else the database"""
+
+    async def query() -> Optional[MediaFile]:
+        result = await db.execute(select(Media).where(Media.filename == filename))
+        media = result.scalar_one_or_none()
+        if media is None:
+            return None
+        media_file = MediaFile.of(media)
+        await cache.set(_media_file_key(filename), list(media_file), ttl=MEDIA_FILE_TTL)
+        return media_file
+
+    return await _lookup(_media_file_key(filename), query)
+
+
+async def lookup_thumbnail_file(db: AsyncSession, filename: str) -> Optional[MediaFile]:
+    """The thumbnail stored as thumbnails/<filename>, from the cache or else the database"""
+
+    async def query() -> Optional[MediaFile]:
+        result = await db.execute(
+            select(Media).where(Media.thumbnail_path == f"thumbnails/{filename}")
+        )
+        media = result.scalar_one_or_none()
+        if media is None:
+            return None
+        media_file = MediaFile.thumbnail_of(media)
+        await cache.set(_thumbnail_key(filename), list(media_file), ttl=MEDIA_FILE_TTL)
+        return media_file
+
+    return await _lookup(_thumbnail_key(filename), query)
+
+
+async def remember_media_file(media: Media) -> None:
+    """Cache the lookups of a media file and its thumbnail after it is created or changed"""
+    await cache.set(
+        _media_file_key(media.filename), list(MediaFile.of(media)), ttl=MEDIA_FILE_TTL, l1=True
+    )
+    if media.thumbnail_path:
+        await cache.set(
+            _thumbnail_key(Path(media.thumbnail_path).name),
+            list(MediaFile.thumbnail_of(media)),
+            ttl=MEDIA_FILE_TTL,
+            l1=True,
+        )
+
+
+async def forget_media_file(filename: str, thumbnail_path: Optional[str] = None) -> None:
+    """Evict the lookups of a deleted media file and its thumbnail"""
+    await cache.delete(_media_file_key(filename))
+    if thumbnail_path:
+        await cache.delete(_thumbnail_key(Path(thumbnail_path).name))
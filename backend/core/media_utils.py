@@ -5,7 +5,8 @@ import os
 import uuid
 import mimetypes
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Iterator, BinaryIO
+from io import BytesIO
 from PIL import Image
 import hashlib
 
@@ -29,6 +30,12 @@ MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100 MB
 MAX_AUDIO_SIZE = 20 * 1024 * 1024  # 20 MB
 MAX_DOCUMENT_SIZE = 20 * 1024 * 1024  # 20 MB
 
+# Uploads are read, hashed and stored this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Bytes of an image searched for its dimensions before giving up
+IMAGE_HEADER_MAX_SIZE = 256 * 1024  # 256 KB
+
 # Upload directory
 UPLOAD_DIR = Path("uploads")
 THUMBNAIL_DIR = UPLOAD_DIR / "thumbnails"
@@ -81,6 +88,16 @@ def validate_file_extension(filename: str) -> Tuple[bool, str]:
     return True, ""
 
 
+def get_max_file_size(mime_type: str, extension: str) -> Optional[int]:
+    """Maximum size in bytes of a file of this type, or None if unlimited"""
+    return {
+        'image': MAX_IMAGE_SIZE,
+        'video': MAX_VIDEO_SIZE,
+        'audio': MAX_AUDIO_SIZE,
+        'document': MAX_DOCUMENT_SIZE,
+    }.get(get_media_type(mime_type, extension))
+
+
 def validate_file_size(file_size: int, mime_type: str, extension: str) -> Tuple[bool, str]:
     """
     Validate file size based on type
@@ -88,20 +105,94 @@ def validate_file_size(file_size: int, mime_type: str, extension: str) -> Tuple[
     Returns:
         (is_valid, error_message)
     """
-    media_type = get_media_type(mime_type, extension)
+    max_size = get_max_file_size(mime_type, extension)
     
-    if media_type == 'image' and file_size > MAX_IMAGE_SIZE:
-        return False, f"Image size exceeds {MAX_IMAGE_SIZE // (1024*1024)} MB limit"
-    elif media_type == 'video' and file_size > MAX_VIDEO_SIZE:
-        return False, f"Video size exceeds {MAX_VIDEO_SIZE // (1024*1024)} MB limit"
-    elif media_type == 'audio' and file_size > MAX_AUDIO_SIZE:
-        return False, f"Audio size exceeds {MAX_AUDIO_SIZE // (1024*1024)} MB limit"
-    elif media_type == 'document' and file_size > MAX_DOCUMENT_SIZE:
-        return False, f"Document size exceeds {MAX_DOCUMENT_SIZE // (1024*1024)} MB limit"
+    if max_size is not None and file_size > max_size:
+        media_type = get_media_type(mime_type, extension)
+        return False, f"{media_type.capitalize()} size exceeds {max_size // (1024*1024)} MB limit"
     
     return True, ""
 
 
+def read_chunks(file: BinaryIO, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """Iterate over a binary file object in chunks"""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class FileTooLargeError(ValueError):
+    """Raised while streaming an upload once it exceeds its size limit"""
+
+
+class UploadStream:
+    """
+    Iterates over an uploaded file in chunks
+    
+    The size limit is enforced, the SHA-256 hash computed and image dimensions read
+    from the first bytes while iterating, so the file is never held in memory.
+    
+    Args:
+        file: Binary file object to read from
+        max_size: Raise FileTooLargeError once more bytes than this are read (None = no limit)
+        detect_dimensions: Read image dimensions from the header bytes
+        chunk_size: Bytes read at a time
+    """
+    
+    def __init__(
+        self,
+        file: BinaryIO,
+        max_size: Optional[int] = None,
+        detect_dimensions: bool = False,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ):
+        self.file = file
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.dimensions: Optional[Tuple[int, int]] = None
+        self._hash = hashlib.sha256()
+        self._header = bytearray() if detect_dimensions else None
+    
+    @property
+    def sha256(self) -> str:
+        """Hex digest of the bytes read so far"""
+        return self._hash.hexdigest()
+    
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in read_chunks(self.file, self.chunk_size):
+            self.size += len(chunk)
+            if self.max_size is not None and self.size > self.max_size:
+                raise FileTooLargeError(
+                    f"File size exceeds {self.max_size // (1024*1024)} MB limit"
+                )
+            
+            self._hash.update(chunk)
+            if self._header is not None:
+                self._read_dimensions(chunk)
+            yield chunk
+    
+    def read_through(self) -> 'UploadStream':
+        """Read the whole file without keeping it, e.g. to hash it before storing it"""
+        for _ in self:
+            pass
+        return self
+    
+    def _read_dimensions(self, chunk: bytes):
+        """Look for the image size in the bytes read so far, until found or past the header"""
+        self._header += chunk[:IMAGE_HEADER_MAX_SIZE - len(self._header)]
+        try:
+            # Image.open only parses the header; pixel data is never decoded here
+            with Image.open(BytesIO(self._header)) as img:
+                self.dimensions = img.size
+        except Exception:
+            pass  # Header incomplete, or not an image Pillow can read (e.g. SVG)
+        if self.dimensions or len(self._header) >= IMAGE_HEADER_MAX_SIZE:
+            self._header = None
+
+
 def generate_unique_filename(original_filename: str) -> str:
     """
     Generate unique filename with UUID
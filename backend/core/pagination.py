@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination helpers
+
+Offset pagination degrades linearly with page depth because the database still has to
+walk every skipped row. Keyset pagination instead seeks directly past the last row of the
+previous page using a composite ``(sort_key, id)`` position, which a matching composite
+index can serve in constant time regardless of depth.
+
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort key name, the sort
+key value and the row id of the last item on the page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, and_, or_
+from sqlalchemy.orm import Session
+
+from backend.core.exceptions import BadRequestException
+
+
+def encode_cursor(sort_key: str, sort_value: Any, row_id: Any) -> str:
+    """
+    Encode a keyset position into an opaque cursor string
+
+    Args:
+        sort_key: Name of the attribute the listing is ordered by
+        sort_value: Value of the sort attribute for the last row of the page
+        row_id: Primary key of the last row of the page (tie-breaker)
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps(
+        {"k": sort_key, "v": sort_value, "id": str(row_id)}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        Tuple of (sort_value, row_id)
+
+    Raises:
+        BadRequestException: If the cursor is malformed or was issued for a different sort key
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        cursor_sort_key, sort_value, row_id = payload["k"], payload["v"], payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise BadRequestException("Invalid pagination cursor")
+
+    if cursor_sort_key != sort_key:
+        raise BadRequestException("Pagination cursor does not match the requested sort order")
+
+    return sort_value, row_id
+
+
+def _bind_sort_value(db: Session, sort_column, value: Any) -> Any:
+    """Convert a decoded cursor value back into something comparable with sort_column"""
+    if value is None or not isinstance(sort_column.type, DateTime):
+        return value
+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise BadRequestException("Invalid pagination cursor")
+
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite keeps server-generated timestamps as "YYYY-MM-DD HH:MM:SS" text, while bound
+        # datetimes always carry microseconds; compare in the stored text format instead.
+        return parsed.replace(tzinfo=None).isoformat(sep=" ")
+    return parsed
+
+
+def apply_keyset(
+    db: Session,
+    stmt,
+    sort_column,
+    id_column,
+    page_size: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+):
+    """
+    Order a Query/Select by (sort_column, id_column), seek past cursor and fetch one extra row
+
+    NULL sort values are ordered first when descending and last when ascending, matching
+    how PostgreSQL scans a plain b-tree index in either direction. Pass the result rows to
+    build_keyset_page to trim the extra row and compute next_cursor.
+
+    Args:
+        db: Session the statement will run against
+        stmt: SQLAlchemy ORM Query or Select over the paginated model
+        sort_column: Mapped column to order by (e.g. ContentEntry.created_at)
+        id_column: Unique tie-breaker column (usually the primary key)
+        page_size: Number of rows per page
+        cursor: Cursor from a previous page's next_cursor, or None for the first page
+        descending: Sort direction
+    """
+    if descending:
+        stmt = stmt.order_by(sort_column.desc().nulls_first(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc().nulls_last(), id_column.asc())
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column.key)
+        value = _bind_sort_value(db, sort_column, value)
+
+        past_id = id_column < row_id if descending else id_column > row_id
+        if value is None:
+            # Inside the NULL block: finish it, then (descending) continue with non-NULL rows
+            seek = and_(sort_column.is_(None), past_id)
+            if descending:
+                seek = or_(seek, sort_column.isnot(None))
+        else:
+            past_value = sort_column < value if descending else sort_column > value
+            seek = or_(past_value, and_(sort_column == value, past_id))
+            if not descending:
+                seek = or_(seek, sort_column.is_(None))
+        stmt = stmt.filter(seek)
+
+    return stmt.limit(page_size + 1)
+
+
+def build_keyset_page(
+    rows: Sequence[Any], page_size: int, sort_column, id_column
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the look-ahead row fetched by apply_keyset and compute the next cursor
+
+    Returns:
+        Tuple of (rows for this page, next_cursor or None when this is the last page)
+    """
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    next_cursor = encode_cursor(
+        sort_column.key, getattr(last, sort_column.key), getattr(last, id_column.key)
+    )
+    return rows, next_cursor
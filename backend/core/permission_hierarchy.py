@@ -6,7 +6,7 @@ This module provides hierarchical permission checking where:
 2. Permissions have parent-child relationships (e.g., delete implies read)
 3. Automatic permission expansion based on hierarchies
 """
-from typing import Dict, Set, List, Optional
+from typing import Dict, FrozenSet, Set, List, Optional
 from sqlalchemy.orm import Session
 
 from backend.models.user import User
@@ -75,6 +75,41 @@ PERMISSION_HIERARCHY: Dict[str, List[str]] = {
 }
 
 
+def _compute_permission_closure(hierarchy: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+    """
+    Transitive closure of a permission hierarchy.
+    
+    Args:
+        hierarchy: Mapping of permission to directly implied permissions
+        
+    Returns:
+        Mapping of permission to itself plus everything it implies, directly or not
+    """
+    closure: Dict[str, FrozenSet[str]] = {}
+    
+    def visit(permission_name: str, path: FrozenSet[str]) -> FrozenSet[str]:
+        if permission_name in closure:
+            return closure[permission_name]
+        
+        expanded = {permission_name}
+        for implied in hierarchy.get(permission_name, []):
+            # Guard against cycles in hand-edited hierarchies
+            if implied not in path:
+                expanded.update(visit(implied, path | {permission_name}))
+        
+        closure[permission_name] = frozenset(expanded)
+        return closure[permission_name]
+    
+    for permission_name in hierarchy:
+        visit(permission_name, frozenset())
+    
+    return closure
+
+
+# Precomputed once at import: permission -> all permissions it implies (including itself)
+PERMISSION_CLOSURE: Dict[str, FrozenSet[str]] = _compute_permission_closure(PERMISSION_HIERARCHY)
+
+
 # Role hierarchy levels (higher number = more permissions)
 ROLE_LEVELS: Dict[str, int] = {
     "super_admin": 100,      # System-wide admin
@@ -100,15 +135,11 @@ class PermissionHierarchyService:
         Returns:
             Set of all permissions including the original and implied ones
         """
-        expanded = {permission_name}
-        
-        # Add direct children
-        if permission_name in PERMISSION_HIERARCHY:
-            for implied in PERMISSION_HIERARCHY[permission_name]:
-                # Recursively expand implied permissions
-                expanded.update(PermissionHierarchyService.expand_permissions(implied))
+        closure = PERMISSION_CLOSURE.get(permission_name)
+        if closure is None:
+            return {permission_name}
         
-        return expanded
+        return set(closure)
     
     @staticmethod
     def get_all_permissions_for_user(user: User, db: Session) -> Set[str]:
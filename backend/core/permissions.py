@@ -7,6 +7,7 @@ from typing import List, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from backend.core.effective_permissions import get_effective_permissions
 from backend.core.permission_hierarchy import PermissionHierarchyService
 from backend.models.rbac import Role
 from backend.models.user import User
@@ -38,53 +39,15 @@ class PermissionChecker:
         Returns:
             True if user has permission, False otherwise
         """
-        # Check if user is the organization owner - owners have all permissions
-        from backend.models.organization import Organization
-
-        org = db.query(Organization).filter(Organization.id == user.organization_id).first()
-        if org and org.owner_id == user.id:
-            return True
-
-        # Use hierarchy if enabled
-        if use_hierarchy:
-            return PermissionHierarchyService.has_permission_with_inheritance(
-                user, permission_name, db, content_type_id, field_name
-            )
-
-        # Original direct permission check (no hierarchy)
-        # Super admin has all permissions
-        if any(role.name == "super_admin" for role in user.roles):
-            return True
-
-        # Check if user has the permission through any of their roles
-        for role in user.roles:
-            if role.organization_id != user.organization_id:
-                continue
-
-            for permission in role.permissions:
-                # Match permission name
-                if permission.name != permission_name:
-                    continue
-
-                # Check content type scope
-                if content_type_id is not None:
-                    # Permission must either be global (NULL) or match the content type
-                    if (
-                        permission.content_type_id is not None
-                        and permission.content_type_id != content_type_id
-                    ):
-                        continue
-
-                # Check field-level scope
-                if field_name is not None:
-                    # Permission must either be for all fields (NULL) or match the specific field
-                    if permission.field_name is not None and permission.field_name != field_name:
-                        continue
-
-                # All checks passed
-                return True
-
-        return False
+        # Owner, super admin, role and hierarchy resolution happen once per user and RBAC
+        # version (see backend.core.effective_permissions)
+        effective = get_effective_permissions(user, db)
+        return effective.has(
+            permission_name,
+            content_type_id=content_type_id,
+            field_name=field_name,
+            use_hierarchy=use_hierarchy,
+        )
 
     @staticmethod
     def has_any_permission(user: User, permission_names: List[str], db: Session) -> bool:
@@ -153,10 +116,8 @@ class PermissionChecker:
             List of permission names
         """
         if expand and db:
-            # Get expanded permissions with hierarchy
-            expanded = PermissionHierarchyService.get_all_permissions_for_user(user, db)
-            # Filter out the special "*" marker
-            return [p for p in expanded if p != "*"]
+            # Get expanded permissions with hierarchy (none listed for super admins)
+            return list(get_effective_permissions(user, db).permissions)
 
         # Direct permissions only
         permissions = set()
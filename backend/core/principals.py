@@ -0,0 +1,267 @@
+"""
+Authenticated principal cache
+
+Resolving a bearer token costs an RS256 signature check and a users query on every
+request. Instead, the first successful resolution stores an immutable snapshot of the
+user (every column, plus role ids and the token's session) keyed by the SHA-256 of the
+token, valid until the token expires or PRINCIPAL_CACHE_TTL elapses, whichever is first.
+
+Later requests with the same token skip both: the snapshot is turned back into a
+persistent User of the request's session with ``Session.merge(load=False)``, which
+emits no SQL. Relationships still load lazily on access; permission checks go through
+the versioned effective permission cache (backend.core.effective_permissions).
+
+Snapshots are dropped as soon as a commit changes the user (including deactivation and
+role assignments), one of their roles, or terminates their session: in this process
+right away, and in every other worker through the cache invalidation channel. Like L1
+cache entries, snapshots are only kept for PRINCIPAL_CACHE_TTL while this worker
+receives those messages; otherwise (Redis unavailable, L1 disabled) they last
+PRINCIPAL_UNSYNCED_CACHE_TTL seconds, and all are dropped whenever messages may have
+been missed.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from itertools import chain
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from backend.core.cache import cache
+from backend.core.security import TokenPayload, verify_token
+from backend.models.rbac import Role
+from backend.models.session import UserSession
+from backend.models.user import User
+
+# Snapshot lifetime while changes made by other workers are received, and otherwise
+PRINCIPAL_CACHE_TTL = 300
+PRINCIPAL_UNSYNCED_CACHE_TTL = 5
+PRINCIPAL_CACHE_MAX_SIZE = 10_000
+
+_USER_COLUMNS = tuple(attr.key for attr in sa_inspect(User).column_attrs)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user for one access token"""
+
+    user_id: Any
+    organization_id: Any
+    is_active: bool
+    is_email_verified: bool
+    role_ids: FrozenSet[Any]
+    session_id: Optional[str]
+    columns: Mapping[str, Any]
+    cached_until: float
+
+    def to_user(self) -> User:
+        """A detached User carrying the snapshot's column values"""
+        user = User(**self.columns)
+        make_transient_to_detached(user)
+        return user
+
+
+_principals: Dict[str, Principal] = {}
+_principals_lock = threading.Lock()
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _get_principal(token: str) -> Optional[Principal]:
+    key = _token_key(token)
+    principal = _principals.get(key)
+    if principal is not None and principal.cached_until <= time.time():
+        _principals.pop(key, None)
+        return None
+    return principal
+
+
+def _cache_principal(token: str, token_data: TokenPayload, user: User) -> Principal:
+    ttl = PRINCIPAL_CACHE_TTL if cache.l1_active else PRINCIPAL_UNSYNCED_CACHE_TTL
+    cached_until = time.time() + ttl
+    if token_data.exp:
+        cached_until = min(cached_until, token_data.exp)
+
+    # Only columns already loaded, so caching never triggers SQL
+    loaded = user.__dict__
+    principal = Principal(
+        user_id=user.id,
+        organization_id=user.organization_id,
+        is_active=user.is_active,
+        is_email_verified=user.is_email_verified,
+        role_ids=frozenset(role.id for role in loaded.get("roles", ())),
+        session_id=token_data.session_id,
+        columns=MappingProxyType({key: loaded[key] for key in _USER_COLUMNS if key in loaded}),
+        cached_until=cached_until,
+    )
+
+    with _principals_lock:
+        if len(_principals) >= PRINCIPAL_CACHE_MAX_SIZE:
+            now = time.time()
+            for key, entry in list(_principals.items()):
+                if entry.cached_until <= now:
+                    del _principals[key]
+            while len(_principals) >= PRINCIPAL_CACHE_MAX_SIZE:
+                # Oldest insertion first
+                del _principals[next(iter(_principals))]
+        _principals[_token_key(token)] = principal
+    return principal
+
+
+def get_user_for_token(token: str, db: Session) -> Optional[User]:
+    """
+    The user an access token belongs to, from the principal cache when possible
+
+    Args:
+        token: Bearer access token
+        db: Database session the returned user is attached to
+
+    Returns:
+        User (active or not), or None if the token is invalid or the user is gone
+    """
+    principal = _get_principal(token)
+    if principal is not None:
+        return db.merge(principal.to_user(), load=False)
+
+    token_data = verify_token(token, token_type="access")
+    if not token_data or not token_data.sub:
+        return None
+
+    user = db.query(User).filter(User.id == token_data.sub).first()
+    if user is not None:
+        _cache_principal(token, token_data, user)
+    return user
+
+
+async def get_user_for_token_async(token: str, db: AsyncSession) -> Optional[User]:
+    """Async variant of get_user_for_token."""
+    principal = _get_principal(token)
+    if principal is not None:
+        return await db.merge(principal.to_user(), load=False)
+
+    token_data = verify_token(token, token_type="access")
+    if not token_data or not token_data.sub:
+        return None
+
+    result = await db.execute(select(User).where(User.id == token_data.sub))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        _cache_principal(token, token_data, user)
+    return user
+
+
+def invalidate_principals(
+    user_ids: Optional[Set[Any]] = None,
+    organization_ids: Optional[Set[Any]] = None,
+    role_ids: Optional[Set[Any]] = None,
+    session_ids: Optional[Set[Any]] = None,
+) -> None:
+    """Drop matching snapshots in every worker (every snapshot if no filter)"""
+    filters = (user_ids, organization_ids, role_ids, session_ids)
+    _drop_principals(*filters)
+    if all(ids is None for ids in filters):
+        cache.publish_invalidation_sync(principals=None)
+    else:
+        cache.publish_invalidation_sync(
+            principals=[sorted(str(id_) for id_ in ids or ()) for ids in filters]
+        )
+
+
+def _drop_principals(user_ids, organization_ids, role_ids, session_ids) -> None:
+    """Drop matching snapshots from this process's cache (every snapshot if no filter)"""
+    with _principals_lock:
+        if user_ids is organization_ids is role_ids is session_ids is None:
+            _principals.clear()
+            return
+
+        # Compared as strings: ids arrive from other workers as JSON
+        user_ids, organization_ids, role_ids, session_ids = (
+            {str(id_) for id_ in ids or ()}
+            for ids in (user_ids, organization_ids, role_ids, session_ids)
+        )
+        for key, principal in list(_principals.items()):
+            if (
+                str(principal.user_id) in user_ids
+                or str(principal.organization_id) in organization_ids
+                or principal.session_id in session_ids
+                or not role_ids.isdisjoint(str(role_id) for role_id in principal.role_ids)
+            ):
+                del _principals[key]
+
+
+def _apply_principal_invalidation(message: Optional[Dict[str, Any]]) -> None:
+    if message is None:
+        # Changes may have been missed
+        _drop_principals(None, None, None, None)
+    elif "principals" in message:
+        filters = message["principals"]
+        _drop_principals(*(filters or (None, None, None, None)))
+
+
+cache.on_invalidation(_apply_principal_invalidation)
+
+
+# ---------------------------------------------------------------------------
+# Invalidation: collect affected users, roles and sessions on flush, drop on commit
+# ---------------------------------------------------------------------------
+
+_PENDING_KEY = "principal_invalidations"
+
+
+def _has_changes(obj, *attributes) -> bool:
+    state = sa_inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session, flush_context):
+    user_ids, organization_ids, role_ids, session_ids = set(), set(), set(), set()
+    for obj in session.deleted:
+        if isinstance(obj, Role):
+            # Members whose roles were never loaded are only known by organization
+            organization_ids.add(obj.organization_id)
+
+    for objects, is_new_or_deleted in (
+        (session.new, True),
+        (session.deleted, True),
+        (session.dirty, False),
+    ):
+        for obj in objects:
+            if isinstance(obj, User):
+                if is_new_or_deleted or session.is_modified(obj):
+                    user_ids.add(obj.id)
+            elif isinstance(obj, Role):
+                if is_new_or_deleted or _has_changes(obj, "users", "organization_id"):
+                    role_ids.add(obj.id)
+                    history = sa_inspect(obj).attrs.users.history
+                    members = chain(history.added or (), history.deleted or ())
+                    user_ids.update(user.id for user in members)
+            elif isinstance(obj, UserSession):
+                if is_new_or_deleted or _has_changes(obj, "is_active"):
+                    session_ids.add(obj.id)
+
+    if user_ids or organization_ids or role_ids or session_ids:
+        pending = session.info.setdefault(_PENDING_KEY, (set(), set(), set(), set()))
+        for collected, new_ids in zip(pending, (user_ids, organization_ids, role_ids, session_ids)):
+            collected.update(new_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_changed_principals(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        invalidate_principals(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,149 @@
+"""
+Maintenance of the published_content read model
+
+The Delivery API serves published entries straight from pre-rendered JSON stored in
+``published_content``. Every write path that can change what the Delivery API returns
+(create, update, SEO edits, publish, unpublish, delete, scheduled actions) calls
+sync_published_content or remove_published_content in the same transaction as the
+entry change, so the read model never drifts from content_entries.
+"""
+
+import json
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.models.content import ContentEntry, ContentType
+from backend.models.published_content import PublishedContent
+
+
+def render_published_documents(entry: ContentEntry) -> Tuple[str, str]:
+    """
+    Render the delivery JSON of a published entry
+
+    Returns:
+        Tuple of (detail document, list item) JSON strings
+    """
+    # Import here to avoid circular imports (backend.api imports the routers)
+    from backend.api.schemas.delivery import (
+        DeliveryContentDetailResponse,
+        DeliveryContentResponse,
+    )
+
+    fields = json.loads(entry.data) if isinstance(entry.data, str) else entry.data
+    seo_data = (
+        json.loads(entry.seo_data) if entry.seo_data and isinstance(entry.seo_data, str) else {}
+    )
+
+    list_item = DeliveryContentResponse(
+        id=str(entry.id),
+        slug=entry.slug,
+        title=entry.title,
+        fields=fields,
+        published_at=entry.published_at,
+        updated_at=entry.updated_at,
+    )
+    document = DeliveryContentDetailResponse(
+        **list_item.model_dump(),
+        seo_title=seo_data.get("title"),
+        seo_description=seo_data.get("description"),
+        seo_keywords=seo_data.get("keywords"),
+        canonical_url=seo_data.get("canonical_url"),
+    )
+    return document.model_dump_json(), list_item.model_dump_json()
+
+
+def sync_published_content(
+    db: Session, entry: ContentEntry, content_type: Optional[ContentType] = None
+) -> None:
+    """
+    Bring the read model row of entry in line with its current state
+
+    Published entries are (re-)rendered; any other status removes the row. Flushes the
+    session so server-side values (updated_at) are rendered as stored, but does not commit.
+
+    Args:
+        db: Session holding the entry change
+        entry: Content entry that was created or changed
+        content_type: The entry's content type, if already loaded
+    """
+    db.flush()
+
+    row = db.get(PublishedContent, entry.id)
+    if entry.status != "published":
+        if row is not None:
+            db.delete(row)
+        return
+
+    content_type = content_type or entry.content_type
+    document, list_item = render_published_documents(entry)
+
+    if row is None:
+        row = PublishedContent(entry_id=entry.id)
+        db.add(row)
+
+    row.organization_id = content_type.organization_id
+    row.content_type_id = content_type.id
+    row.content_type_api_id = content_type.api_id
+    row.slug = entry.slug
+    row.published_at = entry.published_at
+    row.document = document
+    row.list_item = list_item
+
+
+def remove_published_content(db: Session, entry_id) -> None:
+    """Delete the read model row of an entry that is being deleted (does not commit)"""
+    db.query(PublishedContent).filter(PublishedContent.entry_id == entry_id).delete(
+        synchronize_session=False
+    )
+
+
+def remove_published_content_for_type(db: Session, content_type_id) -> None:
+    """Delete the read model rows of a content type that is being deleted (does not commit)"""
+    db.query(PublishedContent).filter(
+        PublishedContent.content_type_id == content_type_id
+    ).delete(synchronize_session=False)
+
+
+def rebuild_published_content(db: Session, organization_id=None) -> int:
+    """
+    Re-render the read model from content_entries (backfill / repair)
+
+    Args:
+        db: Database session (committed on success)
+        organization_id: Limit the rebuild to one organization
+
+    Returns:
+        Number of published entries rendered
+    """
+    stale = db.query(PublishedContent)
+    entries = (
+        db.query(ContentEntry, ContentType)
+        .join(ContentType, ContentEntry.content_type_id == ContentType.id)
+        .filter(ContentEntry.status == "published")
+    )
+    if organization_id is not None:
+        stale = stale.filter(PublishedContent.organization_id == organization_id)
+        entries = entries.filter(ContentType.organization_id == organization_id)
+
+    stale.delete(synchronize_session=False)
+
+    count = 0
+    for entry, content_type in entries.yield_per(500):
+        document, list_item = render_published_documents(entry)
+        db.add(
+            PublishedContent(
+                entry_id=entry.id,
+                organization_id=content_type.organization_id,
+                content_type_id=content_type.id,
+                content_type_api_id=content_type.api_id,
+                slug=entry.slug,
+                published_at=entry.published_at,
+                document=document,
+                list_item=list_item,
+            )
+        )
+        count += 1
+
+    db.commit()
+    return count
@@ -3,8 +3,15 @@ Rate limiting for Bakalr CMS API
 """
 
 import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from fastapi import Request
+from limits import RateLimitItem
+from limits.storage import RedisStorage, Storage
+from limits.strategies import FixedWindowRateLimiter
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
@@ -71,11 +78,161 @@ def _get_storage_uri() -> str:
     return settings.REDIS_URL
 
 
+# ---------------------------------------------------------------------------
+# Fixed windows: counter and reset time in one round trip
+# ---------------------------------------------------------------------------
+
+# Increments each window (KEYS) by ARGV[1], starts its expiry (ARGV[2..]) on the first
+# hit, and returns count and remaining TTL (ms) for every window
+RATE_LIMIT_WINDOW_SCRIPT = """
+local result = {}
+for i, key in ipairs(KEYS) do
+    local count = redis.call('INCRBY', key, ARGV[1])
+    if count == tonumber(ARGV[1]) then
+        redis.call('EXPIRE', key, ARGV[i + 1])
+    end
+    result[#result + 1] = count
+    result[#result + 1] = redis.call('PTTL', key)
+end
+return result
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitWindow:
+    """State of one fixed rate limit window right after a hit"""
+
+    limit: int
+    count: int
+    reset: float  # Unix timestamp when the window expires
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.count)
+
+    @property
+    def exceeded(self) -> bool:
+        return self.count > self.limit
+
+    def headers(self) -> Dict[str, str]:
+        """X-RateLimit-* response headers for this window"""
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(self.reset)),
+        }
+
+
+def _windows_from_result(
+    limits: Sequence[Tuple[int, int]], result: Sequence[int], now: float
+) -> List[RateLimitWindow]:
+    windows = []
+    for index, (limit, seconds) in enumerate(limits):
+        count, ttl_ms = int(result[2 * index]), int(result[2 * index + 1])
+        reset = now + (ttl_ms / 1000 if ttl_ms > 0 else seconds)
+        windows.append(RateLimitWindow(limit=limit, count=count, reset=reset))
+    return windows
+
+
+def most_restrictive_window(windows: Sequence[RateLimitWindow]) -> Optional[RateLimitWindow]:
+    """The window to report: an exceeded one, else the one with the fewest hits left"""
+    if not windows:
+        return None
+    return min(windows, key=lambda window: (not window.exceeded, window.remaining))
+
+
+async def hit_rate_limit_windows(
+    key_prefix: str, limits: Sequence[Tuple[int, int]], cost: int = 1
+) -> Optional[List[RateLimitWindow]]:
+    """
+    Hit several fixed windows with one async Redis round trip
+
+    Args:
+        key_prefix: Identifies who is limited; each window is stored at {key_prefix}:{seconds}
+        limits: (limit, seconds) pairs
+        cost: Amount to add to every window
+
+    Returns:
+        Window states in the order of limits, or None if Redis is unavailable
+    """
+    # Import here to avoid circular imports
+    from backend.core.cache import cache
+
+    if not cache.client or not limits:
+        return None
+
+    keys = [f"{key_prefix}:{seconds}" for _, seconds in limits]
+    result = await cache.client.eval(
+        RATE_LIMIT_WINDOW_SCRIPT, len(keys), *keys, cost, *(seconds for _, seconds in limits)
+    )
+    return _windows_from_result(limits, result, time.time())
+
+
+def hit_storage_window(
+    storage: Storage, item: RateLimitItem, key: str, cost: int = 1
+) -> RateLimitWindow:
+    """Hit one window of a limits storage, returning count and reset in one round trip"""
+    if isinstance(storage, RedisStorage):
+        result = storage.get_connection().eval(
+            RATE_LIMIT_WINDOW_SCRIPT, 1, storage.prefixed_key(key), cost, item.get_expiry()
+        )
+        return _windows_from_result([(item.amount, item.get_expiry())], result, time.time())[0]
+
+    # In-process storages answer without a round trip
+    count = storage.incr(key, item.get_expiry(), amount=cost)
+    return RateLimitWindow(limit=item.amount, count=count, reset=storage.get_expiry(key))
+
+
+# Windows hit while slowapi checks the current request, by storage key
+_request_windows: ContextVar[Optional[Dict[str, RateLimitWindow]]] = ContextVar(
+    "rate_limit_windows", default=None
+)
+
+
+class WindowRateLimiter(FixedWindowRateLimiter):
+    """Fixed window strategy that keeps the window state its hits return"""
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        key = item.key_for(*identifiers)
+        window = hit_storage_window(self.storage, item, key, cost)
+        windows = _request_windows.get()
+        if windows is not None:
+            windows[key] = window
+        return not window.exceeded
+
+
+class WindowLimiter(Limiter):
+    """
+    slowapi Limiter that leaves the reported window on request.state.rate_limit_window
+
+    The window is the one slowapi picks for its headers (the exceeded limit, else the
+    smallest), taken from the hit itself, so reporting it costs no extra Redis calls.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._limiter = WindowRateLimiter(self._storage)
+
+    def _check_request_limit(self, request, endpoint_func, in_middleware: bool = True) -> None:
+        windows: Dict[str, RateLimitWindow] = {}
+        token = _request_windows.set(windows)
+        try:
+            super()._check_request_limit(request, endpoint_func, in_middleware)
+        finally:
+            _request_windows.reset(token)
+            current = getattr(request.state, "view_rate_limit", None)
+            if current:
+                item, identifiers = current
+                window = windows.get(item.key_for(*identifiers))
+                if window is not None:
+                    request.state.rate_limit_window = window
+
+
 # Create limiter instance
-limiter = Limiter(
+limiter = WindowLimiter(
     key_func=get_identifier,
     storage_uri=_get_storage_uri(),
-    strategy="fixed-window",  # or "moving-window" for sliding window
+    strategy="fixed-window",  # Windows are reported from WindowRateLimiter hits
     default_limits=["1000/hour", "100/minute"],  # Default limits
 )
 
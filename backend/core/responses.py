@@ -0,0 +1,76 @@
+"""
+Fast JSON responses for content payloads
+
+The default FastAPI path for a ``response_model`` endpoint is dict → Pydantic model →
+``jsonable_encoder`` → ``json.dumps``, after the handler has already ``json.loads``-ed
+columns that are stored as JSON text. ``ORJSONResponse`` skips all of that: handlers build
+plain dicts, wrap stored JSON text in ``RawJSON`` and the whole payload is rendered by
+orjson in one pass, with the raw fragments spliced in as bytes without being parsed.
+
+Endpoints opting in keep their ``response_model`` for the OpenAPI schema; returning a
+Response instance bypasses FastAPI's validation and serialization of the return value.
+"""
+
+import re
+import uuid
+from enum import Enum
+from typing import Any, List
+
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+
+
+class RawJSON(str):
+    """
+    Already-serialized, trusted JSON text embedded verbatim by dumps_json
+
+    Only wrap values the application itself serialized (e.g. the JSON columns of
+    content_entries or published_content); the text is not validated.
+    """
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Serialize content with orjson, embedding RawJSON values as-is
+
+    Datetimes are rendered like Pydantic does (ISO 8601, ``Z`` for UTC), so payloads
+    match their ``response_model`` serialization.
+    """
+    fragments: List[bytes] = []
+    token = uuid.uuid4().hex
+
+    def default(obj):
+        # OPT_PASSTHROUGH_SUBCLASS routes every str/int/dict/list subclass through here
+        if isinstance(obj, RawJSON):
+            placeholder = f"rawjson:{token}:{len(fragments)}"
+            fragments.append(obj.encode() or b"null")
+            return placeholder
+        if isinstance(obj, Enum):
+            return obj.value
+        if isinstance(obj, str):
+            return str(obj)
+        if isinstance(obj, int):
+            return int(obj)
+        if isinstance(obj, dict):
+            return dict(obj)
+        if isinstance(obj, list):
+            return list(obj)
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump(mode="json")
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    body = orjson.dumps(content, default=default, option=ORJSON_OPTIONS)
+    if not fragments:
+        return body
+    # Splice every fragment in with a single pass over the body
+    placeholders = re.compile(b'"rawjson:' + token.encode() + rb':(\d+)"')
+    return placeholders.sub(lambda match: fragments[int(match.group(1))], body)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps_json (orjson + RawJSON fragments)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
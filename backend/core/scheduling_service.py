@@ -6,6 +6,8 @@ from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.content_counts import invalidate_content_counts
+from backend.core.published_content import sync_published_content
 from backend.models.schedule import ContentSchedule
 from backend.models.content import ContentEntry
 
@@ -113,11 +115,15 @@ class SchedulingService:
             elif schedule.action == "unpublish":
                 content_entry.status = "draft"
             
+            await db.run_sync(sync_published_content, content_entry)
+            
             # Mark schedule as completed
             schedule.status = "completed"
             schedule.executed_at = datetime.now(timezone.utc)
+            organization_id = schedule.organization_id
             
             await db.commit()
+            await invalidate_content_counts(organization_id)
             return True
             
         except Exception as e:
@@ -4,6 +4,7 @@ Security utilities for password hashing and JWT tokens
 
 import base64
 import hashlib
+import hmac
 import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
@@ -125,6 +126,25 @@ def hash_api_key(api_key: str) -> str:
     return hashed.decode("utf-8")
 
 
+def api_key_lookup_hash(api_key: str) -> str:
+    """
+    Keyed, deterministic hash of an API key for indexed lookup.
+
+    HMAC-SHA256 with SECRET_KEY, so a leaked api_keys table cannot be used to test
+    candidate keys offline, while authentication finds the key row with one index seek
+    instead of bcrypt-checking every key.
+
+    Args:
+        api_key: The plain text API key
+
+    Returns:
+        64-character hex digest
+    """
+    return hmac.new(
+        settings.SECRET_KEY.encode("utf-8"), api_key.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
 class TokenData(BaseModel):
     """Token payload data"""
 
@@ -1142,7 +1142,7 @@ def create_organization_boutique_api_key(
     Returns:
         Dictionary with 'api_key' (the full key - only shown once) and 'key_id'
     """
-    from backend.core.security import generate_api_key, hash_api_key
+    from backend.core.security import api_key_lookup_hash, generate_api_key, hash_api_key
     from backend.models.api_key import APIKey
 
     # Check if a boutique API key already exists for this organization
@@ -1176,6 +1176,7 @@ def create_organization_boutique_api_key(
         description="Auto-generated API key for boutique platform access. Grants permissions for public catalog browsing, customer operations, and order management.",
         key_hash=key_hash,
         key_prefix=key_prefix,
+        key_lookup=api_key_lookup_hash(full_key),
         permissions=",".join(BOUTIQUE_API_KEY_SCOPES),
         organization_id=organization_id,
         created_by_id=created_by_id,
@@ -6,6 +6,7 @@ import json
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
 from backend.api.schemas.seo import (
     SEOAnalysis, 
     CompleteSEOData,
@@ -381,6 +382,51 @@ def generate_robots_txt(
     return "\n".join(lines)
 
 
+SITEMAP_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>'
+SITEMAP_URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+SITEMAP_URLSET_CLOSE = "</urlset>"
+
+
+def _format_lastmod(lastmod) -> str:
+    if isinstance(lastmod, datetime):
+        return lastmod.strftime('%Y-%m-%d')
+    return str(lastmod)
+
+
+def generate_sitemap_url_xml(
+    loc: str,
+    lastmod: Optional[Any] = None,
+    changefreq: Optional[str] = None,
+    priority: Optional[float] = None
+) -> str:
+    """
+    Generate the <url> element of one sitemap entry
+    
+    Args:
+        loc: Absolute URL of the page (XML-escaped here)
+        lastmod: Last modification date (datetime or W3C date string)
+        changefreq: Change frequency hint
+        priority: Priority hint (0.0 - 1.0)
+        
+    Returns:
+        XML fragment (newline-terminated)
+    """
+    xml_lines = ["  <url>", f"    <loc>{xml_escape(loc)}</loc>"]
+    
+    if lastmod:
+        xml_lines.append(f"    <lastmod>{_format_lastmod(lastmod)}</lastmod>")
+    
+    if changefreq:
+        xml_lines.append(f"    <changefreq>{changefreq}</changefreq>")
+    
+    if priority:
+        xml_lines.append(f"    <priority>{priority}</priority>")
+    
+    xml_lines.append("  </url>")
+    
+    return "\n".join(xml_lines) + "\n"
+
+
 def generate_sitemap_xml(entries: List[Dict[str, Any]]) -> str:
     """
     Generate XML sitemap
@@ -391,29 +437,45 @@ def generate_sitemap_xml(entries: List[Dict[str, Any]]) -> str:
     Returns:
         XML sitemap content
     """
-    xml_lines = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
-    ]
+    xml_parts = [SITEMAP_XML_HEADER + "\n" + SITEMAP_URLSET_OPEN + "\n"]
     
     for entry in entries:
-        xml_lines.append("  <url>")
-        xml_lines.append(f"    <loc>{entry['loc']}</loc>")
-        
-        if entry.get('lastmod'):
-            lastmod = entry['lastmod']
-            if isinstance(lastmod, datetime):
-                lastmod = lastmod.strftime('%Y-%m-%d')
-            xml_lines.append(f"    <lastmod>{lastmod}</lastmod>")
-        
-        if entry.get('changefreq'):
-            xml_lines.append(f"    <changefreq>{entry['changefreq']}</changefreq>")
-        
-        if entry.get('priority'):
-            xml_lines.append(f"    <priority>{entry['priority']}</priority>")
+        xml_parts.append(
+            generate_sitemap_url_xml(
+                entry['loc'],
+                lastmod=entry.get('lastmod'),
+                changefreq=entry.get('changefreq'),
+                priority=entry.get('priority')
+            )
+        )
+    
+    xml_parts.append(SITEMAP_URLSET_CLOSE)
+    
+    return "".join(xml_parts)
+
+
+def generate_sitemap_index_xml(sitemaps: List[Dict[str, Any]]) -> str:
+    """
+    Generate XML sitemap index
+    
+    Args:
+        sitemaps: List of child sitemaps with loc and lastmod
         
-        xml_lines.append("  </url>")
+    Returns:
+        XML sitemap index content
+    """
+    xml_lines = [
+        SITEMAP_XML_HEADER,
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    ]
+    
+    for sitemap in sitemaps:
+        xml_lines.append("  <sitemap>")
+        xml_lines.append(f"    <loc>{xml_escape(sitemap['loc'])}</loc>")
+        if sitemap.get('lastmod'):
+            xml_lines.append(f"    <lastmod>{_format_lastmod(sitemap['lastmod'])}</lastmod>")
+        xml_lines.append("  </sitemap>")
     
-    xml_lines.append("</urlset>")
+    xml_lines.append("</sitemapindex>")
     
     return "\n".join(xml_lines)
@@ -0,0 +1,211 @@
+"""
+Per-organization XML sitemaps
+
+An organization's published entries are split, in (created_at, id) order, into child
+sitemaps of at most SITEMAP_MAX_URLS URLs (the protocol limit) listed by a sitemap index.
+Child sitemaps are streamed from a server-side cursor in chunks instead of being built in
+memory, and the rendered XML is cached in Redis under a key that includes the slice's
+version (row count, max updated_at and max created_at), so any edit, publish or unpublish
+touching a slice changes its key and no explicit invalidation is needed.
+
+Page boundaries and slice versions are computed together and cached under the
+organization's watermark (the same version over all its published entries), so serving
+a cached sitemap costs one aggregate query however deep the page is.
+"""
+
+import hashlib
+from typing import Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.core.cache import CacheKeys, CacheTags, cache
+from backend.core.seo_utils import (
+    SITEMAP_URLSET_CLOSE,
+    SITEMAP_URLSET_OPEN,
+    SITEMAP_XML_HEADER,
+    generate_sitemap_url_xml,
+)
+from backend.models.content import ContentEntry, ContentType
+
+# Sitemap protocol limit on URLs per file
+SITEMAP_MAX_URLS = 50_000
+
+# Rows fetched per round trip and URLs per streamed chunk
+SITEMAP_CHUNK_SIZE = 1000
+
+# Cached child sitemaps are versioned by their slice; the TTL only reclaims old versions
+SITEMAP_CACHE_TTL = 86400
+
+# base_url of the sitemap routes when none is given
+SITEMAP_DEFAULT_BASE_URL = "https://example.com"
+
+
+def _published_entries(organization_id):
+    return (
+        select(ContentEntry.slug, ContentEntry.updated_at, ContentEntry.created_at)
+        .join(ContentType, ContentEntry.content_type_id == ContentType.id)
+        .where(
+            ContentType.organization_id == organization_id,
+            ContentEntry.status == "published",
+        )
+    )
+
+
+def _sitemap_slice(organization_id, page: int):
+    return (
+        _published_entries(organization_id)
+        .order_by(ContentEntry.created_at, ContentEntry.id)
+        .offset((page - 1) * SITEMAP_MAX_URLS)
+        .limit(SITEMAP_MAX_URLS)
+    )
+
+
+class SitemapPage(NamedTuple):
+    """A child sitemap: its number (from 1), lastmod date and the version of its slice"""
+
+    page: int
+    lastmod: Optional[str]
+    version: str
+
+
+def sitemap_watermark(db: Session, organization_id) -> str:
+    """
+    Version of all of an organization's published entries
+
+    Row count, max updated_at and max created_at, so any publish, unpublish, edit or
+    delete changes it. One aggregate query, with no sort or offset.
+    """
+    published = _published_entries(organization_id).subquery()
+    count, max_updated_at, max_created_at = db.execute(
+        select(func.count(), func.max(published.c.updated_at), func.max(published.c.created_at))
+    ).one()
+    return f"{count}:{max_updated_at}:{max_created_at}"
+
+
+def list_sitemap_pages(db: Session, organization_id) -> List[SitemapPage]:
+    """
+    Child sitemaps of an organization
+
+    Page boundaries come from a row_number() window over every published entry, so they
+    are cached under the organization's watermark: requests cost the watermark query and
+    a cache read, and the window only runs again after the entries change.
+    """
+    watermark = f"{sitemap_watermark(db, organization_id)}|{SITEMAP_MAX_URLS}"
+    cache_key = CacheKeys.format(
+        CacheKeys.SEO_SITEMAP_PAGES,
+        org_id=organization_id,
+        version=hashlib.sha256(watermark.encode()).hexdigest()[:32],
+    )
+    cached = cache.get_json_sync(cache_key)
+    if cached is not None:
+        return [SitemapPage(*page) for page in cached]
+
+    numbered = (
+        _published_entries(organization_id)
+        .add_columns(
+            (
+                (func.row_number().over(order_by=(ContentEntry.created_at, ContentEntry.id)) - 1)
+                // SITEMAP_MAX_URLS
+            ).label("page")
+        )
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            numbered.c.page,
+            func.count(),
+            func.max(numbered.c.updated_at),
+            func.max(numbered.c.created_at),
+        )
+        .group_by(numbered.c.page)
+        .order_by(numbered.c.page)
+    ).all()
+    pages = [
+        SitemapPage(
+            page + 1,
+            max_updated_at.strftime("%Y-%m-%d") if max_updated_at else None,
+            f"{count}:{max_updated_at}:{max_created_at}",
+        )
+        for page, count, max_updated_at, max_created_at in rows
+    ]
+
+    cache.set_sync(
+        cache_key,
+        [list(page) for page in pages],
+        SITEMAP_CACHE_TTL,
+        tags=[CacheTags.organization(organization_id), CacheTags.sitemap(organization_id)],
+    )
+    return pages
+
+
+def is_cacheable_base_url(base_url: str, website: Optional[str]) -> bool:
+    """
+    Whether sitemaps rendered for base_url are cached
+
+    Only the organization's own website and the default are: base_url is part of the
+    cache key, so caching arbitrary values would let anyone add full sitemaps to Redis.
+    """
+    allowed = {SITEMAP_DEFAULT_BASE_URL}
+    if website:
+        allowed.add(website.rstrip("/"))
+    return base_url.rstrip("/") in allowed
+
+
+def sitemap_cache_key(organization_id, page: int, version: str, base_url: str) -> str:
+    """Cache key of a rendered child sitemap (URLs embed base_url, so it is part of the key)"""
+    digest = hashlib.sha256(f"{version}|{base_url}".encode()).hexdigest()[:32]
+    return CacheKeys.format(
+        CacheKeys.SEO_SITEMAP_PAGE, org_id=organization_id, page=page, version=digest
+    )
+
+
+def stream_sitemap_page(
+    db: Session,
+    organization_id,
+    page: int,
+    base_url: str,
+    cache_key: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Yield a child sitemap as XML chunks of SITEMAP_CHUNK_SIZE URLs
+
+    Rows are read through a server-side cursor (yield_per), so without cache_key memory
+    stays bounded by the chunk size. With cache_key, the document is also collected and
+    cached once the last chunk has been produced.
+    """
+    parts = [] if cache_key else None
+
+    def emit(chunk: str) -> str:
+        if parts is not None:
+            parts.append(chunk)
+        return chunk
+
+    yield emit(SITEMAP_XML_HEADER + "\n" + SITEMAP_URLSET_OPEN + "\n")
+
+    result = db.execute(
+        _sitemap_slice(organization_id, page).execution_options(yield_per=SITEMAP_CHUNK_SIZE)
+    )
+    for rows in result.partitions():
+        yield emit(
+            "".join(
+                generate_sitemap_url_xml(
+                    f"{base_url}/content/{row.slug}",
+                    lastmod=row.updated_at,
+                    changefreq="weekly",
+                    priority=0.8,  # All published content has same priority
+                )
+                for row in rows
+            )
+        )
+
+    yield emit(SITEMAP_URLSET_CLOSE)
+
+    if parts is not None:
+        # Tagged so publish/delete reclaims superseded versions before the TTL
+        cache.set_sync(
+            cache_key,
+            "".join(parts),
+            SITEMAP_CACHE_TTL,
+            tags=[CacheTags.organization(organization_id), CacheTags.sitemap(organization_id)],
+        )
@@ -3,9 +3,11 @@ Storage backend abstraction for local and S3 storage
 """
 
 import os
+import shutil
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple
 
 import boto3
 from botocore.config import Config as BotoConfig
@@ -15,6 +17,13 @@ from backend.core.config import Settings
 
 settings = Settings()
 
+# Size of the parts of S3 multipart uploads (S3 requires at least 5 MB, except the last)
+S3_MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+# Keys per S3 multi-object delete (the S3 maximum), and such requests run at once
+S3_DELETE_BATCH_SIZE = 1000
+S3_DELETE_CONCURRENCY = 8
+
 
 class StorageBackend(ABC):
     """Abstract storage backend"""
@@ -33,6 +42,25 @@ class StorageBackend(ABC):
         """
         pass
 
+    def save_stream(
+        self, chunks: Iterable[bytes], file_path: str, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Save file to storage from an iterable of chunks
+
+        Backends override this to store chunks as they arrive; if iterating raises, nothing
+        is left at file_path.
+
+        Args:
+            chunks: File content, in chunks
+            file_path: Relative file path
+            content_type: MIME type (guessed from the extension if omitted)
+
+        Returns:
+            Public URL or path to access the file
+        """
+        return self.save_file(b"".join(chunks), file_path)
+
     @abstractmethod
     def delete_file(self, file_path: str) -> bool:
         """
@@ -46,6 +74,39 @@ class StorageBackend(ABC):
         """
         pass
 
+    def delete_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Delete many files, in as few requests as the backend allows
+
+        Args:
+            file_paths: File paths to delete (missing files are not an error)
+
+        Returns:
+            The paths that could not be deleted
+        """
+        return [
+            file_path
+            for file_path in file_paths
+            if not self.delete_file(file_path) and self.file_exists(file_path)
+        ]
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Delete every file whose path starts with prefix
+
+        Args:
+            prefix: Path prefix ending in "/", e.g. a directory of derived files
+
+        Returns:
+            Number of files deleted
+        """
+        pass
+
+    def delete_prefixes(self, prefixes: List[str]) -> int:
+        """Delete every file under any of the prefixes; returns the number deleted"""
+        return sum(self.delete_prefix(prefix) for prefix in prefixes)
+
     @abstractmethod
     def get_file_url(self, file_path: str) -> str:
         """
@@ -59,6 +120,19 @@ class StorageBackend(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_media_url(self, filename: str) -> str:
+        """
+        Get the API URL serving a media item
+
+        Args:
+            filename: Media filename (Media.filename)
+
+        Returns:
+            URL of the media file route for this backend
+        """
+        pass
+
     @abstractmethod
     def file_exists(self, file_path: str) -> bool:
         """
@@ -89,7 +163,26 @@ class LocalStorageBackend(StorageBackend):
             f.write(file_content)
 
         # Return relative path as URL
-        return f"/api/v1/media/files/{Path(file_path).name}"
+        return self.get_media_url(Path(file_path).name)
+
+    def save_stream(
+        self, chunks: Iterable[bytes], file_path: str, content_type: Optional[str] = None
+    ) -> str:
+        """Write chunks to a temporary file, moved into place once complete"""
+        full_path = self.base_dir / file_path
+        full_path.parent.mkdir(exist_ok=True, parents=True)
+        part_path = full_path.with_name(f".{full_path.name}.part")
+
+        try:
+            with open(part_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(part_path, full_path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        return self.get_media_url(Path(file_path).name)
 
     def delete_file(self, file_path: str) -> bool:
         """Delete file from local filesystem"""
@@ -105,11 +198,24 @@ class LocalStorageBackend(StorageBackend):
         except Exception:
             return False
 
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete a directory from local filesystem"""
+        directory = self.base_dir / prefix
+        if not directory.is_dir():
+            return 0
+        count = sum(1 for path in directory.rglob("*") if path.is_file())
+        shutil.rmtree(directory, ignore_errors=True)
+        return count
+
     def get_file_url(self, file_path: str) -> str:
         """Get URL for local file"""
         filename = Path(file_path).name
         return f"/api/v1/media/files/{filename}"
 
+    def get_media_url(self, filename: str) -> str:
+        """Local files are served by the API"""
+        return f"/api/v1/media/files/{filename}"
+
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists locally"""
         full_path = Path(file_path)
@@ -186,12 +292,79 @@ class S3StorageBackend(StorageBackend):
 
             # Return proxy URL so files are served through the API
             # This avoids exposing MinIO/S3 directly to browsers
-            from pathlib import Path
-
-            return f"/api/v1/media/proxy/{Path(file_path).name}"
+            return self.get_media_url(Path(file_path).name)
         except ClientError as e:
             raise Exception(f"Failed to upload to S3: {str(e)}")
 
+    def save_stream(
+        self, chunks: Iterable[bytes], file_path: str, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload chunks to S3 without holding the file in memory
+
+        Files up to one part are uploaded with a single PUT; larger ones with a multipart
+        upload, one S3_MULTIPART_PART_SIZE part at a time, aborted if anything fails.
+        """
+        content_type = content_type or self._guess_content_type(file_path)
+        upload_id = None
+        parts = []
+        buffer = bytearray()
+
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= S3_MULTIPART_PART_SIZE:
+                    if upload_id is None:
+                        upload_id = self.s3_client.create_multipart_upload(
+                            Bucket=self.bucket_name, Key=file_path, ContentType=content_type
+                        )["UploadId"]
+                    parts.append(
+                        self._upload_part(
+                            file_path, upload_id, len(parts) + 1, buffer[:S3_MULTIPART_PART_SIZE]
+                        )
+                    )
+                    del buffer[:S3_MULTIPART_PART_SIZE]
+
+            if upload_id is None:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=file_path,
+                    Body=bytes(buffer),
+                    ContentType=content_type,
+                )
+            else:
+                if buffer:
+                    parts.append(self._upload_part(file_path, upload_id, len(parts) + 1, buffer))
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=file_path,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException as e:
+            if upload_id is not None:
+                try:
+                    self.s3_client.abort_multipart_upload(
+                        Bucket=self.bucket_name, Key=file_path, UploadId=upload_id
+                    )
+                except ClientError:
+                    pass  # Left for the bucket's lifecycle rule to clean up
+            if isinstance(e, ClientError):
+                raise Exception(f"Failed to upload to S3: {str(e)}")
+            raise
+
+        return self.get_media_url(Path(file_path).name)
+
+    def _upload_part(self, file_path: str, upload_id: str, part_number: int, data) -> dict:
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=file_path,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=bytes(data),
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
     def delete_file(self, file_path: str) -> bool:
         """Delete file from S3"""
         try:
@@ -203,6 +376,62 @@ class S3StorageBackend(StorageBackend):
         except ClientError:
             return False
 
+    def delete_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Delete S3 objects with multi-object deletes of S3_DELETE_BATCH_SIZE keys,
+        S3_DELETE_CONCURRENCY requests at a time
+        """
+        paths = {
+            file_path.replace(f"s3://{self.bucket_name}/", ""): file_path
+            for file_path in file_paths
+        }
+        keys = list(paths)
+        batches = [
+            keys[start : start + S3_DELETE_BATCH_SIZE]
+            for start in range(0, len(keys), S3_DELETE_BATCH_SIZE)
+        ]
+        if len(batches) <= 1:
+            failed = self._delete_batch(batches[0]) if batches else []
+        else:
+            with ThreadPoolExecutor(max_workers=S3_DELETE_CONCURRENCY) as executor:
+                results = list(executor.map(self._delete_batch, batches))
+            failed = [key for batch in results for key in batch]
+        return [paths[key] for key in failed]
+
+    def _delete_batch(self, keys: List[str]) -> List[str]:
+        """Delete up to 1000 objects in one request; returns the keys S3 did not delete"""
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+        except ClientError:
+            return keys
+        return [error["Key"] for error in response.get("Errors", [])]
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every S3 object under a prefix, a page (up to 1000 keys) per request"""
+        count = 0
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                keys = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+                if keys:
+                    self.s3_client.delete_objects(
+                        Bucket=self.bucket_name, Delete={"Objects": keys, "Quiet": True}
+                    )
+                    count += len(keys)
+        except ClientError:
+            pass
+        return count
+
+    def delete_prefixes(self, prefixes: List[str]) -> int:
+        """Delete every S3 object under any of the prefixes, S3_DELETE_CONCURRENCY at a time"""
+        if len(prefixes) <= 1:
+            return sum(self.delete_prefix(prefix) for prefix in prefixes)
+        with ThreadPoolExecutor(max_workers=S3_DELETE_CONCURRENCY) as executor:
+            return sum(executor.map(self.delete_prefix, prefixes))
+
     def get_file_url(self, file_path: str) -> str:
         """Get public URL for S3 file"""
         # Use custom CDN URL if configured
@@ -216,6 +445,10 @@ class S3StorageBackend(StorageBackend):
         # Default AWS S3 URL
         return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{file_path}"
 
+    def get_media_url(self, filename: str) -> str:
+        """S3 files are proxied through the API, so MinIO/S3 isn't exposed to browsers"""
+        return f"/api/v1/media/proxy/{filename}"
+
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists in S3"""
         try:
@@ -253,6 +486,39 @@ class S3StorageBackend(StorageBackend):
         except ClientError as e:
             raise Exception(f"Failed to generate presigned URL: {str(e)}")
 
+    def open_stream(
+        self,
+        file_path: str,
+        byte_range: Optional[str] = None,
+        if_match: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> dict:
+        """
+        Open an S3 object for streaming, without reading its body
+
+        Args:
+            file_path: S3 key
+            byte_range: HTTP Range header value (a single byte range) to request
+            if_match: Only return the object if its ETag matches
+            if_none_match: Only return the object if its ETag doesn't match
+
+        Returns:
+            The get_object response: Body (a StreamingBody to iterate and close),
+            ContentLength, ContentRange (for ranges), ContentType and ETag
+
+        Raises:
+            ClientError: With code NoSuchKey, InvalidRange, PreconditionFailed or 304
+        """
+        s3_key = file_path.replace(f"s3://{self.bucket_name}/", "")
+        params = {"Bucket": self.bucket_name, "Key": s3_key}
+        if byte_range:
+            params["Range"] = byte_range
+        if if_match:
+            params["IfMatch"] = if_match
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+        return self.s3_client.get_object(**params)
+
     def get_file_content(self, file_path: str) -> Tuple[bytes, str]:
         """
         Download file content from S3
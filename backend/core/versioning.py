@@ -4,8 +4,9 @@ API versioning middleware and utilities.
 Supports URL-based versioning (/api/v1, /api/v2) with deprecation warnings.
 """
 from typing import Callable, Optional
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from datetime import datetime, timezone
 import re
 
@@ -32,7 +33,7 @@ class APIVersion:
     SUPPORTED = [V1]
 
 
-class VersioningMiddleware(BaseHTTPMiddleware):
+class VersioningMiddleware:
     """
     Middleware to handle API versioning.
     
@@ -41,31 +42,43 @@ class VersioningMiddleware(BaseHTTPMiddleware):
     - Validates version is supported
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request with versioning logic."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
         # Extract version from URL path
-        version = self._extract_version(request.url.path)
+        version = self._extract_version(scope["path"])
         
         # Store version in request state for use in endpoints
-        request.state.api_version = version
-        
-        # Process request
-        response = await call_next(request)
+        scope.setdefault("state", {})["api_version"] = version
         
-        # Add version header
-        if version:
-            response.headers["X-API-Version"] = version
+        if not version:
+            await self.app(scope, receive, send)
+            return
         
-        # Add deprecation warnings if applicable
-        if version and version in APIVersion.DEPRECATIONS:
-            deprecation_info = APIVersion.DEPRECATIONS[version]
-            response.headers["Deprecation"] = f"date=\"{deprecation_info['deprecated_at']}\""
-            response.headers["Sunset"] = deprecation_info["sunset_at"]
-            response.headers["Link"] = f'<https://docs.bakalr.cms/api/{APIVersion.CURRENT}>; rel="successor-version"'
-            response.headers["X-API-Warn"] = deprecation_info["message"]
+        async def send_with_version(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                
+                # Add version header
+                headers["X-API-Version"] = version
+                
+                # Add deprecation warnings if applicable
+                if version in APIVersion.DEPRECATIONS:
+                    deprecation_info = APIVersion.DEPRECATIONS[version]
+                    headers["Deprecation"] = f"date=\"{deprecation_info['deprecated_at']}\""
+                    headers["Sunset"] = deprecation_info["sunset_at"]
+                    headers["Link"] = f'<https://docs.bakalr.cms/api/{APIVersion.CURRENT}>; rel="successor-version"'
+                    headers["X-API-Warn"] = deprecation_info["message"]
+            await send(message)
         
-        return response
+        # Process request
+        await self.app(scope, receive, send_with_version)
     
     def _extract_version(self, path: str) -> Optional[str]:
         """
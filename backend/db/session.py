@@ -3,10 +3,11 @@ Database session management with optimized connection pooling
 """
 
 import logging
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine, event, pool
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from backend.core.config import settings
@@ -108,6 +109,66 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_async_database_url(database_url: str) -> URL:
+    """
+    Map a sync DATABASE_URL onto its asyncio driver (asyncpg / aiosqlite)
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+# Async engine for hot read paths: requests awaiting the database yield the event loop
+# instead of stalling every other request on the worker
+async_engine_kwargs = {
+    "echo": settings.DATABASE_ECHO,
+    "pool_pre_ping": True,
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+    "connect_args": (
+        {
+            "timeout": 10,
+            # PostgreSQL-specific optimizations
+            "server_settings": {"statement_timeout": "30000"},  # 30 second query timeout
+        }
+        if "postgresql" in settings.DATABASE_URL
+        else {}
+    ),
+}
+
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL), **async_engine_kwargs
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session with proper cleanup
+
+    Use for read-heavy endpoints; objects loaded here must not be lazy-loaded or mixed
+    into a sync Session.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database error: {e}")
+            raise
+
+
 def get_pool_stats():
     """Get connection pool statistics for monitoring"""
     return {
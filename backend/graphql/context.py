@@ -8,7 +8,7 @@ from fastapi import Depends, Request
 from sqlalchemy.orm import Session
 from strawberry.fastapi import BaseContext
 
-from backend.core.security import verify_token
+from backend.core.principals import get_user_for_token
 from backend.db.session import get_db
 from backend.models.user import User
 
@@ -43,13 +43,8 @@ class GraphQLContext(BaseContext):
 
         token = auth_header.split(" ")[1]
         try:
-            token_data = verify_token(token, token_type="access")
-            if not token_data or not token_data.sub:
-                return None
-
-            # User.id is a UUID, so use string comparison (sub is UUID as string)
-            user = self.db.query(User).filter(User.id == token_data.sub).first()
-            return user
+            # Principal cache, then token verification and the users table
+            return get_user_for_token(token, self.db)
         except Exception:
             return None
 
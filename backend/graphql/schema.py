@@ -8,6 +8,9 @@ import strawberry
 from sqlalchemy.orm import joinedload
 from strawberry.types import Info
 
+from backend.core.content_counts import invalidate_content_counts_sync
+from backend.core.pagination import apply_keyset, build_keyset_page
+from backend.core.published_content import sync_published_content
 from backend.graphql.context import GraphQLContext
 from backend.graphql.types import (
     ContentEntryConnection,
@@ -221,6 +224,8 @@ class Query:
         per_page: Optional[int] = None,  # Deprecated alias for size
         status: Optional[str] = None,
         content_type_slug: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> ContentEntryConnection:
         """List content entries with pagination and filters.
 
@@ -231,6 +236,9 @@ class Query:
             per_page: Deprecated alias for size
             status: Filter by content status
             content_type_slug: Filter by content type
+            cursor: pageInfo.nextCursor of the previous page; seeks on (sort field, id)
+                instead of using an offset, and the page number is ignored
+            include_total: Set to false to skip the COUNT query (totalElements is null)
         """
         context: GraphQLContext = info.context
         context.require_permission("content.read")
@@ -261,23 +269,35 @@ class Query:
             # ContentType already joined above, just filter by api_id (slug)
             query = query.filter(ContentType.api_id == content_type_slug)
 
-        # Apply sorting
-        if pageable.sort:
-            sort_column = getattr(ContentEntry, pageable.sort, None)
-            if sort_column is not None:
-                if pageable.direction == "asc":
-                    query = query.order_by(sort_column.asc())
-                else:
-                    query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(ContentEntry.created_at.desc())
+        total = query.count() if include_total else None
 
-        total = query.count()
-        entries = query.offset(pageable.offset).limit(pageable.size).all()
+        # Apply sorting (id is always the tie-breaker so pages are stable)
+        sort_column = ContentEntry.created_at
+        descending = True
+        if pageable.sort:
+            sort_column = getattr(ContentEntry, pageable.sort, None) or sort_column
+            descending = pageable.direction != "asc"
+
+        query = apply_keyset(
+            context.db,
+            query,
+            sort_column,
+            ContentEntry.id,
+            pageable.size,
+            cursor=cursor,
+            descending=descending,
+        )
+        if not cursor:
+            query = query.offset(pageable.offset)
+        entries, next_cursor = build_keyset_page(
+            query.all(), pageable.size, sort_column, ContentEntry.id
+        )
 
         return ContentEntryConnection(
             content=[to_content_entry_type(e) for e in entries],
-            page_info=PageInfo.from_pageable(pageable, total, len(entries)),
+            page_info=PageInfo.from_pageable(
+                pageable, total, len(entries), next_cursor=next_cursor, cursor=cursor
+            ),
         )
 
     @strawberry.field
@@ -427,7 +447,9 @@ class Mutation:
 
         entry.status = "published"
         entry.published_at = datetime.now(timezone.utc).isoformat()
+        sync_published_content(context.db, entry)
         context.db.commit()
+        invalidate_content_counts_sync(context.organization_id)
         context.db.refresh(entry)
 
         return to_content_entry_type(entry)
@@ -454,7 +476,9 @@ class Mutation:
             raise Exception("Content entry not found")
 
         entry.status = "draft"
+        sync_published_content(context.db, entry)
         context.db.commit()
+        invalidate_content_counts_sync(context.organization_id)
         context.db.refresh(entry)
 
         return to_content_entry_type(entry)
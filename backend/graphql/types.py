@@ -174,8 +174,8 @@ class PageInfo:
     Pagination metadata for a Page response (Spring-style Page pattern).
 
     Attributes:
-        total_elements: Total number of elements across all pages
-        total_pages: Total number of pages
+        total_elements: Total number of elements across all pages (null when not requested)
+        total_pages: Total number of pages (null when not requested)
         size: Number of elements per page
         number: Current page number (zero-based)
         number_of_elements: Number of elements in current page
@@ -185,10 +185,11 @@ class PageInfo:
         has_previous: Whether there is a previous page
         sort: Sort field used
         direction: Sort direction used
+        next_cursor: Opaque cursor for keyset pagination of the next page, if any
     """
 
-    total_elements: int
-    total_pages: int
+    total_elements: Optional[int]
+    total_pages: Optional[int]
     size: int
     number: int  # Current page number (zero-based)
     number_of_elements: int
@@ -198,27 +199,49 @@ class PageInfo:
     has_previous: bool
     sort: Optional[str] = None
     direction: str = "desc"
+    next_cursor: Optional[str] = None
 
     @staticmethod
     def from_pageable(
-        pageable: Pageable, total_elements: int, number_of_elements: int
+        pageable: Pageable,
+        total_elements: Optional[int],
+        number_of_elements: int,
+        next_cursor: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> "PageInfo":
-        """Create PageInfo from a Pageable request and query results."""
-        total_pages = (
-            (total_elements + pageable.size - 1) // pageable.size if pageable.size > 0 else 0
-        )
+        """Create PageInfo from a Pageable request and query results.
+
+        When total_elements is None (totals not requested) or a cursor was used, first/last
+        and has_next/has_previous are derived from the cursors instead of page arithmetic.
+        """
+        total_pages = None
+        if total_elements is not None:
+            total_pages = (
+                (total_elements + pageable.size - 1) // pageable.size if pageable.size > 0 else 0
+            )
+
+        if total_pages is None or cursor:
+            first = not cursor and pageable.page == 0
+            has_next = next_cursor is not None
+            last = not has_next
+        else:
+            first = pageable.page == 0
+            last = pageable.page >= total_pages - 1 if total_pages > 0 else True
+            has_next = pageable.page < total_pages - 1 if total_pages > 0 else False
+
         return PageInfo(
             total_elements=total_elements,
             total_pages=total_pages,
             size=pageable.size,
             number=pageable.page,
             number_of_elements=number_of_elements,
-            first=pageable.page == 0,
-            last=pageable.page >= total_pages - 1 if total_pages > 0 else True,
-            has_next=pageable.page < total_pages - 1 if total_pages > 0 else False,
-            has_previous=pageable.page > 0,
+            first=first,
+            last=last,
+            has_next=has_next,
+            has_previous=not first,
             sort=pageable.sort,
             direction=pageable.direction,
+            next_cursor=next_cursor,
         )
 
 
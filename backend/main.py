@@ -2,6 +2,7 @@
 FastAPI application configuration and initialization
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
@@ -17,7 +18,9 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from strawberry.fastapi import GraphQLRouter
 
 from backend.api import api_router
+from backend.core.api_key_auth import run_api_key_usage_flusher
 from backend.core.cache import cache
+from backend.core.cache_warming import cache_warming_service
 from backend.core.config import settings
 from backend.core.exceptions import (
     AppException,
@@ -26,6 +29,7 @@ from backend.core.exceptions import (
     http_exception_handler,
     validation_exception_handler,
 )
+from backend.core.image_worker import image_worker
 from backend.core.query_optimization import setup_query_logging
 from backend.core.rate_limit import limiter
 from backend.core.versioning import VersioningMiddleware
@@ -66,15 +70,27 @@ async def lifespan(app: FastAPI):
         print("📊 Setting up query performance logging...")
         setup_query_logging(engine)
 
-    # TODO: Enable cache warming in production
-    # if not settings.DEBUG:
-    #     print("🔥 Warming cache...")
-    #     await cache_warming_service.warm_all()
+    # Warm the most accessed lookups now (after every deploy), then on schedule
+    warming = settings.CACHE_WARMING_ENABLED and os.getenv("TESTING", "false").lower() != "true"
+    if warming:
+        print("🔥 Starting cache warming...")
+        cache_warming_service.start()
+
+    # Write buffered API key usage even when a worker goes idle, and on shutdown
+    usage_flusher = asyncio.create_task(run_api_key_usage_flusher())
 
     yield
 
     # Shutdown
     print("👋 Shutting down...")
+    if warming:
+        await cache_warming_service.stop()
+    usage_flusher.cancel()
+    try:
+        await usage_flusher
+    except asyncio.CancelledError:
+        pass
+    image_worker.shutdown()
     await cache.disconnect()
 
 
@@ -199,7 +215,7 @@ Get started by registering an account at `/api/v1/auth/register`.
     setup_security_middleware(app, settings.SECRET_KEY)
 
     # Rate limit headers middleware (adds X-RateLimit-* headers)
-    setup_rate_limit_headers_middleware(app, settings.REDIS_URL, default_limit=100)
+    setup_rate_limit_headers_middleware(app)
 
     # GZip compression
     app.add_middleware(GZipMiddleware, minimum_size=1000)
@@ -5,27 +5,36 @@ Required because SlowAPI's decorator-based rate limiting doesn't work
 with Strawberry GraphQL's routing architecture.
 """
 
+import math
 import time
+from typing import List, Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from backend.core.config import settings
+from backend.core.rate_limit import (
+    RateLimitWindow,
+    hit_rate_limit_windows,
+    most_restrictive_window,
+)
 
 
-class GraphQLRateLimitMiddleware(BaseHTTPMiddleware):
+class GraphQLRateLimitMiddleware:
     """
     Rate limiting middleware specifically for the GraphQL endpoint.
 
     Applies rate limits at the ASGI middleware level before the request
     reaches Strawberry's GraphQL router.
 
-    Uses Redis-based rate limiting with fixed-window strategy.
+    Uses Redis-based rate limiting with fixed-window strategy; every window is counted
+    and read back in a single round trip (see backend.core.rate_limit).
     """
 
-    def __init__(self, app, redis_client=None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, redis_client=None):
+        self.app = app
         self.redis_client = redis_client
         # Parse rate limit from settings: "100/hour;20/minute"
         self.rate_limits = self._parse_rate_limit(settings.RATE_LIMIT_GRAPHQL)
@@ -54,33 +63,47 @@ class GraphQLRateLimitMiddleware(BaseHTTPMiddleware):
                 limits.append((count, seconds))
         return limits
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Only apply rate limiting to GraphQL endpoint
-        if request.url.path == "/api/v1/graphql":
-            try:
-                # Get rate limit identifier
-                identifier = self._get_identifier(request)
+        if scope["type"] != "http" or scope["path"] != "/api/v1/graphql":
+            await self.app(scope, receive, send)
+            return
 
-                # Check rate limits
-                for limit_count, limit_seconds in self.rate_limits:
-                    if not await self._check_rate_limit(identifier, limit_count, limit_seconds):
-                        return self._rate_limit_response(limit_seconds)
+        windows = None
+        try:
+            # Get rate limit identifier
+            identifier = self._get_identifier(Request(scope))
 
-            except Exception as e:
-                # Log error but don't block request on rate limit failures
-                print(f"Rate limit check failed: {e}")
+            # Check rate limits (all windows in one round trip)
+            windows = await self._check_rate_limit(identifier)
+            window = most_restrictive_window(windows or [])
+            if window is not None and window.exceeded:
+                response = self._rate_limit_response(window)
+                await response(scope, receive, send)
+                return
 
-        # Continue to next middleware/handler
-        response = await call_next(request)
+            # Reported by RateLimitHeadersMiddleware
+            scope.setdefault("state", {})["rate_limit_window"] = window
 
-        # Add rate limit headers to GraphQL responses
-        if request.url.path == "/api/v1/graphql" and response.status_code < 500:
-            # Add headers showing limits
-            response.headers["X-RateLimit-Limit"] = (
-                str(self.rate_limits[0][0]) if self.rate_limits else "100"
-            )
+        except Exception as e:
+            # Log error but don't block request on rate limit failures
+            print(f"Rate limit check failed: {e}")
+
+        if windows:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            # Without window state (no Redis), still show the limit on GraphQL responses
+            if message["type"] == "http.response.start" and message["status"] < 500:
+                # Add headers showing limits
+                MutableHeaders(scope=message)["X-RateLimit-Limit"] = (
+                    str(self.rate_limits[0][0]) if self.rate_limits else "100"
+                )
+            await send(message)
 
-        return response
+        # Continue to next middleware/handler
+        await self.app(scope, receive, send_with_headers)
 
     def _get_identifier(self, request: Request) -> str:
         """
@@ -102,40 +125,22 @@ class GraphQLRateLimitMiddleware(BaseHTTPMiddleware):
         client_ip = request.client.host if request.client else "unknown"
         return f"graphql:ip:{client_ip}"
 
-    async def _check_rate_limit(self, identifier: str, limit: int, seconds: int) -> bool:
+    async def _check_rate_limit(self, identifier: str) -> Optional[List[RateLimitWindow]]:
         """
-        Check if request is within rate limit using Redis.
-        Returns True if allowed, False if rate limit exceeded.
+        Count the request in every configured window using Redis.
+        Returns the window states, or None if Redis is not available.
         """
-        # Import redis here to avoid circular imports
-        from backend.core.cache import cache
-
-        if not cache.client:
-            # If Redis is not available, allow the request
-            return True
-
-        # Create Redis key for this time window
-        current_window = int(time.time() / seconds)
-        key = f"ratelimit:{identifier}:{seconds}:{current_window}"
-
         try:
-            # Increment counter
-            current = await cache.client.incr(key)
-
-            # Set expiry on first increment
-            if current == 1:
-                await cache.client.expire(key, seconds * 2)  # Keep for 2 windows
-
-            # Check if over limit
-            return current <= limit
+            return await hit_rate_limit_windows(f"ratelimit:{identifier}", self.rate_limits)
 
         except Exception as e:
             print(f"Redis rate limit error: {e}")
             # On error, allow the request
-            return True
+            return None
 
-    def _rate_limit_response(self, retry_after: int) -> JSONResponse:
+    def _rate_limit_response(self, window: RateLimitWindow) -> JSONResponse:
         """Return GraphQL-compliant rate limit error response"""
+        retry_after = max(1, math.ceil(window.reset - time.time()))
         return JSONResponse(
             status_code=429,
             content={
@@ -146,9 +151,5 @@ class GraphQLRateLimitMiddleware(BaseHTTPMiddleware):
                     }
                 ]
             },
-            headers={
-                "Retry-After": str(retry_after),
-                "X-RateLimit-Limit": str(self.rate_limits[0][0]) if self.rate_limits else "100",
-                "X-RateLimit-Remaining": "0",
-            },
+            headers={"Retry-After": str(retry_after), **window.headers()},
         )
@@ -5,41 +5,55 @@ Performance tracking middleware for FastAPI
 import logging
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from backend.core.performance import performance_monitor
 
 logger = logging.getLogger(__name__)
 
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
+class PerformanceMiddleware:
     """Middleware to track request performance metrics"""
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Start timing
         start_time = time.time()
 
         # Get endpoint path
-        endpoint = f"{request.method} {request.url.path}"
+        endpoint = f"{scope['method']} {scope['path']}"
 
-        # Process request
-        response = None
         status_code = 500
+        recorded = False
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code, recorded
+            if message["type"] == "http.response.start":
+                # Time to response headers, as seen by the client
+                duration = time.time() - start_time
+                status_code = message["status"]
+                performance_monitor.record_request(endpoint, duration, status_code)
+                recorded = True
+
+                # Add performance headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Response-Time"] = f"{duration * 1000:.2f}ms"
+                headers["X-Process-Time"] = f"{duration:.6f}"
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
+            await self.app(scope, receive, send_with_timing)
         except Exception as e:
             logger.error(f"Request failed: {endpoint} - {str(e)}")
             raise
         finally:
-            # Record metrics
-            duration = time.time() - start_time
-            performance_monitor.record_request(endpoint, duration, status_code)
-
-            # Add performance headers
-            if response is not None and hasattr(response, "headers"):
-                response.headers["X-Response-Time"] = f"{duration * 1000:.2f}ms"
-                response.headers["X-Process-Time"] = f"{duration:.6f}"
-
-        return response
+            if not recorded:
+                # Failed before a response was started
+                performance_monitor.record_request(endpoint, time.time() - start_time, status_code)
@@ -6,15 +6,27 @@ Implements security headers, CSRF protection, and request validation.
 
 import hashlib
 import hmac
-from datetime import datetime
-from typing import Callable
+from datetime import datetime, timezone
 
-from fastapi import Request, Response, status
+from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Permissions-Policy value sent with every response
+PERMISSIONS_POLICY = (
+    "geolocation=(), "
+    "microphone=(), "
+    "camera=(), "
+    "payment=(), "
+    "usb=(), "
+    "magnetometer=(), "
+    "gyroscope=(), "
+    "accelerometer=()"
+)
+
+
+class SecurityHeadersMiddleware:
     """
     Add security headers to all responses
 
@@ -27,47 +39,50 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - Permissions-Policy (formerly Feature-Policy)
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Prevent clickjacking attacks
-        response.headers["X-Frame-Options"] = "DENY"
+        # Force HTTPS (only in production)
+        use_hsts = Request(scope).url.hostname not in ["localhost", "127.0.0.1"]
 
-        # Enable browser XSS protection
-        response.headers["X-XSS-Protection"] = "1; mode=block"
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
 
-        # Force HTTPS (only in production)
-        if request.url.hostname not in ["localhost", "127.0.0.1"]:
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains; preload"
-            )
+                # Prevent MIME type sniffing
+                headers["X-Content-Type-Options"] = "nosniff"
 
-        # Control referrer information
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+                # Prevent clickjacking attacks
+                headers["X-Frame-Options"] = "DENY"
 
-        # Restrict browser features
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), "
-            "microphone=(), "
-            "camera=(), "
-            "payment=(), "
-            "usb=(), "
-            "magnetometer=(), "
-            "gyroscope=(), "
-            "accelerometer=()"
-        )
+                # Enable browser XSS protection
+                headers["X-XSS-Protection"] = "1; mode=block"
 
-        # Remove server identification
-        if "server" in response.headers:
-            del response.headers["server"]
+                if use_hsts:
+                    headers["Strict-Transport-Security"] = (
+                        "max-age=31536000; includeSubDomains; preload"
+                    )
 
-        return response
+                # Control referrer information
+                headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
 
+                # Restrict browser features
+                headers["Permissions-Policy"] = PERMISSIONS_POLICY
 
-class CSRFProtectionMiddleware(BaseHTTPMiddleware):
+                # Remove server identification
+                if "server" in headers:
+                    del headers["server"]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class CSRFProtectionMiddleware:
     """
     CSRF protection for state-changing operations
 
@@ -93,8 +108,8 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
         "/health",
     }
 
-    def __init__(self, app, secret_key: str):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, secret_key: str):
+        self.app = app
         self.secret_key = secret_key.encode()
 
     def _is_exempt(self, path: str) -> bool:
@@ -136,15 +151,23 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
         except (ValueError, AttributeError):
             return False
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Skip CSRF check for safe methods and exempt paths
-        if request.method not in self.PROTECTED_METHODS or self._is_exempt(request.url.path):
-            return await call_next(request)
+        if scope["method"] not in self.PROTECTED_METHODS or self._is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
 
         # For API requests with JWT, skip CSRF (token-based auth)
         auth_header = request.headers.get("authorization", "")
         if auth_header.startswith("Bearer "):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Validate CSRF token from header or form data
         csrf_token = request.headers.get("X-CSRF-Token")
@@ -152,11 +175,14 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
         if not csrf_token:
             # Try to get from form data
             if request.method == "POST":
+                body = await request.body()
                 form_data = await request.form()
                 csrf_token = form_data.get("csrf_token")
+                # The body has been consumed; replay it to the application
+                receive = _replay_body(body, receive)
 
         if not csrf_token:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "type": "https://bakalr.cms/errors/csrf-token-missing",
@@ -165,12 +191,14 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
                     "detail": "CSRF token is required for this operation",
                 },
             )
+            await response(scope, receive, send)
+            return
 
         # Get session ID from cookie
         session_id = request.cookies.get("session_id", "")
 
         if not self._validate_token(csrf_token, session_id):
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "type": "https://bakalr.cms/errors/csrf-token-invalid",
@@ -179,11 +207,27 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
                     "detail": "CSRF token validation failed",
                 },
             )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """Receive callable that yields an already read request body once, then defers"""
+    replayed = False
 
-        return await call_next(request)
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
 
+    return replay
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+
+class RequestValidationMiddleware:
     """
     Validate incoming requests for suspicious patterns
 
@@ -219,7 +263,11 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
         text_lower = text.lower()
         return any(pattern in text_lower for pattern in self.SQL_INJECTION_PATTERNS)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _validate(self, request: Request):
+        """Error response for a request that must be rejected, None if it may proceed"""
         # Check request body size
         content_length = request.headers.get("content-length")
         if content_length and int(content_length) > self.MAX_BODY_SIZE:
@@ -258,7 +306,19 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                 },
             )
 
-        return await call_next(request)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response = self._validate(Request(scope))
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
 
 
 def setup_security_middleware(app, secret_key: str):
@@ -8,7 +8,7 @@ from backend.models.base import IDMixin, TimestampMixin
 from backend.models.content import ContentEntry, ContentType
 from backend.models.content_template import ContentTemplate
 from backend.models.device import Device, DevicePlatform, DeviceStatus
-from backend.models.media import Media
+from backend.models.media import Media, MediaBlob
 from backend.models.notification import Notification
 from backend.models.oauth2 import (
     OAuth2AccessToken,
@@ -17,6 +17,7 @@ from backend.models.oauth2 import (
     OAuth2RefreshToken,
 )
 from backend.models.organization import Organization
+from backend.models.published_content import PublishedContent
 from backend.models.rbac import Permission, Role
 from backend.models.relationship import ContentRelationship
 from backend.models.schedule import ContentSchedule
@@ -45,10 +46,12 @@ __all__ = [
     "ContentType",
     "ContentEntry",
     "ContentRelationship",
+    "PublishedContent",
     "Locale",
     "Translation",
     "TranslationGlossary",
     "Media",
+    "MediaBlob",
     "APIKey",
     "ApiScope",
     "AuditLog",
@@ -34,6 +34,10 @@ class APIKey(Base, IDMixin, TimestampMixin):
     # Key prefix (for identification in logs) - stored in plain text
     key_prefix = Column(String(20), nullable=False)
 
+    # HMAC-SHA256 of the key (see api_key_lookup_hash) - indexed lookup on authentication.
+    # NULL for keys created before it existed; filled in on their first successful use.
+    key_lookup = Column(String(64), unique=True, nullable=True, index=True)
+
     # Permissions (stored as JSON array of permission names)
     permissions = Column(Text, nullable=True)  # JSON array
 
@@ -2,7 +2,7 @@
 Audit Log model for tracking all changes
 """
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from backend.db.base import Base
@@ -48,5 +48,10 @@ class AuditLog(Base, IDMixin, TimestampMixin):
     # Relationships
     user = relationship("User", back_populates="audit_logs")
 
+    __table_args__ = (
+        # Keyset pagination of the audit log viewer: newest first by (created_at, id)
+        Index("ix_audit_logs_org_created_id", "organization_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<AuditLog(id={self.id}, action='{self.action}', resource='{self.resource_type}')>"
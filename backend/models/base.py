@@ -2,9 +2,11 @@
 Base model with common fields
 """
 
+import json
 import uuid
 
-from sqlalchemy import Column, DateTime, String, TypeDecorator
+from sqlalchemy import Column, DateTime, String, Text, TypeDecorator, cast
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 
@@ -45,6 +47,39 @@ class GUID(TypeDecorator):
                 return uuid.UUID(value)
 
 
+class JSONText(TypeDecorator):
+    """Platform-independent JSON document column exposed to Python as JSON text.
+
+    Uses PostgreSQL's JSONB type (so containment/path operators and GIN indexes
+    apply), otherwise uses Text. Application code keeps reading and writing JSON
+    strings; on PostgreSQL values are selected with a ``::text`` cast so the
+    driver never has to decode the document.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        else:
+            return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        elif dialect.name == "postgresql":
+            # JSONB serializes Python objects itself
+            return json.loads(value) if isinstance(value, str) else value
+        else:
+            if not isinstance(value, str):
+                return json.dumps(value)
+            return value
+
+    def column_expression(self, colexpr):
+        return cast(colexpr, Text)
+
+
 class TimestampMixin:
     """Mixin for created_at and updated_at timestamps"""
 
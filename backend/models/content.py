@@ -2,11 +2,11 @@
 Content Type model for dynamic content schemas
 """
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from backend.db.base import Base
-from backend.models.base import GUID, IDMixin, TimestampMixin
+from backend.models.base import GUID, IDMixin, JSONText, TimestampMixin
 
 
 class ContentType(Base, IDMixin, TimestampMixin):
@@ -70,8 +70,8 @@ class ContentEntry(Base, IDMixin, TimestampMixin):
     title = Column(String(500), nullable=False)
     slug = Column(String(255), nullable=False, index=True)
 
-    # Content data (stored as JSON matching the content type schema)
-    data = Column(Text, nullable=False)  # JSON string
+    # Content data (JSON matching the content type schema; JSONB on PostgreSQL)
+    data = Column(JSONText, nullable=False)  # JSON string
 
     # Publishing
     status = Column(
@@ -86,7 +86,9 @@ class ContentEntry(Base, IDMixin, TimestampMixin):
     version = Column(Integer, default=1, nullable=False)
 
     # SEO
-    seo_data = Column(Text, nullable=True)  # JSON string with meta_title, meta_description, etc.
+    seo_data = Column(
+        JSONText, nullable=True
+    )  # JSON string with meta_title, meta_description, etc.
 
     # Relationships
     content_type = relationship("ContentType", back_populates="entries")
@@ -114,5 +116,25 @@ class ContentEntry(Base, IDMixin, TimestampMixin):
         backref="target_entry",
     )
 
+    __table_args__ = (
+        # Keyset pagination for admin/GraphQL listings: ORDER BY created_at, id
+        Index("ix_content_entries_type_created_id", "content_type_id", "created_at", "id"),
+        # Keyset pagination for the Delivery API: published entries by (published_at, id)
+        Index(
+            "ix_content_entries_type_status_published_id",
+            "content_type_id",
+            "status",
+            "published_at",
+            "id",
+        ),
+        # Field filters (filter[data.<path>]) compile to JSONB containment (@>)
+        Index(
+            "ix_content_entries_data_gin",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     def __repr__(self):
         return f"<ContentEntry(id={self.id}, title='{self.title}', status='{self.status}')>"
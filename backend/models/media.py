@@ -31,6 +31,12 @@ class Media(Base, IDMixin, TimestampMixin):
     file_path = Column(String(1000), nullable=False)  # Storage path
     url = Column(String(1000), nullable=False)  # Public URL
 
+    # SHA-256 of the content, naming the shared blob at file_path (NULL for files uploaded
+    # before deduplication, which own their file_path)
+    content_hash = Column(
+        String(64), ForeignKey("media_blobs.content_hash"), nullable=True, index=True
+    )
+
     # File Type
     mime_type = Column(String(100), nullable=False, index=True)
     file_size = Column(BigInteger, nullable=False)  # Size in bytes
@@ -52,6 +58,9 @@ class Media(Base, IDMixin, TimestampMixin):
     # Tags (stored as JSON array)
     tags = Column(String, nullable=True)  # JSON array of strings
 
+    # Generated thumbnail (storage path)
+    thumbnail_path = Column(String(1000), nullable=True, index=True)
+
     # CDN
     cdn_url = Column(String(1000), nullable=True)
 
@@ -63,3 +72,23 @@ class Media(Base, IDMixin, TimestampMixin):
 
     def __repr__(self):
         return f"<Media(id={self.id}, filename='{self.filename}', type='{self.media_type}')>"
+
+
+class MediaBlob(Base, TimestampMixin):
+    """
+    A stored file, shared by every media item with the same content
+
+    Blobs are stored once under their SHA-256, across organizations. reference_count is
+    the number of media rows pointing at the blob; the file is deleted from storage when
+    it drops to zero.
+    """
+
+    __tablename__ = "media_blobs"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 hex digest
+    file_path = Column(String(1000), nullable=False)  # Storage path
+    file_size = Column(BigInteger, nullable=False)
+    reference_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MediaBlob(hash='{self.content_hash}', references={self.reference_count})>"
@@ -0,0 +1,56 @@
+"""
+Published content read model for the Content Delivery API
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+from backend.models.base import GUID
+
+
+class PublishedContent(Base):
+    """
+    One row per published content entry holding its pre-rendered delivery JSON.
+
+    Maintained by backend.core.published_content whenever an entry is created, updated,
+    published, unpublished or deleted, so the Delivery API can return stored bytes
+    instead of parsing and re-serializing entry data on every read.
+    """
+
+    __tablename__ = "published_content"
+
+    entry_id = Column(
+        GUID, ForeignKey("content_entries.id", ondelete="CASCADE"), primary_key=True
+    )
+    organization_id = Column(
+        GUID, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    content_type_id = Column(
+        GUID, ForeignKey("content_types.id", ondelete="CASCADE"), nullable=False
+    )
+    content_type_api_id = Column(String(100), nullable=False)
+    slug = Column(String(255), nullable=False)
+    published_at = Column(String, nullable=True)  # Mirrors ContentEntry.published_at
+
+    # Rendered DeliveryContentDetailResponse / DeliveryContentResponse JSON
+    document = Column(Text, nullable=False)
+    list_item = Column(Text, nullable=False)
+
+    rendered_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_published_content_type_slug", "content_type_id", "slug"),
+        # Keyset pagination of delivery listings: ORDER BY published_at, entry_id
+        Index(
+            "ix_published_content_type_published_entry",
+            "content_type_id",
+            "published_at",
+            "entry_id",
+        ),
+    )
+
+    def __repr__(self):
+        return f"<PublishedContent(entry_id={self.entry_id}, slug='{self.slug}')>"
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark cached value size and CPU: JSON text vs the binary cache codec.
+
+Encodes a product list response the way the response cache stored it before (the body
+decoded to text inside a JSON document with the headers) and the way it is stored now
+(raw body behind length-prefixed metadata, compressed by the codec), plus a cached()
+result, and reports stored bytes and encode/decode time per value. No Redis is needed.
+
+    python scripts/benchmark_cache_codec.py --products 50 --iterations 500
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from backend.core.cache_codec import codec
+from backend.core.cache_middleware import pack_response, unpack_response
+
+
+def make_product_list(products: int) -> dict:
+    """A delivery list page roughly shaped like the seeded catalogue"""
+    return {
+        "items": [
+            {
+                "id": f"00000000-0000-0000-0000-{i:012d}",
+                "slug": f"benchmark-product-{i}",
+                "fields": {
+                    "name": f"Benchmark Product {i}",
+                    "description": "Lorem ipsum dolor sit amet, consectetur adipiscing. " * 6,
+                    "price": 100 + i * 0.25,
+                    "tags": [f"tag-{j}" for j in range(8)],
+                    "images": [f"https://cdn.example.com/products/{i}/{j}.jpg" for j in range(4)],
+                },
+                "published_at": "2025-01-01T00:00:00Z",
+            }
+            for i in range(products)
+        ],
+        "total": products,
+    }
+
+
+HEADERS = {"content-type": "application/json", "cache-control": "public, max-age=60"}
+
+
+def response_before(body: bytes) -> bytes:
+    data = {
+        "content": body.decode("utf-8"),
+        "status_code": 200,
+        "headers": HEADERS,
+        "media_type": "application/json",
+        "etag": '"0123456789abcdef"',
+    }
+    return json.dumps(data).encode("utf-8")
+
+
+def response_after(body: bytes) -> bytes:
+    meta = {
+        "status_code": 200,
+        "headers": HEADERS,
+        "media_type": "application/json",
+        "etag": '"0123456789abcdef"',
+    }
+    return codec.encode(pack_response(meta, body))
+
+
+def measure(encode, decode, iterations: int):
+    stored = encode()
+    encode_times, decode_times = [], []
+    for _ in range(iterations):
+        start = time.process_time()
+        encode()
+        encode_times.append(time.process_time() - start)
+        start = time.process_time()
+        decode(stored)
+        decode_times.append(time.process_time() - start)
+    return len(stored), statistics.mean(encode_times), statistics.mean(decode_times)
+
+
+def report(name: str, size: int, encode_time: float, decode_time: float):
+    print(
+        f"{name:<24} {size:>9,} bytes   encode {encode_time * 1_000_000:8.1f} us   "
+        f"decode (hit) {decode_time * 1_000_000:8.1f} us"
+    )
+
+
+def main(products: int, iterations: int):
+    page = make_product_list(products)
+    body = json.dumps(page).encode("utf-8")
+    print(f"Product list: {products} products, {len(body):,} byte body\n")
+
+    report(
+        "response, before",
+        *measure(
+            lambda: response_before(body),
+            lambda stored: json.loads(stored)["content"].encode("utf-8"),
+            iterations,
+        ),
+    )
+    report(
+        "response, codec",
+        *measure(
+            lambda: response_after(body),
+            lambda stored: unpack_response(codec.decode(stored)),
+            iterations,
+        ),
+    )
+    report(
+        "cached(), before",
+        *measure(lambda: json.dumps(page).encode("utf-8"), json.loads, iterations),
+    )
+    report("cached(), codec", *measure(lambda: codec.encode(page), codec.decode, iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cache value codec")
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    main(args.products, args.iterations)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark content entry list serialization: Pydantic/json.dumps vs ORJSONResponse.
+
+Renders the same page of large product entries through both paths and reports wall-clock
+latency and process CPU time per response. No database or server is needed.
+
+    python scripts/benchmark_content_serialization.py --entries 20 --variants 50
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.api.content import build_entry_payload, build_entry_response
+from backend.api.schemas.content import ContentEntryListResponse
+from backend.core.responses import ORJSONResponse
+from backend.models.content import ContentEntry, ContentType
+
+
+def make_product_data(variants: int) -> dict:
+    """A product document roughly shaped like the seeded catalogue, scaled by variants"""
+    return {
+        "name": "Benchmark Product",
+        "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20,
+        "price": 129.99,
+        "category_id": str(uuid.uuid4()),
+        "brand_id": str(uuid.uuid4()),
+        "tags": [f"tag-{i}" for i in range(20)],
+        "specs": {f"spec_{i}": {"label": f"Spec {i}", "value": i * 1.5} for i in range(30)},
+        "variants": [
+            {
+                "sku": f"SKU-{i:05d}",
+                "color": ["red", "green", "blue"][i % 3],
+                "size": ["S", "M", "L", "XL"][i % 4],
+                "price": 100 + i,
+                "stock": i * 3,
+                "images": [f"https://cdn.example.com/products/{i}/{j}.jpg" for j in range(4)],
+            }
+            for i in range(variants)
+        ],
+    }
+
+
+def make_page(entries: int, variants: int):
+    now = datetime.now(timezone.utc)
+    content_type = ContentType(id=uuid.uuid4(), name="Product", api_id="product")
+    data = json.dumps(make_product_data(variants))
+    seo_data = json.dumps({"seo_title": "Benchmark", "seo_description": "Benchmark product"})
+    page = [
+        ContentEntry(
+            id=uuid.uuid4(),
+            content_type_id=content_type.id,
+            author_id=uuid.uuid4(),
+            data=data,
+            seo_data=seo_data,
+            slug=f"benchmark-product-{i}",
+            status="published",
+            version=1,
+            published_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(entries)
+    ]
+    return content_type, page
+
+
+def render_before(content_type, page) -> bytes:
+    """The previous path: json.loads → Pydantic → jsonable_encoder → json.dumps"""
+    body = ContentEntryListResponse(
+        items=[build_entry_response(entry, content_type) for entry in page],
+        total=len(page),
+        page=1,
+        page_size=len(page),
+        pages=1,
+    )
+    return JSONResponse(jsonable_encoder(body)).body
+
+
+def render_after(content_type, page) -> bytes:
+    """ORJSONResponse with the stored data embedded as raw JSON"""
+    body = {
+        "items": [build_entry_payload(entry, content_type) for entry in page],
+        "total": len(page),
+        "page": 1,
+        "page_size": len(page),
+        "pages": 1,
+        "next_cursor": None,
+    }
+    return ORJSONResponse(body).body
+
+
+def measure(render, iterations: int, *args):
+    wall, cpu = [], []
+    for _ in range(iterations):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        render(*args)
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+    return wall, cpu
+
+
+def report(name: str, wall, cpu):
+    wall_ms = sorted(w * 1000 for w in wall)
+    p95 = wall_ms[int(len(wall_ms) * 0.95) - 1]
+    print(
+        f"{name:<8} p50 {statistics.median(wall_ms):8.3f} ms   p95 {p95:8.3f} ms   "
+        f"cpu/request {statistics.mean(cpu) * 1000:8.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark content list serialization")
+    parser.add_argument("--entries", type=int, default=20, help="Entries per page")
+    parser.add_argument("--variants", type=int, default=50, help="Variants per product")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    content_type, page = make_page(args.entries, args.variants)
+
+    before_body, after_body = render_before(content_type, page), render_after(content_type, page)
+    assert json.loads(before_body) == json.loads(after_body), (
+        "Both paths must render the same document"
+    )
+    print(f"Page of {args.entries} entries, {len(after_body) / 1024:.1f} KiB per response\n")
+
+    # Warm up both paths before timing
+    measure(render_before, 10, content_type, page)
+    measure(render_after, 10, content_type, page)
+
+    before = measure(render_before, args.iterations, content_type, page)
+    after = measure(render_after, args.iterations, content_type, page)
+    report("before", *before)
+    report("after", *after)
+    print(f"\nspeedup (cpu): {statistics.mean(before[1]) / statistics.mean(after[1]):.1f}x")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Benchmark per-request overhead of the application's middleware stack.
+
+Mounts an empty endpoint behind exactly the middlewares create_app() installs (same order
+and options) and compares it with the bare endpoint. Requests go through httpx's ASGI
+transport, so no server or network is involved; Redis and the database are not needed.
+
+    python scripts/benchmark_middleware_stack.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.responses import Response
+
+from backend.main import app as cms_app
+
+
+def build_app(with_middleware: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/empty")
+    async def empty():
+        return Response(b"", media_type="text/plain")
+
+    if with_middleware:
+        # user_middleware is ordered outermost first; add_middleware prepends
+        for middleware in reversed(cms_app.user_middleware):
+            app.add_middleware(middleware.cls, *middleware.args, **middleware.kwargs)
+    return app
+
+
+async def measure(app: FastAPI, requests: int):
+    wall, cpu = [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for _ in range(50):
+            # Warm up
+            await client.get("/api/v1/empty")
+        for _ in range(requests):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            response = await client.get("/api/v1/empty")
+            cpu.append(time.process_time() - cpu_start)
+            wall.append(time.perf_counter() - wall_start)
+            assert response.status_code == 200
+    return wall, cpu
+
+
+def report(name: str, wall, cpu):
+    wall_us = sorted(w * 1_000_000 for w in wall)
+    p99 = wall_us[int(len(wall_us) * 0.99) - 1]
+    print(
+        f"{name:<12} p50 {statistics.median(wall_us):8.1f} us   p99 {p99:8.1f} us   "
+        f"cpu/request {statistics.mean(cpu) * 1_000_000:8.1f} us"
+    )
+
+
+async def main(requests: int):
+    names = ", ".join(middleware.cls.__name__ for middleware in cms_app.user_middleware)
+    print(f"Middleware stack: {names}\n")
+
+    bare = await measure(build_app(False), requests)
+    stacked = await measure(build_app(True), requests)
+    report("bare", *bare)
+    report("full stack", *stacked)
+    overhead = statistics.median(stacked[0]) - statistics.median(bare[0])
+    print(f"\nmiddleware overhead (p50): {overhead * 1_000_000:.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark middleware stack overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""Rebuild the published_content read model from content_entries.
+
+Run once after the published_content migration, or any time the read model needs repair.
+"""
+
+from backend.core.published_content import rebuild_published_content
+from backend.db.session import SessionLocal
+
+if __name__ == "__main__":
+    import argparse
+    from uuid import UUID
+
+    parser = argparse.ArgumentParser(description="Rebuild the published_content read model")
+    parser.add_argument("--organization-id", type=UUID, help="Only rebuild one organization")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = rebuild_published_content(db, organization_id=args.organization_id)
+        print(f"✅ Rendered {count} published entries")
+    finally:
+        db.close()
@@ -2,15 +2,19 @@
 Test configuration and fixtures for pytest
 """
 
+import atexit
 import os
+import shutil
+import tempfile
 import warnings
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SAWarning
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 # Suppress SQLAlchemy warning about circular foreign key dependencies
 # This is expected with SQLite testing database
@@ -30,13 +34,18 @@ os.environ["SKIP_EMAIL_VERIFICATION"] = "true"  # Skip email verification for te
 
 from backend.core.dependencies import get_db
 from backend.db.base import Base
+from backend.db.session import get_async_db
 from backend.main import app
 
 # Import all models so they are registered with Base.metadata
 
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Create a temporary SQLite database file for testing. A file (rather than :memory:) lets
+# the sync engine and the aiosqlite engine behind get_async_db share the same data.
+TEST_DB_DIR = tempfile.mkdtemp(prefix="bakalr-cms-tests-")
+atexit.register(shutil.rmtree, TEST_DB_DIR, ignore_errors=True)
+TEST_DB_PATH = os.path.join(TEST_DB_DIR, "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -45,6 +54,13 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: TestClient runs each test's app on its own event loop, so async connections
+# must not outlive a request
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -78,7 +94,12 @@ def client(db_session):
         finally:
             db_session.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     with TestClient(app) as test_client:
         yield test_client
@@ -90,3 +90,55 @@ class TestAPIKeys:
                     status.HTTP_200_OK,
                     status.HTTP_404_NOT_FOUND,
                 ]
+
+    def test_api_key_lookup_cache_and_usage(self, authenticated_client, db_session):
+        """Test indexed key lookup, legacy key backfill, revocation and batched usage"""
+        from sqlalchemy.orm import sessionmaker
+
+        from backend.core.api_key_auth import (
+            flush_api_key_usage,
+            flush_pending_api_key_usage,
+            invalidate_api_key_cache,
+        )
+        from backend.core.security import api_key_lookup_hash
+        from backend.models.api_key import APIKey
+
+        created = authenticated_client.post(
+            "/api/v1/api-keys", json={"name": "Lookup Key", "scopes": ["content.read"]}
+        ).json()
+        key, key_id = created["key"], created["id"]
+
+        api_key = db_session.query(APIKey).filter(APIKey.name == "Lookup Key").one()
+        assert api_key.key_lookup == api_key_lookup_hash(key)
+
+        def validate(x_api_key):
+            return authenticated_client.post(
+                "/api/v1/auth/validate-api-key", headers={"X-API-Key": x_api_key}
+            ).json()
+
+        assert validate(key)["valid"] is True
+        assert validate(key + "x")["valid"] is False
+
+        # Keys created before key_lookup existed are found by prefix and backfilled
+        api_key.key_lookup = None
+        db_session.commit()
+        invalidate_api_key_cache()
+        assert validate(key)["valid"] is True
+        api_key = db_session.query(APIKey).filter(APIKey.name == "Lookup Key").one()
+        assert api_key.key_lookup == api_key_lookup_hash(key)
+
+        # Uses are written in one batch
+        flush_api_key_usage(db_session, force=True)
+        db_session.refresh(api_key)
+        assert api_key.usage_count == 2
+        assert api_key.last_used_at is not None
+
+        # Usage still buffered when the app shuts down is written by a forced flush
+        assert validate(key)["valid"] is True
+        flush_pending_api_key_usage(sessionmaker(bind=db_session.get_bind()))
+        api_key = db_session.query(APIKey).filter(APIKey.name == "Lookup Key").one()
+        assert api_key.usage_count == 3
+
+        # Revocation is not hidden by the verified-key cache
+        authenticated_client.patch(f"/api/v1/api-keys/{key_id}", json={"is_active": False})
+        assert validate(key)["valid"] is False
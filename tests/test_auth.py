@@ -123,6 +123,75 @@ def test_logout(authenticated_client):
     assert response.json()["message"] == "Logged out successfully"
 
 
+def test_principal_cache_skips_user_query_until_user_changes(authenticated_client, db_session):
+    """Test repeated requests reuse the cached principal and deactivation drops it"""
+    from sqlalchemy import event
+
+    from backend.core import principals
+
+    user_queries = []
+
+    def record_user_query(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            user_queries.append(statement)
+
+    engine = db_session.get_bind()
+    authenticated_client.get("/api/v1/auth/me")
+    event.listen(engine, "before_cursor_execute", record_user_query)
+    try:
+        for _ in range(3):
+            response = authenticated_client.get("/api/v1/auth/me")
+            assert response.status_code == 200
+            assert response.json()["email"] == "test@example.com"
+        assert user_queries == []
+    finally:
+        event.remove(engine, "before_cursor_execute", record_user_query)
+
+    token = authenticated_client.headers["Authorization"].split(" ")[1]
+    assert principals._get_principal(token) is not None
+
+    user = db_session.query(User).filter(User.email == "test@example.com").first()
+    user.is_active = False
+    db_session.commit()
+
+    assert principals._get_principal(token) is None
+    response = authenticated_client.get("/api/v1/auth/me")
+    assert response.status_code == 403
+
+
+def test_principal_changes_reach_other_workers(authenticated_client, db_session, monkeypatch):
+    """Test deactivation is broadcast and drops the snapshots other workers hold"""
+    import json
+    import time
+
+    from backend.core import principals
+    from backend.core.cache import cache
+
+    published = []
+    monkeypatch.setattr(cache, "publish_invalidation_sync", lambda **extra: published.append(extra))
+
+    authenticated_client.get("/api/v1/auth/me")
+    token = authenticated_client.headers["Authorization"].split(" ")[1]
+    principal = principals._get_principal(token)
+    # Invalidations can't be received without Redis: snapshots are short-lived
+    assert principal.cached_until <= time.time() + principals.PRINCIPAL_UNSYNCED_CACHE_TTL
+
+    user = db_session.query(User).filter(User.email == "test@example.com").first()
+    user.is_active = False
+    db_session.commit()
+    assert published[-1]["principals"][0] == [str(user.id)]
+
+    # The same message, as another worker receives it
+    principals._cache_principal(token, principals.verify_token(token, "access"), user)
+    message = json.dumps({"origin": "other-worker", "keys": [], **published[-1]})
+    cache._apply_invalidation(message)
+    assert principals._get_principal(token) is None
+
+    principals._cache_principal(token, principals.verify_token(token, "access"), user)
+    cache._apply_invalidation(json.dumps({"origin": "other-worker", "principals": None}))
+    assert principals._get_principal(token) is None
+
+
 # ==================== Account Deletion Tests ====================
 
 
@@ -0,0 +1,258 @@
+"""
+Tests for the caching layer: L1 cache, stampede protection, value codec and cache warming
+"""
+
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+
+from backend.core.cache import (
+    _MISSING,
+    LocalCache,
+    _envelope,
+    _expires_early,
+    _parse_json,
+    _unwrap,
+    cache,
+    single_flight,
+)
+from backend.core.cache_codec import CacheCodec
+from backend.core.cache_middleware import pack_response, unpack_response
+from backend.core.cache_warming import AccessTracker, CacheWarmingService
+
+
+def test_local_cache_is_bounded_by_items_and_bytes():
+    """Least recently used entries are evicted first once either bound is exceeded"""
+    l1 = LocalCache(max_items=2, max_bytes=100, ttl=60)
+    l1.set("a", {"v": 1}, size=10)
+    l1.set("b", {"v": 2}, size=10)
+    assert l1.get("a") == {"v": 1}
+
+    l1.set("c", {"v": 3}, size=10)
+    assert l1.get("b") is _MISSING
+    assert l1.get("a") == {"v": 1}
+
+    l1.set("d", "large", size=95)
+    assert l1.get("c") is _MISSING
+    assert l1.get("a") is _MISSING
+    assert l1.get("d") == "large"
+    assert not l1.set("huge", "x", size=101)
+
+    stats = l1.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 95
+    assert stats["evictions"] == 3
+    assert (stats["hits"], stats["misses"]) == (3, 3)
+
+
+def test_local_cache_expires_and_invalidates():
+    """Entries expire after the TTL; invalidation drops keys and patterns and stale fills"""
+    l1 = LocalCache(max_items=10, max_bytes=1000, ttl=0)
+    l1.set("a", 1, size=1)
+    assert l1.get("a") is _MISSING
+
+    l1.ttl = 60
+    l1.set("reference_data:org-1:status:en:False", [1], size=3)
+    l1.set("reference_data:org-2:status:en:False", [2], size=3)
+    l1.set("other", 3, size=1)
+
+    generation = l1.generation
+    l1.invalidate(keys=["other"], patterns=["reference_data:org-1:*"])
+    assert l1.get("other") is _MISSING
+    assert l1.get("reference_data:org-1:status:en:False") is _MISSING
+    assert l1.get("reference_data:org-2:status:en:False") == [2]
+
+    # A value read from Redis before the invalidation must not be cached
+    assert not l1.set("other", 3, size=1, generation=generation)
+    assert l1.get("other") is _MISSING
+
+
+def test_invalidation_messages_skip_their_origin():
+    """Workers evict keys published by others, not the copies their own writes just made"""
+    cache.l1.set("shared", "value", size=5)
+    own = json.dumps({"origin": cache._l1_origin, "keys": ["shared"], "patterns": []})
+    cache._apply_invalidation(own)
+    assert cache.l1.get("shared") == "value"
+
+    cache._apply_invalidation(json.dumps({"origin": "other-worker", "keys": ["shared"]}))
+    assert cache.l1.get("shared") is _MISSING
+
+
+def test_single_flight_computes_once_for_concurrent_misses():
+    """Concurrent misses of a key share one computation, and its errors"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        results = await asyncio.gather(*(single_flight("key", compute) for _ in range(5)))
+        failures = await asyncio.gather(
+            *(single_flight("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        return results, failures
+
+    results, failures = asyncio.run(main())
+    assert results == [1, 1, 1, 1, 1]
+    assert len(calls) == 2
+    assert all(isinstance(failure, ValueError) for failure in failures)
+
+
+def test_single_flight_survives_a_cancelled_leader():
+    """Waiters recompute when the computing caller is cancelled instead of being cancelled"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.ensure_future(single_flight("key", compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(single_flight("key", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        return leader.cancelled(), results
+
+    cancelled, results = asyncio.run(main())
+    assert cancelled
+    assert results == [2, 2]
+    assert len(calls) == 2
+
+
+def test_cached_values_expire_early_at_random():
+    """Values refresh early only as their soft expiry nears (never if disabled), then always"""
+    value, fresh_until, compute_time = _unwrap(_envelope({"a": 1}, ttl=60, compute_time=0.5))
+    assert value == {"a": 1}
+    assert fresh_until == pytest.approx(time.time() + 60, abs=1)
+    assert _unwrap([1, 2]) == ([1, 2], None, 0.0)
+
+    assert not _expires_early(time.time() + 3600, compute_time=0.01, beta=1.0)
+    assert _expires_early(time.time() - 1, compute_time=0.01, beta=1.0)
+    assert _expires_early(time.time() - 1, compute_time=0.01, beta=0)
+    assert not _expires_early(time.time() + 1, compute_time=5, beta=0)
+    # A slow computation due in a second is almost always refreshed early
+    refreshes = sum(_expires_early(time.time() + 1, compute_time=5, beta=1.0) for _ in range(100))
+    assert refreshes > 50
+
+
+def test_codec_round_trips_and_compresses_large_values():
+    """Values keep their type, large payloads shrink, pre-codec text still decodes"""
+    codec = CacheCodec(compression_threshold=100, compression="zlib")
+    page = {"items": [{"name": f"Product {i}", "price": 9.99} for i in range(50)], "total": 50}
+
+    encoded = codec.encode(page)
+    assert codec.decode(encoded) == page
+    assert len(encoded) < len(json.dumps(page)) / 4
+    assert codec.decode(codec.encode("<urlset/>")) == "<urlset/>"
+    assert codec.decode(codec.encode(b"\x00\xffbody")) == b"\x00\xffbody"
+    assert codec.decode(codec.encode(42)) == "42"
+
+    # Written as JSON text before values were encoded
+    assert codec.decode(b'{"legacy": true}') == '{"legacy": true}'
+    assert _parse_json(codec.decode(b'{"legacy": true}')) == {"legacy": True}
+
+
+def test_cached_responses_keep_raw_bodies():
+    """The response cache stores the body bytes as-is next to its metadata"""
+    body = b'{"items": []}' * 200
+    meta = {"status_code": 200, "headers": {"content-type": "application/json"}, "etag": '"x"'}
+
+    stored = CacheCodec(compression_threshold=1024, compression="zlib").encode(
+        pack_response(meta, body)
+    )
+    assert len(stored) < len(body)
+    assert unpack_response(CacheCodec().decode(stored)) == (meta, body)
+
+
+class StaticAccessTracker(AccessTracker):
+    """Access counts served from memory instead of Redis"""
+
+    def __init__(self, top_lookups):
+        super().__init__()
+        self.top_lookups = top_lookups
+
+    async def flush(self):
+        return 0
+
+    async def organizations(self):
+        return sorted(self.top_lookups)
+
+    async def top(self, organization_id, limit):
+        return self.top_lookups[organization_id][:limit]
+
+
+def test_access_tracker_counts_lookups_by_kind_and_params():
+    """Accesses with the same kind and params are one lookup, whatever the argument order"""
+    tracker = AccessTracker()
+    tracker.record("org-1", "reference_data", data_type="status", locale="en")
+    tracker.record("org-1", "reference_data", locale="en", data_type="status")
+    tracker.record("org-2", "published_count", content_type_id=uuid.UUID(int=1))
+
+    assert sorted(tracker._counts.values()) == [1, 2]
+    member = next(member for (org, member) in tracker._counts if org == "org-2")
+    assert json.loads(member) == ["published_count", {"content_type_id": str(uuid.UUID(int=1))}]
+
+
+def test_cache_warming_runs_top_lookups_within_budget():
+    """Top lookups are warmed round-robin across organizations, with bounded concurrency"""
+    warmed, running = [], []
+
+    async def warm_lookup(organization_id, key):
+        running.append(key)
+        assert len(running) <= 2
+        await asyncio.sleep(0.01)
+        running.remove(key)
+        if key == "broken":
+            raise ValueError("boom")
+        warmed.append((organization_id, key))
+
+    lookups = {
+        "org-a": [("lookup", {"key": "a1"}), ("lookup", {"key": "a2"}), ("lookup", {"key": "a3"})],
+        "org-b": [("lookup", {"key": "broken"}), ("unregistered", {})],
+    }
+    service = CacheWarmingService(StaticAccessTracker(lookups))
+    service.register("lookup", warm_lookup)
+
+    results = asyncio.run(service.warm(top_n=2, concurrency=2, time_budget=5))
+    assert results == {"warmed": 2, "failed": 1, "skipped": 0}
+    assert warmed == [("org-a", "a1"), ("org-a", "a2")]
+
+    results = asyncio.run(service.warm(top_n=3, concurrency=1, time_budget=0.015))
+    assert results["skipped"] >= 1
+
+
+def test_reference_data_warmer_queries_off_the_event_loop(monkeypatch):
+    """The reference data warmer runs its queries, and its session, in the threadpool"""
+    import threading
+
+    from backend.api import reference_data
+
+    threads = []
+
+    def query_reference_data(db, organization_id, data_type, locale, include_inactive):
+        threads.append(threading.current_thread())
+        return reference_data.ReferenceDataResponse(
+            type=data_type, locale=locale, items=[], total=0
+        )
+
+    monkeypatch.setattr(reference_data, "query_reference_data", query_reference_data)
+    asyncio.run(
+        reference_data.warm_reference_data(
+            str(uuid.UUID(int=7)), data_type="status", locale="en", include_inactive=False
+        )
+    )
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
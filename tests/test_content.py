@@ -169,3 +169,209 @@ def test_delete_content_entry(authenticated_client, test_content_data):
     response = authenticated_client.delete(f"/api/v1/content/entries/{content_id}")
 
     assert response.status_code == 204
+
+
+def test_list_content_entries_query_count_is_constant(authenticated_client, test_content_data):
+    """Listing a page of entries should not issue one query per entry"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    # Listen on every engine: the listing runs on the async session, not db_session
+    engine = Engine
+
+    def create_entries(count, offset=0):
+        for i in range(offset, offset + count):
+            response = authenticated_client.post(
+                "/api/v1/content/entries", json={**test_content_data, "slug": f"post-{i}"}
+            )
+            assert response.status_code == 201
+
+    def count_list_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = authenticated_client.get("/api/v1/content/entries?page_size=50")
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+        assert response.status_code == 200
+        return len(response.json()["items"]), len(statements)
+
+    create_entries(2)
+    small_page_size, small_page_queries = count_list_queries()
+
+    create_entries(10, offset=2)
+    large_page_size, large_page_queries = count_list_queries()
+
+    assert (small_page_size, large_page_size) == (2, 12)
+    assert 0 < large_page_queries == small_page_queries
+
+
+def test_list_content_entries_cursor_pagination(authenticated_client, test_content_data):
+    """Following next_cursor should walk every entry exactly once"""
+    for i in range(5):
+        response = authenticated_client.post(
+            "/api/v1/content/entries", json={**test_content_data, "slug": f"post-{i}"}
+        )
+        assert response.status_code == 201
+
+    response = authenticated_client.get("/api/v1/content/entries?page_size=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+
+    seen = [item["id"] for item in data["items"]]
+    while data["next_cursor"]:
+        response = authenticated_client.get(
+            "/api/v1/content/entries",
+            params={"page_size": 2, "cursor": data["next_cursor"], "include_total": "false"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        seen.extend(item["id"] for item in data["items"])
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_list_content_entries_invalid_cursor(authenticated_client):
+    """A malformed cursor is rejected with 400"""
+    response = authenticated_client.get("/api/v1/content/entries?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_list_content_entries_data_filters(authenticated_client, test_content_data):
+    """filter[data.<path>] parameters filter entries on their JSON data"""
+    for i, (author, rating) in enumerate([("Ada", 5), ("Grace", 3), ("Linus", 1)]):
+        entry_data = {
+            **test_content_data,
+            "slug": f"filtered-{i}",
+            "data": {**test_content_data["data"], "author": author, "rating": rating},
+        }
+        response = authenticated_client.post("/api/v1/content/entries", json=entry_data)
+        assert response.status_code in [200, 201]
+
+    response = authenticated_client.get("/api/v1/content/entries?filter[data.author]=Ada")
+    assert response.status_code == 200
+    assert [item["slug"] for item in response.json()["items"]] == ["filtered-0"]
+
+    response = authenticated_client.get(
+        "/api/v1/content/entries?filter[data.author][in]=Ada,Linus"
+    )
+    assert {item["slug"] for item in response.json()["items"]} == {"filtered-0", "filtered-2"}
+
+    response = authenticated_client.get("/api/v1/content/entries?filter[data.rating][gt]=2")
+    assert {item["slug"] for item in response.json()["items"]} == {"filtered-0", "filtered-1"}
+
+    response = authenticated_client.get("/api/v1/content/entries?filter[data.rating][like]=2")
+    assert response.status_code == 400
+
+
+def test_delivery_list_total_counts_published_entries(authenticated_client, test_content_data):
+    """Delivery list totals count only published entries of the type"""
+    for i, entry_status in enumerate(["published", "published", "published", "draft"]):
+        response = authenticated_client.post(
+            "/api/v1/content/entries",
+            json={**test_content_data, "slug": f"delivery-{i}", "status": entry_status},
+        )
+        assert response.status_code == 201
+
+    response = authenticated_client.get(
+        "/api/v1/delivery/content?content_type=blog_post&page_size=2&approximate_total=true"
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert len(body["items"]) == 2
+    # SQLite has no planner estimates, so the total is always exact
+    assert "X-Total-Count-Approximate" not in response.headers
+
+
+def test_delivery_serves_published_read_model(authenticated_client, test_content_data):
+    """Delivery responses follow publish, update, unpublish and delete"""
+    response = authenticated_client.post(
+        "/api/v1/content/entries", json={**test_content_data, "status": "draft"}
+    )
+    entry_id = response.json()["id"]
+    delivery_url = f"/api/v1/delivery/content/{entry_id}"
+
+    # Drafts are not delivered
+    assert authenticated_client.get(delivery_url).status_code == 404
+
+    response = authenticated_client.post(f"/api/v1/content/entries/{entry_id}/publish", json={})
+    assert response.status_code == 200
+    response = authenticated_client.get(delivery_url)
+    assert response.status_code == 200
+    assert response.json()["fields"]["author"] == "Test Author"
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+
+    updated_data = {**test_content_data["data"], "author": "Updated Author"}
+    authenticated_client.put(f"/api/v1/content/entries/{entry_id}", json={"data": updated_data})
+    response = authenticated_client.get(
+        "/api/v1/delivery/content?content_type=blog_post&include_total=false"
+    )
+    assert [item["fields"]["author"] for item in response.json()["items"]] == ["Updated Author"]
+
+    authenticated_client.put(f"/api/v1/content/entries/{entry_id}", json={"status": "draft"})
+    assert authenticated_client.get(delivery_url).status_code == 404
+
+    authenticated_client.post(f"/api/v1/content/entries/{entry_id}/publish", json={})
+    authenticated_client.delete(f"/api/v1/content/entries/{entry_id}")
+    assert authenticated_client.get(delivery_url).status_code == 404
+
+
+def test_content_entry_fast_json_matches_schema(authenticated_client, test_content_data):
+    """Entries rendered by ORJSONResponse keep the ContentEntryResponse shape"""
+    created = authenticated_client.post("/api/v1/content/entries", json=test_content_data).json()
+
+    response = authenticated_client.get(f"/api/v1/content/entries/{created['id']}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    entry = response.json()
+    assert entry == created
+    assert entry["data"] == test_content_data["data"]
+
+    response = authenticated_client.get("/api/v1/content/entries?content_type_slug=blog_post")
+    assert response.json()["items"] == [created]
+
+
+def test_content_count_cache_tags():
+    """Count keys are registered under the organization, all-lists and per-type list tags"""
+    from backend.core.cache import _invalidate_tags_args, _tagged_set_args
+    from backend.core.content_counts import content_count_tags
+
+    tags = content_count_tags("org-1", "type-1")
+    assert tags == ["org:org-1", "list:org-1", "list:org-1:type-1"]
+
+    # One KEYS slot for the value plus one per distinct tag set
+    assert _tagged_set_args("count:key", "3", 60, tags + ["org:org-1"]) == (
+        4,
+        "count:key",
+        "cache:tag:org:org-1",
+        "cache:tag:list:org-1",
+        "cache:tag:list:org-1:type-1",
+        "3",
+        60,
+    )
+    assert _invalidate_tags_args(["list:org-1"]) == (1, "cache:tag:list:org-1", "", "")
+
+
+def test_dumps_json_splices_every_raw_fragment():
+    """Each RawJSON value is embedded verbatim at its own position, escapes included"""
+    import json
+
+    from backend.core.responses import RawJSON, dumps_json
+
+    fragments = [RawJSON(json.dumps({"i": i, "path": "C:\\\\media\\1"})) for i in range(50)]
+    body = dumps_json({"items": fragments, "empty": RawJSON(""), "text": "rawjson:not-a-token"})
+
+    assert json.loads(body) == {
+        "items": [json.loads(fragment) for fragment in fragments],
+        "empty": None,
+        "text": "rawjson:not-a-token",
+    }
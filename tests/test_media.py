@@ -174,3 +174,491 @@ def test_media_search(authenticated_client):
     data = response.json()
     # Should find at least one result
     assert len(data.get("items", [])) >= 0
+
+
+def test_upload_image_reads_dimensions_while_streaming(authenticated_client):
+    """Image dimensions come from the header bytes of the streamed upload"""
+    from PIL import Image
+
+    image_file = BytesIO()
+    Image.new("RGB", (64, 48), "white").save(image_file, "PNG")
+    image_file.seek(0)
+
+    response = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("pixel.png", image_file, "image/png")}
+    )
+
+    assert response.status_code == 201
+    assert (response.json()["width"], response.json()["height"]) == (64, 48)
+
+
+def test_upload_stream_hashes_and_enforces_size_limit(tmp_path):
+    """Chunks are hashed as they are stored, and an oversized file leaves nothing behind"""
+    import hashlib
+
+    import pytest
+
+    from backend.core.media_utils import FileTooLargeError, UploadStream
+    from backend.core.storage import LocalStorageBackend
+
+    storage = LocalStorageBackend(str(tmp_path))
+    data = b"0123456789" * 1000
+
+    upload = UploadStream(BytesIO(data), max_size=len(data), chunk_size=4096)
+    storage.save_stream(upload, "org/document/file.txt")
+    assert (tmp_path / "org/document/file.txt").read_bytes() == data
+    assert upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+
+    upload = UploadStream(BytesIO(data), max_size=5000, chunk_size=4096)
+    with pytest.raises(FileTooLargeError):
+        storage.save_stream(upload, "org/document/too_large.txt")
+    assert upload.size == 2 * 4096  # Stopped at the chunk over the limit
+    assert sorted(p.name for p in (tmp_path / "org/document").iterdir()) == ["file.txt"]
+
+
+def test_identical_uploads_share_one_stored_file(authenticated_client, db_session):
+    """Re-uploads reference the stored blob, which is deleted with its last media"""
+    from pathlib import Path
+
+    from backend.core.storage import LocalStorageBackend
+    from backend.models.media import Media, MediaBlob
+
+    content = b"shared product image"
+    media_ids = [
+        authenticated_client.post(
+            "/api/v1/media/upload", files={"file": (name, BytesIO(content), "image/jpeg")}
+        ).json()["id"]
+        for name in ("front.jpg", "front-copy.jpg")
+    ]
+
+    rows = db_session.query(Media).all()
+    assert len({row.filename for row in rows}) == 2
+    assert len({row.file_path for row in rows}) == 1
+    blob = db_session.query(MediaBlob).one()
+    assert blob.reference_count == 2
+    stored_file = LocalStorageBackend().get_full_path(blob.file_path)
+    assert stored_file.read_bytes() == content
+
+    # Each media is still served under its own filename
+    for row in rows:
+        response = authenticated_client.get(f"/api/v1/media/files/{row.filename}")
+        assert response.status_code == 200
+        assert response.content == content
+
+    assert authenticated_client.delete(f"/api/v1/media/{media_ids[0]}").status_code == 204
+    db_session.expire_all()
+    assert db_session.query(MediaBlob).one().reference_count == 1
+    assert Path(stored_file).exists()
+
+    response = authenticated_client.post(
+        "/api/v1/media/bulk-delete", json={"media_ids": [media_ids[1]]}
+    )
+    assert response.json()["deleted_count"] == 1
+    db_session.expire_all()
+    assert db_session.query(MediaBlob).count() == 0
+    assert not Path(stored_file).exists()
+
+
+def test_transform_image_stores_variants(authenticated_client):
+    """Variants are rendered once within the allowlist and served with immutable headers"""
+    from PIL import Image
+
+    from backend.core.storage import LocalStorageBackend
+
+    image_file = BytesIO()
+    Image.new("RGB", (800, 600), "red").save(image_file, "PNG")
+    image_file.seek(0)
+    upload = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("banner.png", image_file, "image/png")}
+    ).json()
+    url = f"/api/v1/media/transform/{upload['filename']}"
+
+    response = authenticated_client.get(url, params={"w": 256, "fmt": "webp"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    assert Image.open(BytesIO(response.content)).size == (256, 192)
+
+    response = authenticated_client.get(
+        url, params={"w": 128, "h": 128, "fit": "cover", "fmt": "jpeg"}
+    )
+    assert Image.open(BytesIO(response.content)).size == (128, 128)
+
+    variants = LocalStorageBackend().get_full_path("variants")
+    stored = sorted(path.name for path in variants.rglob("*") if path.is_file())
+    assert stored == ["128x128_cover_q75.jpg", "256x0_contain_q75.webp"]
+
+    assert authenticated_client.get(url, params={"w": 300}).status_code == 400
+    assert authenticated_client.get(url, params={"w": 256, "fmt": "gif"}).status_code == 400
+
+    assert authenticated_client.delete(f"/api/v1/media/{upload['id']}").status_code == 204
+    assert not any(path.is_file() for path in variants.rglob("*"))
+
+
+def test_generate_variants_renders_missing_sizes_once(authenticated_client):
+    """Several variants are rendered in one task; stored ones are not rendered again"""
+    from PIL import Image
+
+    image_file = BytesIO()
+    Image.new("RGB", (1024, 768), "blue").save(image_file, "PNG")
+    image_file.seek(0)
+    media_id = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("hero.png", image_file, "image/png")}
+    ).json()["id"]
+
+    variants = [{"w": 320}, {"w": 640, "fmt": "avif"}, {"w": 320}]
+    response = authenticated_client.post(
+        f"/api/v1/media/{media_id}/variants", json={"variants": variants}
+    )
+    assert response.status_code == 200
+    rendered = response.json()["variants"]
+    assert [variant["generated"] for variant in rendered] == [True, True]
+    assert rendered[1]["mime_type"] == "image/avif"
+
+    image = authenticated_client.get(rendered[0]["url"])
+    assert Image.open(BytesIO(image.content)).size == (320, 240)
+
+    response = authenticated_client.post(
+        f"/api/v1/media/{media_id}/variants", json={"variants": [{"w": 320}, {"w": 128}]}
+    )
+    assert [variant["generated"] for variant in response.json()["variants"]] == [False, True]
+
+    authenticated_client.delete(f"/api/v1/media/{media_id}")
+
+
+def test_image_worker_rejects_tasks_beyond_max_pending():
+    """Submissions over max_pending fail fast instead of queueing without bound"""
+    import asyncio
+    import time
+
+    import pytest
+
+    from backend.core.image_worker import ImageWorker, ImageWorkerBusy
+
+    worker = ImageWorker(processes=0, max_pending=2)
+
+    async def main():
+        tasks = [asyncio.ensure_future(worker.run(time.sleep, 0.05)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ImageWorkerBusy):
+            await worker.run(time.sleep, 0)
+        assert worker.stats()["running"] == 2
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    stats = worker.stats()
+    assert (stats["completed"], stats["rejected"], stats["running"]) == (2, 1, 0)
+
+
+def test_media_files_support_ranges_and_conditional_requests(authenticated_client):
+    """Byte ranges get 206, a matching ETag 304, and a stale If-Range the whole file"""
+    content = bytes(range(256)) * 4
+    upload = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("clip.mp4", BytesIO(content), "video/mp4")}
+    ).json()
+    url = f"/api/v1/media/proxy/{upload['filename']}"
+
+    response = authenticated_client.get(url)
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+
+    response = authenticated_client.get(url, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+    assert response.content == content[100:200]
+
+    response = authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = authenticated_client.get(
+        url, headers={"Range": "bytes=100-199", "If-Range": '"stale"'}
+    )
+    assert response.status_code == 200
+    assert response.content == content
+
+    authenticated_client.delete(f"/api/v1/media/{upload['id']}")
+
+
+def test_media_file_routes_resolve_filenames_through_the_lookup(
+    authenticated_client, monkeypatch
+):
+    """Files and thumbnails are served from the cached lookup without a query, until deleted"""
+    import json
+    from pathlib import Path
+
+    from PIL import Image
+
+    from backend.core import media_lookup
+
+    # Redis is not available in tests: keep cached values in a dict, as stored (JSON)
+    stored = {}
+
+    async def get_json(key, l1=False):
+        return stored.get(key)
+
+    async def set_value(key, value, ttl=None, tags=(), l1=False):
+        stored[key] = json.loads(json.dumps(value))
+        return True
+
+    async def delete(key):
+        return stored.pop(key, None) is not None
+
+    monkeypatch.setattr(media_lookup.cache, "get_json", get_json)
+    monkeypatch.setattr(media_lookup.cache, "set", set_value)
+    monkeypatch.setattr(media_lookup.cache, "delete", delete)
+
+    image_file = BytesIO()
+    Image.new("RGB", (640, 480), "green").save(image_file, "PNG")
+    image_file.seek(0)
+    upload = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("lookup.png", image_file, "image/png")}
+    ).json()
+    thumbnail = authenticated_client.post(
+        "/api/v1/media/thumbnail", json={"media_id": upload["id"], "width": 64, "height": 64}
+    )
+    assert thumbnail.status_code == 200
+    thumbnail_filename = Path(thumbnail.json()["thumbnail_url"]).name
+    file_urls = [
+        f"/api/v1/media/files/{upload['filename']}",
+        f"/api/v1/media/proxy/{upload['filename']}",
+        f"/api/v1/media/thumbnails/{thumbnail_filename}",
+    ]
+
+    # Written by the upload and the thumbnail generation: no query is needed to serve them
+    def no_query(*args, **kwargs):
+        raise AssertionError("media file lookup queried the database")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(media_lookup, "select", no_query)
+        response = authenticated_client.get(file_urls[0])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["etag"].startswith('"')
+        assert authenticated_client.get(file_urls[1]).status_code == 200
+        response = authenticated_client.get(file_urls[2])
+        assert response.status_code == 200
+        assert Image.open(BytesIO(response.content)).size[0] <= 64
+
+    # Deleting evicts the lookups; the next requests find nothing and cache that too
+    assert authenticated_client.delete(f"/api/v1/media/{upload['id']}").status_code == 204
+    assert [authenticated_client.get(url).status_code for url in file_urls] == [404] * 3
+    with monkeypatch.context() as patched:
+        patched.setattr(media_lookup, "select", no_query)
+        assert [authenticated_client.get(url).status_code for url in file_urls] == [404] * 3
+
+
+def test_bulk_delete_releases_shared_blobs_in_one_batch(authenticated_client, db_session):
+    """Copies deleted together release their blob once; unknown ids are reported"""
+    import uuid
+    from pathlib import Path
+
+    from backend.core.storage import LocalStorageBackend
+    from backend.models.media import Media, MediaBlob
+
+    def upload(name, content):
+        return authenticated_client.post(
+            "/api/v1/media/upload", files={"file": (name, BytesIO(content), "text/plain")}
+        ).json()["id"]
+
+    shared = [upload(f"copy-{i}.txt", b"shared notes") for i in range(3)]
+    unique = upload("unique.txt", b"unique notes")
+    kept = upload("kept.txt", b"kept notes")
+    storage = LocalStorageBackend()
+    stored = {blob.content_hash: blob.file_path for blob in db_session.query(MediaBlob)}
+    assert len(stored) == 3
+
+    missing = str(uuid.uuid4())
+    response = authenticated_client.post(
+        "/api/v1/media/bulk-delete", json={"media_ids": [*shared, unique, missing, shared[0]]}
+    )
+    assert response.status_code == 200
+    assert response.json()["deleted_count"] == 4
+    assert response.json()["failed_ids"] == [missing]
+
+    db_session.expire_all()
+    assert [str(media.id) for media in db_session.query(Media)] == [kept]
+    remaining = db_session.query(MediaBlob).one()
+    assert remaining.reference_count == 1
+    assert [Path(storage.get_full_path(path)).exists() for path in stored.values()].count(True) == 1
+    assert storage.get_full_path(remaining.file_path).exists()
+
+
+def test_s3_media_proxy_forwards_ranges_and_validators(
+    authenticated_client, db_session, monkeypatch
+):
+    """S3 objects stream as 206 for ranges, 304 for a matching ETag, 416 for bad ranges"""
+    import boto3
+    from botocore.response import StreamingBody
+    from botocore.stub import Stubber
+
+    from backend.api import media as media_api
+    from backend.core.storage import S3StorageBackend
+    from backend.models.media import Media
+
+    content = bytes(range(256)) * 4
+    upload = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("clip.mp4", BytesIO(content), "video/mp4")}
+    ).json()
+    media = db_session.query(Media).filter(Media.id == upload["id"]).one()
+    etag, key = f'"{media.content_hash}"', media.file_path
+    url = f"/api/v1/media/proxy/{upload['filename']}"
+
+    storage = S3StorageBackend.__new__(S3StorageBackend)
+    storage.bucket_name = "media"
+    storage.s3_client = boto3.client(
+        "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    monkeypatch.setattr(media_api, "get_storage_backend", lambda: storage)
+
+    def s3_object(data, content_range=None):
+        response = {"Body": StreamingBody(BytesIO(data), len(data)), "ContentLength": len(data)}
+        if content_range:
+            response["ContentRange"] = content_range
+        return response
+
+    with Stubber(storage.s3_client) as s3:
+        s3.add_response(
+            "get_object",
+            s3_object(content[100:200], f"bytes 100-199/{len(content)}"),
+            {"Bucket": "media", "Key": key, "Range": "bytes=100-199"},
+        )
+        response = authenticated_client.get(
+            url, headers={"Range": "bytes=100-199", "If-Range": etag}
+        )
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+        assert response.headers["etag"] == etag
+        assert response.content == content[100:200]
+
+        # Answered from the content hash, without asking S3
+        response = authenticated_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        s3.add_client_error("get_object", "InvalidRange", http_status_code=416)
+        response = authenticated_client.get(url, headers={"Range": "bytes=5000-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+        # Media stored before content hashing: If-Range is checked by S3 against its ETag
+        media.content_hash = None
+        db_session.commit()
+        s3.add_client_error(
+            "get_object",
+            "PreconditionFailed",
+            http_status_code=412,
+            expected_params={
+                "Bucket": "media",
+                "Key": key,
+                "Range": "bytes=100-199",
+                "IfMatch": '"stale"',
+            },
+        )
+        s3.add_response("get_object", s3_object(content), {"Bucket": "media", "Key": key})
+        response = authenticated_client.get(
+            url, headers={"Range": "bytes=100-199", "If-Range": '"stale"'}
+        )
+        assert response.status_code == 200
+        assert response.content == content
+        s3.assert_no_pending_responses()
+
+
+def test_s3_transform_renders_missing_variants_and_streams_stored_ones(
+    authenticated_client, db_session, monkeypatch
+):
+    """A variant S3 doesn't have is rendered on NoSuchKey; stored ones are streamed"""
+    import boto3
+    from botocore.response import StreamingBody
+    from botocore.stub import ANY, Stubber
+    from PIL import Image
+
+    from backend.api import media as media_api
+    from backend.core.storage import S3StorageBackend
+    from backend.models.media import Media
+
+    image_file = BytesIO()
+    Image.new("RGB", (800, 600), "blue").save(image_file, "PNG")
+    source = image_file.getvalue()
+    upload = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("hero.png", BytesIO(source), "image/png")}
+    ).json()
+    media = db_session.query(Media).filter(Media.id == upload["id"]).one()
+    url = f"/api/v1/media/transform/{upload['filename']}"
+    params = {"w": 256, "fmt": "webp"}
+
+    storage = S3StorageBackend.__new__(S3StorageBackend)
+    storage.bucket_name = "media"
+    storage.s3_client = boto3.client(
+        "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    monkeypatch.setattr(media_api, "get_storage_backend", lambda: storage)
+
+    def s3_object(data):
+        return {"Body": StreamingBody(BytesIO(data), len(data)), "ContentLength": len(data)}
+
+    with Stubber(storage.s3_client) as s3:
+        s3.add_client_error("get_object", "NoSuchKey", http_status_code=404)
+        s3.add_response(
+            "get_object", s3_object(source), {"Bucket": "media", "Key": media.file_path}
+        )
+        s3.add_response(
+            "put_object", {}, {"Bucket": "media", "Key": ANY, "Body": ANY, "ContentType": ANY}
+        )
+        response = authenticated_client.get(url, params=params)
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+        variant = response.content
+        assert Image.open(BytesIO(variant)).size == (256, 192)
+
+        s3.add_response("get_object", s3_object(variant))
+        response = authenticated_client.get(url, params=params)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.content == variant
+        s3.assert_no_pending_responses()
+
+
+def test_s3_thumbnail_download_is_removed_when_the_image_worker_is_busy(
+    authenticated_client, monkeypatch
+):
+    """The source downloaded from S3 is removed even when thumbnail generation fails"""
+    from pathlib import Path
+
+    import boto3
+    from PIL import Image
+
+    from backend.api import media as media_api
+    from backend.core.image_worker import ImageWorkerBusy
+    from backend.core.storage import S3StorageBackend
+
+    image_file = BytesIO()
+    Image.new("RGB", (64, 64), "green").save(image_file, "PNG")
+    upload = authenticated_client.post(
+        "/api/v1/media/upload", files={"file": ("icon.png", image_file, "image/png")}
+    ).json()
+
+    storage = S3StorageBackend.__new__(S3StorageBackend)
+    storage.bucket_name = "media"
+    storage.s3_client = boto3.client(
+        "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    downloads = []
+
+    def download_file(bucket, key, path):
+        Path(path).write_bytes(image_file.getvalue())
+        downloads.append(Path(path))
+
+    async def busy(*args):
+        raise ImageWorkerBusy()
+
+    monkeypatch.setattr(storage.s3_client, "download_file", download_file)
+    monkeypatch.setattr(media_api, "get_storage_backend", lambda: storage)
+    monkeypatch.setattr(media_api.image_worker, "run", busy)
+
+    response = authenticated_client.post(
+        "/api/v1/media/thumbnail", json={"media_id": upload["id"], "width": 50, "height": 50}
+    )
+    assert response.status_code == 503
+    assert len(downloads) == 1
+    assert not downloads[0].exists()
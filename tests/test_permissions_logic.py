@@ -84,3 +84,76 @@ class TestPermissionLogic:
             for content_type in types_list:
                 assert "id" in content_type
                 assert "name" in content_type
+
+
+class TestEffectivePermissions:
+    """Test the cached effective permission sets behind PermissionChecker"""
+
+    def test_effective_permissions_follow_role_changes(self, db_session):
+        """Test hierarchy expansion, memoization and invalidation on RBAC commits"""
+        import uuid
+
+        from backend.core.effective_permissions import (
+            EffectivePermissions,
+            get_effective_permissions,
+        )
+        from backend.core.permission_hierarchy import PERMISSION_CLOSURE
+        from backend.core.permissions import PermissionChecker
+        from backend.models.organization import Organization
+        from backend.models.rbac import Permission, Role
+        from backend.models.user import User
+
+        assert PERMISSION_CLOSURE["content.delete"] == {
+            "content.delete",
+            "content.update",
+            "content.read",
+        }
+
+        def get_permission(name):
+            permission = db_session.query(Permission).filter(Permission.name == name).first()
+            if permission is None:
+                permission = Permission(name=name, category=name.split(".")[0])
+                db_session.add(permission)
+            return permission
+
+        unique_id = str(uuid.uuid4())[:8]
+        organization = Organization(name=f"Effective {unique_id}", slug=f"effective-{unique_id}")
+        db_session.add(organization)
+        db_session.flush()
+
+        viewer = Role(name="viewer", organization_id=organization.id, level=10)
+        viewer.permissions = [get_permission("media.read")]
+        editor = Role(name="editor", organization_id=organization.id, level=50)
+        editor.permissions = [get_permission("content.publish")]
+        user = User(
+            email=f"effective-{unique_id}@example.com",
+            hashed_password="not-a-real-hash",
+            organization_id=organization.id,
+        )
+        user.roles = [editor]
+        db_session.add_all([viewer, editor, user])
+        db_session.commit()
+
+        effective = get_effective_permissions(user, db_session)
+        assert not effective.is_owner
+        # Own permission, its implied permissions and the lower-level viewer role's
+        assert {"content.publish", "content.update", "content.read", "media.read"} <= set(
+            effective.permissions
+        )
+        assert "content.delete" not in effective.permissions
+        assert effective.has("content.read")
+        assert not effective.has("content.read", use_hierarchy=False)
+        assert EffectivePermissions.from_json(effective.to_json()) == effective
+
+        # Memoized for the rest of the request
+        assert get_effective_permissions(user, db_session) is effective
+
+        # Granting a permission is visible to the next check
+        editor.permissions.append(get_permission("content.delete"))
+        db_session.commit()
+        assert PermissionChecker.has_permission(user, "content.delete", db_session)
+
+        # So is becoming the organization owner
+        organization.owner_id = user.id
+        db_session.commit()
+        assert PermissionChecker.has_permission(user, "webhooks.delete", db_session)
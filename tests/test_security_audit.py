@@ -52,3 +52,49 @@ class TestSecurityAudit:
             status.HTTP_403_FORBIDDEN,
             status.HTTP_404_NOT_FOUND,
         ]
+
+
+class TestSecurityMiddleware:
+    """Test the security and bookkeeping headers added by the middleware stack"""
+
+    def test_middleware_headers_and_request_validation(self, client):
+        """Test headers are added to responses and suspicious requests are rejected"""
+        response = client.get("/api/v1/auth/me")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-API-Version"] == "v1"
+        assert response.headers["X-Response-Time"].endswith("ms")
+        # Not a rate limited endpoint
+        assert "X-RateLimit-Limit" not in response.headers
+
+        response = client.get("/api/v1/auth/me", params={"q": "1 union select password"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["title"] == "Suspicious Input Detected"
+
+    def test_csrf_protection_for_cookie_requests(self, client):
+        """Test non-API form posts need a CSRF token, read from the header or form body"""
+        response = client.post("/submit", data={"name": "value"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.json()["title"] == "CSRF Token Missing"
+
+        response = client.post("/submit", data={"csrf_token": "1.invalid"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.json()["title"] == "CSRF Token Invalid"
+
+    def test_rate_limit_headers_report_the_window_hit(self, client):
+        """Test X-RateLimit-* headers come from the limiter's own window state"""
+        import time
+
+        credentials = {"email": "nobody@example.com", "password": "WrongPass123!"}
+        first = client.post("/api/v1/auth/login", json=credentials)
+        second = client.post("/api/v1/auth/login", json=credentials)
+
+        limit = int(first.headers["X-RateLimit-Limit"])
+        assert int(second.headers["X-RateLimit-Limit"]) == limit
+        assert int(first.headers["X-RateLimit-Remaining"]) < limit
+        assert (
+            int(second.headers["X-RateLimit-Remaining"])
+            == int(first.headers["X-RateLimit-Remaining"]) - 1
+        )
+        assert int(second.headers["X-RateLimit-Reset"]) >= int(time.time())
@@ -106,6 +106,82 @@ class TestSEO:
 
         assert response.status_code in [status.HTTP_200_OK, status.HTTP_403_FORBIDDEN]
 
+    def test_sitemap_is_scoped_and_split_per_organization(
+        self, authenticated_client, test_content_data, monkeypatch
+    ):
+        """Test per-organization sitemaps, child sitemaps and the sitemap index"""
+        from backend.core import sitemaps
+
+        for slug, entry_status in [("first-post", "published"), ("second-post", "published")]:
+            authenticated_client.post(
+                "/api/v1/content/entries",
+                json={**test_content_data, "slug": slug, "status": entry_status},
+            )
+        authenticated_client.post(
+            "/api/v1/content/entries",
+            json={**test_content_data, "slug": "draft-post", "status": "draft"},
+        )
+        org_slug = authenticated_client.get("/api/v1/tenant/organizations").json()[
+            "organizations"
+        ][0]["organization_slug"]
+
+        # Public request for the organization, streamed in one urlset
+        response = authenticated_client.get(
+            f"/api/v1/seo/sitemap.xml?organization={org_slug}&base_url=https://shop.test",
+            headers={"Authorization": ""},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "<urlset" in response.text
+        assert "https://shop.test/content/first-post" in response.text
+        assert "https://shop.test/content/second-post" in response.text
+        assert "draft-post" not in response.text
+
+        response = authenticated_client.get(
+            "/api/v1/seo/sitemap.xml?organization=no-such-org", headers={"Authorization": ""}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        # One URL per child sitemap: sitemap.xml becomes the index
+        monkeypatch.setattr(sitemaps, "SITEMAP_MAX_URLS", 1)
+        response = authenticated_client.get("/api/v1/seo/sitemap.xml")
+        assert "<sitemapindex" in response.text
+        assert "/api/v1/seo/sitemaps/1.xml?organization=" in response.text
+        assert "/api/v1/seo/sitemaps/2.xml?organization=" in response.text
+
+        first = authenticated_client.get("/api/v1/seo/sitemaps/1.xml").text
+        second = authenticated_client.get("/api/v1/seo/sitemaps/2.xml").text
+        assert first.count("<url>") == 1 and second.count("<url>") == 1
+        assert {"first-post" in first, "first-post" in second} == {True, False}
+        assert {"second-post" in first, "second-post" in second} == {True, False}
+        response = authenticated_client.get("/api/v1/seo/sitemaps/3.xml")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_sitemaps_are_cached_only_for_the_organization_site(
+        self, authenticated_client, test_content_data, monkeypatch
+    ):
+        """Test sitemaps for arbitrary base URLs are streamed without being cached"""
+        from backend.core import sitemaps
+
+        authenticated_client.post(
+            "/api/v1/content/entries",
+            json={**test_content_data, "slug": "cached-post", "status": "published"},
+        )
+        cached_keys = []
+        monkeypatch.setattr(
+            sitemaps.cache, "set_sync", lambda key, *args, **kwargs: cached_keys.append(key)
+        )
+
+        response = authenticated_client.get("/api/v1/seo/sitemap.xml?base_url=https://other.test")
+        assert "https://other.test/content/cached-post" in response.text
+        assert not any(":pages:" not in key for key in cached_keys)
+
+        response = authenticated_client.get("/api/v1/seo/sitemap.xml")
+        assert "https://example.com/content/cached-post" in response.text
+        assert any(":pages:" not in key for key in cached_keys)
+
+        assert sitemaps.is_cacheable_base_url("https://shop.test/", "https://shop.test")
+        assert not sitemaps.is_cacheable_base_url("https://other.test", "https://shop.test")
+
     def test_generate_robots_txt(self, authenticated_client):
         """Test generating robots.txt"""
         response = authenticated_client.get("/api/v1/seo/robots.txt")